@@ -1,16 +1,23 @@
 """
 ALETHEIA - Punto de entrada principal
 Ejecuta los scripts de scraping de datos competitivos de Valorant (VCT 2026).
+
+  python main.py                          menú interactivo
+  python main.py --eventos vct_masters    por lotes, sin preguntas (ver --help)
 """
 
 import subprocess
 import sys
 import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts')
 OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'output_data')
 
+# Los módulos compartidos (navegadores, caché...) viven junto a los scripts
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
 SCRIPTS = {
     "0": {
         "nombre": "Extractor de enlaces de evento (VLR.gg)",
@@ -31,29 +38,65 @@ SCRIPTS = {
         "nombre": "Mapas y Rondas (VLR.gg)",
         "archivo": "scrapear_vlr_corregido.py",
         "salida": ["vlr_mapas.xlsx", "vlr_rondas.xlsx"],
+        "usa_chrome": True,
     },
     "4": {
         "nombre": "Estadísticas por lado ATK/DEF (VLR.gg)",
         "archivo": "scrapear_stats_pro.py",
         "archivo_china": "scrapear_stats_pro_china.py",  # Motor alternativo para China
         "salida": ["vlr_stats_players_sides.xlsx"],
+        "usa_chrome": True,
     },
     "5": {
         "nombre": "Enfrentamientos y Multikills (VLR.gg)",
         "archivo": "scrapear_enfrentamientos.py",
         "salida": ["vlr_enfrentamientos.xlsx", "vlr_multikills_clutches.xlsx"],
+        "usa_chrome": True,
     },
     "6": {
         "nombre": "Economía por ronda (VLR.gg)",
         "archivo": "scrapear_economia.py",
         "salida": ["vlr_economia_resumen.xlsx", "vlr_economia_rondas.xlsx"],
+        "usa_chrome": True,
+    },
+    "7": {
+        "nombre": "Partido completo: tablas de 2-6 en una pasada (VLR.gg)",
+        "archivo": "scrapear_partido_completo.py",
+        "salida": ["vct_partidos.xlsx", "vlr_mapas.xlsx", "vlr_rondas.xlsx",
+                   "vlr_stats_players_sides.xlsx", "vlr_enfrentamientos.xlsx",
+                   "vlr_multikills_clutches.xlsx", "vlr_economia_resumen.xlsx",
+                   "vlr_economia_rondas.xlsx"],
+        "usa_chrome": True,
     },
 }
 
 # Scripts que se ejecutan en paralelo al elegir [A]
 SCRIPTS_PARALELOS = ["2", "3", "4", "5", "6"]
-# Scripts que siempre corren en secuencia (prerequisitos)
-SCRIPTS_SECUENCIALES = ["0", "1"]
+# Scripts que corren en secuencia antes que el resto (generan los .txt); el 1
+# no es prerequisito de ningún evento y entra en el grafo del Planificador
+SCRIPTS_SECUENCIALES = ["0"]
+# ALETHEIA_EXTRACTOR=unificado: [A] y [U] lanzan por evento el script 7, que
+# descarga y parsea cada partido una sola vez, en lugar de los scripts 2-6
+EXTRACTOR_UNIFICADO = os.environ.get("ALETHEIA_EXTRACTOR", "").lower() == "unificado"
+SCRIPTS_EVENTO = ["7"] if EXTRACTOR_UNIFICADO else SCRIPTS_PARALELOS
+
+# Tablas del evento que lee cada script además de su .txt. El planificador no
+# lo lanza hasta que terminan los scripts del mismo lote que las generan: el
+# motor China reparte las stats por lado con las rondas de vlr_mapas.
+ENTRADAS = {
+    "scrapear_stats_pro_china.py": ["vlr_mapas.xlsx"],
+}
+
+# ── Presupuesto global de concurrencia para [A] ─────────────────────────────
+# Varios eventos corren a la vez; el límite real lo ponen los procesos,
+# los Chrome y el ritmo de peticiones por host, no el número de eventos.
+NUCLEOS = os.cpu_count() or 2
+MAX_PROCESOS = int(os.environ.get("ALETHEIA_MAX_PROCESOS", str(max(len(SCRIPTS_PARALELOS), NUCLEOS))))
+MAX_NAVEGADORES = int(os.environ.get("ALETHEIA_MAX_NAVEGADORES", str(max(3, NUCLEOS // 2))))
+MAX_EVENTOS = int(os.environ.get(
+    "ALETHEIA_EVENTOS_PARALELOS",
+    str(max(1, -(-MAX_PROCESOS // len(SCRIPTS_EVENTO)))),
+))
 
 
 def mostrar_menu():
@@ -67,27 +110,33 @@ def mostrar_menu():
         print(f"      → {archivos}")
     print()
     print("  [A] Ejecutar TODOS los scripts  ⚡ (2-6 en paralelo)")
+    print("  [U] Actualizar eventos ya scrapeados  🔄 (solo partidos nuevos o fallidos)")
+    print("  [F] Reintentar solo los partidos fallidos  📮")
+    estado = os.environ.get("ALETHEIA_PERFIL") or "desactivado"
+    print(f"  [P] Perfilado de los scripts  🔥 ({estado})")
     print("  [Q] Salir")
     print()
 
 
 def salidas_existen(key):
     """
-    Devuelve True si todos los archivos de salida del script ya existen,
-    buscando tanto en output_data/ raíz como en sus subcarpetas directas.
+    Devuelve True si todos los archivos de salida del script ya existen
+    (en xlsx o Parquet), buscando tanto en output_data/ raíz como en sus
+    subcarpetas directas.
     """
     import glob
+    from salidas import existe_tabla
     info = SCRIPTS[key]
     if not info["salida"]:
         return False  # Sin archivos de salida definidos (ej: script 0) → nunca omitir
 
     def archivo_existe(nombre):
         # Buscar en raíz
-        if os.path.exists(os.path.join(OUTPUT_DIR, nombre)):
+        if existe_tabla(OUTPUT_DIR, nombre):
             return True
         # Buscar en subcarpetas directas (un nivel)
-        patron = os.path.join(OUTPUT_DIR, "*", nombre)
-        return bool(glob.glob(patron))
+        carpetas = glob.glob(os.path.join(OUTPUT_DIR, "*", ""))
+        return any(existe_tabla(carpeta, nombre) for carpeta in carpetas)
 
     return all(archivo_existe(archivo) for archivo in info["salida"])
 
@@ -123,24 +172,33 @@ def ejecutar_script(key, omitir_si_existe=False):
     return resultado.returncode == 0
 
 
-def ejecutar_script_paralelo(key, ruta_txt=None):
+def archivo_de(key, ruta_txt=None):
+    """Script que corre `key` para el evento de `ruta_txt` (motor China en el 4)."""
+    info = SCRIPTS[key]
+    if key == "4" and ruta_txt and "china" in os.path.basename(ruta_txt).lower():
+        return info.get("archivo_china", info["archivo"])
+    return info["archivo"]
+
+
+def ejecutar_script_paralelo(key, ruta_txt=None, env_extra=None):
     """
     Versión para ejecución paralela: lanza el proceso y captura la salida.
     Si ruta_txt está definida, pasa ALETHEIA_TXT_FILE al subproceso para que
     el script guarde los resultados en la carpeta de ese .txt específico.
+    env_extra añade variables de entorno al subproceso.
 
     Para el script #4 (stats por lado), detecta automáticamente si el evento
     es de China y usa scrapear_stats_pro_china.py en ese caso, ya que las
-    pestañas ATK/DEF de VLR.gg están vacías para la región China y el motor
-    normal devolvería todo en ceros.
+    pestañas ATK/DEF de VLR.gg están vacías para la región China (el motor
+    normal también cae al split proporcional mapa a mapa, pero el de China
+    lo hace con las rondas ya guardadas en vlr_mapas).
     """
     info = SCRIPTS[key]
     nombre = info["nombre"]
 
     # ── Selección automática de motor para stats (script 4) ─────────────────
-    archivo = info["archivo"]
-    if key == "4" and ruta_txt and "china" in os.path.basename(ruta_txt).lower():
-        archivo = info.get("archivo_china", info["archivo"])
+    archivo = archivo_de(key, ruta_txt)
+    if archivo != info["archivo"]:
         nombre = nombre + " [motor China]"
         print(f"\n🇨🇳  Evento China detectado → usando motor alternativo: {archivo}")
 
@@ -153,6 +211,7 @@ def ejecutar_script_paralelo(key, ruta_txt=None):
     env["PYTHONIOENCODING"] = "utf-8"
     if ruta_txt:
         env["ALETHEIA_TXT_FILE"] = ruta_txt
+    env.update(env_extra or {})
 
     resultado = subprocess.run(
         [sys.executable, ruta],
@@ -179,20 +238,174 @@ def ejecutar_script_paralelo(key, ruta_txt=None):
     return exito, salida
 
 
-def ejecutar_todos():
+def iniciar_pool_navegadores(num_navegadores=None):
+    """
+    Arranca el pool de Chrome compartido por los scripts 3-6. Devuelve el
+    módulo navegadores (para detenerlo al final) o None si no hay pool:
+    motor estático, ALETHEIA_POOL_NAVEGADORES=0 o Chrome no disponible.
+    """
+    from descargas import usar_selenium
+    if not usar_selenium():
+        return None
+    try:
+        import navegadores
+    except ImportError as e:
+        print(f"⚠️ Pool de Chrome no disponible: {e}")
+        return None
+    if navegadores.NUM_NAVEGADORES <= 0:
+        return None  # ALETHEIA_POOL_NAVEGADORES=0 desactiva el pool
+    return navegadores if navegadores.iniciar_pool(num_navegadores) else None
+
+
+class Planificador:
+    """
+    Ejecuta un grafo de tareas (ver tareas_de) con todo el paralelismo que
+    permiten sus dependencias y el presupuesto global:
+      - procesos: scripts corriendo a la vez (MAX_PROCESOS)
+      - navegadores: scripts con Chrome a la vez (MAX_NAVEGADORES); así
+        ningún script espera un Chrome del pool ni arranca uno propio de más
+      - eventos: eventos con algún script en curso (MAX_EVENTOS)
+    Cada tarea arranca en cuanto terminan las tareas de las que depende y
+    hay hueco; entre las listas, primero las de los eventos anteriores.
+    El ritmo de peticiones por host no se reparte aquí: todos los procesos
+    comparten el limitador de scripts/limitador.py.
+    """
+
+    def __init__(self, max_procesos, max_navegadores, max_eventos, selenium):
+        self.max_procesos = max(1, max_procesos)
+        self.max_navegadores = max(1, max_navegadores)
+        self.max_eventos = max(1, max_eventos)
+        self.selenium = selenium
+
+    def usa_chrome(self, tarea):
+        return self.selenium and SCRIPTS[tarea["key"]].get("usa_chrome")
+
+    def hay_hueco(self, tarea, en_curso):
+        """True si `tarea` cabe en el presupuesto junto a las tareas `en_curso`."""
+        if len(en_curso) >= self.max_procesos:
+            return False
+        if self.usa_chrome(tarea) and sum(1 for t in en_curso if self.usa_chrome(t)) >= self.max_navegadores:
+            return False
+        eventos = {t["evento"] for t in en_curso if t["evento"]}
+        return not tarea["evento"] or tarea["evento"] in eventos or len(eventos) < self.max_eventos
+
+    def ejecutar(self, tareas):
+        """Ejecuta todas las tareas e imprime la salida de cada una; devuelve cuántas tuvieron éxito."""
+        pendientes = list(range(len(tareas)))
+        terminadas = {}  # índice → éxito
+        en_curso = {}    # future → índice
+        exitos = 0
+        with ThreadPoolExecutor(max_workers=self.max_procesos) as executor:
+            while pendientes or en_curso:
+                listas = [i for i in pendientes if tareas[i]["depende"] <= terminadas.keys()]
+                if not listas and not en_curso:
+                    listas = pendientes[:1]  # Dependencia circular en ENTRADAS: no bloquearse
+                for i in listas:
+                    tarea = tareas[i]
+                    if not self.hay_hueco(tarea, [tareas[j] for j in en_curso.values()]):
+                        continue
+                    fallidas = [tareas[j]["archivo"] for j in tarea["depende"] if not terminadas.get(j)]
+                    if fallidas:
+                        print(f"\n⚠️  {tarea['archivo']} ({tarea['evento']}): falló {', '.join(fallidas)} "
+                              f"→ se lanza con las tablas que haya")
+                    en_curso[executor.submit(ejecutar_script_paralelo, tarea["key"], tarea["ruta_txt"])] = i
+                    pendientes.remove(i)
+
+                hechas, _ = wait(en_curso, return_when=FIRST_COMPLETED)
+                for future in hechas:
+                    i = en_curso.pop(future)
+                    exito, salida = future.result()
+                    print(salida)
+                    terminadas[i] = exito
+                    exitos += exito
+                    evento = tareas[i]["evento"]
+                    del_evento = [j for j, t in enumerate(tareas) if evento and t["evento"] == evento]
+                    if evento and all(j in terminadas for j in del_evento):
+                        print(f"\n🏁 Evento {evento}: {sum(terminadas[j] for j in del_evento)}/"
+                              f"{len(del_evento)} scripts completados")
+        return exitos
+
+
+def tareas_de(eventos):
+    """
+    Grafo de tareas de [(ruta del .txt o None, scripts)]: una tarea por
+    script y evento ({'key', 'ruta_txt', 'evento', 'archivo', 'depende'}).
+    Una tarea depende de las del mismo evento que escriben alguna tabla de
+    sus ENTRADAS; si esa tabla no se genera en este lote, se usa la que ya
+    esté en disco. ruta_txt None = script sin evento (equipos y jugadores).
+    """
+    tareas = []
+    for ruta_txt, keys in eventos:
+        primera = len(tareas)
+        for key in keys:
+            tareas.append({
+                "key": key,
+                "ruta_txt": ruta_txt,
+                "evento": nombre_evento_de(ruta_txt) if ruta_txt else None,
+                "archivo": archivo_de(key, ruta_txt),
+                "depende": set(),
+            })
+        del_evento = range(primera, len(tareas))
+        for i in del_evento:
+            entradas = set(ENTRADAS.get(tareas[i]["archivo"], []))
+            for j in del_evento:
+                if j != i and entradas & set(SCRIPTS[tareas[j]["key"]]["salida"]):
+                    tareas[i]["depende"].add(j)
+    return tareas
+
+
+def nombre_evento_de(ruta_txt):
+    nombre_evento = os.path.splitext(os.path.basename(ruta_txt))[0]
+    if nombre_evento.startswith("enlaces_"):
+        nombre_evento = nombre_evento[len("enlaces_"):]
+    return nombre_evento
+
+
+def partidos_faltantes(ruta_txt, key):
+    """
+    match_ids del .txt del evento que todavía no aparecen en las salidas
+    del script `key` (partidos nuevos o que fallaron en la última ejecución).
+    Los partidos completos sin filas (checkpoint vacío) no faltan.
+    """
+    from checkpoints import match_id_de, match_ids_en_tabla
+
+    with open(ruta_txt, 'r', encoding='utf-8') as f:
+        ids_txt = [match_id_de(linea.strip()) for linea in f if linea.strip()]
+    ids_txt = [i for i in dict.fromkeys(ids_txt) if i]
+
+    carpeta = os.path.join(OUTPUT_DIR, nombre_evento_de(ruta_txt))
+    guardados = set()
+    for archivo in SCRIPTS[key]["salida"]:
+        guardados |= match_ids_en_tabla(carpeta, archivo)
+    return [i for i in ids_txt if i not in guardados]
+
+
+def ejecutar_todos(incremental=False):
     """
     Estrategia de ejecución al elegir [A]:
       1. Script 0 (enlaces) → solo si NO hay .txt en output_data/.
          Si ya existen .txt, se usan directamente.
-      2. Script 1 (equipos/jugadores) → secuencial, se omite si ya existe.
-      3. Scripts 2-6 → EN PARALELO, se omiten si ya existen.
+      2. Script 1 (equipos/jugadores) y scripts 2-6 de cada evento pendiente
+         → un solo grafo de tareas (Planificador), se omiten si ya existen.
+         Cada script arranca en cuanto terminan los que generan las tablas
+         que lee (ENTRADAS: el motor China espera a Mapas y Rondas del mismo
+         evento) y hay hueco en el presupuesto global de procesos, Chrome y
+         eventos (MAX_EVENTOS); Liquipedia corre a la vez que los eventos.
+         Los scripts con Selenium comparten un pool de Chrome ya arrancados
+         que dura toda la ejecución.
+
+    Con incremental=True (opción [U]) los eventos que ya tienen carpeta no se
+    saltan: se comparan los match_id del .txt con los guardados en cada xlsx
+    y solo se relanzan los scripts a los que les faltan partidos. Gracias a
+    los checkpoints, esos scripts solo scrapean los partidos que faltan y los
+    fusionan con las salidas existentes.
     """
     import glob
     exitos = 0
 
     # ── PASO 1: Script 0 solo si no hay .txt ────────────────────────────────
     print("\n" + "=" * 60)
-    print("  PASO 1/3 — Verificando archivos de enlaces")
+    print("  PASO 1/2 — Verificando archivos de enlaces")
     print("=" * 60)
 
     archivos_txt = glob.glob(os.path.join(OUTPUT_DIR, "*.txt"))
@@ -209,69 +422,350 @@ def ejecutar_todos():
         if ejecutar_script("0", omitir_si_existe=False):
             exitos += 1
 
-    # ── PASO 2: Script 1 secuencial, omitible ───────────────────────────────
+    # ── PASO 2: Script 1 + scripts de cada .txt pendiente, como grafo ───────
     print("\n" + "=" * 60)
-    print("  PASO 2/3 — Equipos y Jugadores (prerequisito)")
+    print(f"  PASO 2/2 — Scraping EN PARALELO (script 1 y scripts {', '.join(SCRIPTS_EVENTO)} por evento)")
+    print(f"  Hasta {MAX_EVENTOS} eventos a la vez · {MAX_PROCESOS} procesos · {MAX_NAVEGADORES} Chrome")
     print("=" * 60)
-    if ejecutar_script("1", omitir_si_existe=True):
-        exitos += 1
 
-    # ── PASO 3: Por cada .txt pendiente → 5 scripts en PARALELO ─────────────
-    print("\n" + "=" * 60)
-    print("  PASO 3/3 — Scraping EN PARALELO (scripts 2, 3, 4, 5, 6)")
-    print("  Un lote de 5 scripts por cada evento pendiente")
-    print("=" * 60)
+    tareas = []  # (ruta completa del .txt o None, scripts a lanzar)
+    if salidas_existen("1"):
+        print(f"\n⏭️  Omitiendo '{SCRIPTS['1']['nombre']}' — los archivos ya existen")
+        exitos += 1  # Se considera exitoso (no es un error)
+    else:
+        tareas.append((None, ["1"]))
 
-    # Determinar qué .txt NO tienen carpeta de salida todavía
     archivos_txt = glob.glob(os.path.join(OUTPUT_DIR, "*.txt"))
-    txt_pendientes_rutas = []
-    txt_ya_hechos = []
-
-    for ruta_txt in archivos_txt:
-        nombre_base = os.path.splitext(os.path.basename(ruta_txt))[0]
-        if nombre_base.startswith("enlaces_"):
-            nombre_base = nombre_base[len("enlaces_"):]
-        carpeta_esperada = os.path.join(OUTPUT_DIR, nombre_base)
-        if os.path.isdir(carpeta_esperada):
-            txt_ya_hechos.append(os.path.basename(ruta_txt))
-        else:
-            txt_pendientes_rutas.append(ruta_txt)  # guardamos la ruta completa
+    pendientes, txt_ya_hechos = eventos_pendientes(archivos_txt, SCRIPTS_EVENTO, incremental)
+    tareas.extend(pendientes)
 
     if txt_ya_hechos:
-        print(f"\nYa procesados (carpeta existe):")
+        print(f"\nYa procesados ({'al día' if incremental else 'carpeta existe'}):")
         for f in txt_ya_hechos:
             print(f"   OK {f}")
 
-    if not txt_pendientes_rutas:
+    if not tareas:
         print("\nTodos los eventos ya fueron scrapeados. No hay nada que hacer.")
         # No sumamos éxitos aquí, ya que los scripts no se ejecutaron.
         # El conteo de éxitos se basa en ejecuciones reales.
     else:
-        for ruta_txt in txt_pendientes_rutas:
-            nombre_evento = os.path.splitext(os.path.basename(ruta_txt))[0]
-            if nombre_evento.startswith("enlaces_"):
-                nombre_evento = nombre_evento[len("enlaces_"):]
+        exitos += lanzar_eventos(tareas)
 
-            print(f"\n--- Evento: {nombre_evento} ---")
-            print(f"    Lanzando 5 scripts en paralelo...")
+    print(f"\n{'=' * 60}")
+    print(f"Resultado: {exitos}/{len(SCRIPTS)} scripts completados")
 
-            futures = {}
-            with ThreadPoolExecutor(max_workers=5) as executor:
-                for key in SCRIPTS_PARALELOS:
-                    future = executor.submit(ejecutar_script_paralelo, key, ruta_txt)
-                    futures[future] = key
 
-                for future in as_completed(futures):
-                    exito, salida = future.result()
-                    print(salida)
-                    if exito:
-                        exitos += 1
+def eventos_pendientes(archivos_txt, keys, incremental=False):
+    """
+    Qué scripts de `keys` hay que lanzar en cada evento: todos si el evento
+    aún no tiene carpeta de salida y, con incremental=True, solo los que no
+    tienen todos los partidos del .txt. Devuelve ([(ruta del .txt, scripts)],
+    nombres de los .txt que ya están al día).
+    """
+    eventos = []
+    ya_hechos = []
+    for ruta_txt in archivos_txt:
+        carpeta_esperada = os.path.join(OUTPUT_DIR, nombre_evento_de(ruta_txt))
+        if not os.path.isdir(carpeta_esperada):
+            eventos.append((ruta_txt, list(keys)))
+        elif incremental:
+            faltantes = {key: partidos_faltantes(ruta_txt, key) for key in keys}
+            con_faltantes = [key for key in keys if faltantes[key]]
+            if con_faltantes:
+                nuevos = sorted(set().union(*(faltantes[k] for k in con_faltantes)))
+                print(f"\n🔄 {os.path.basename(ruta_txt)}: {len(nuevos)} partidos nuevos o fallidos "
+                      f"→ scripts {', '.join(con_faltantes)}")
+                eventos.append((ruta_txt, con_faltantes))
+            else:
+                ya_hechos.append(os.path.basename(ruta_txt))
+        else:
+            ya_hechos.append(os.path.basename(ruta_txt))
+    return eventos, ya_hechos
+
+
+def lanzar_eventos(eventos):
+    """
+    Ejecuta [(ruta del .txt o None, scripts)] como un grafo de tareas con el
+    Planificador, bajo el presupuesto global y con el pool de Chrome
+    compartido. Devuelve cuántos scripts tuvieron éxito.
+    """
+    from descargas import usar_selenium
+    tareas = tareas_de(eventos)
+    for tarea in tareas:
+        if tarea["depende"]:
+            previas = ", ".join(tareas[j]["archivo"] for j in sorted(tarea["depende"]))
+            print(f"🧩 {tarea['evento']}: {tarea['archivo']} espera a {previas}")
+
+    planificador = Planificador(MAX_PROCESOS, MAX_NAVEGADORES, MAX_EVENTOS, usar_selenium())
+    pool = iniciar_pool_navegadores(MAX_NAVEGADORES)
+    try:
+        return planificador.ejecutar(tareas)
+    finally:
+        if pool:
+            pool.detener_pool()
+            print("\n🔒 Pool de Chrome cerrado")
+
+
+# Nombre con el que cada script escribe fallidos/<script>.txt → opción del menú
+SCRIPT_DE_FALLIDOS = {
+    'equipos_jugadores': "1",
+    'partidos':          "2",
+    'vlr_corregido':     "3",
+    'stats_pro':         "4",
+    'stats_pro_china':   "4",
+    'enfrentamientos':   "5",
+    'economia':          "6",
+    'partido_completo':  "7",
+}
+
+
+def equipos_con_fallidos():
+    """True si la última ejecución del script 1 dejó fallidos/equipos_jugadores.txt."""
+    from reintentos import CARPETA_FALLIDOS
+    return os.path.exists(os.path.join(OUTPUT_DIR, CARPETA_FALLIDOS, "equipos_jugadores.txt"))
+
+
+def scripts_con_fallidos(ruta_txt, avisar=True):
+    """Scripts del evento que dejaron una lista de fallidos (<carpeta>/fallidos/<script>.txt)."""
+    import glob
+    from reintentos import CARPETA_FALLIDOS
+
+    carpeta = os.path.join(OUTPUT_DIR, nombre_evento_de(ruta_txt), CARPETA_FALLIDOS)
+    keys = []
+    for ruta in sorted(glob.glob(os.path.join(carpeta, "*.txt"))):
+        key = SCRIPT_DE_FALLIDOS.get(os.path.splitext(os.path.basename(ruta))[0])
+        if key and key not in keys:
+            with open(ruta, 'r', encoding='utf-8') as f:
+                pendientes = sum(1 for linea in f if linea.strip())
+            if avisar:
+                print(f"📮 {os.path.basename(ruta_txt)}: {pendientes} partidos fallidos → script {key}")
+            keys.append(key)
+    return keys
+
+
+def reintentar_fallidos():
+    """
+    Opción [F]: relanza solo los scripts que dejaron una lista de fallidos
+    (<carpeta>/fallidos/<script>.txt). Los partidos que sí terminaron tienen
+    checkpoint, así que cada script vuelve a descargar únicamente los que
+    fallaron; si esta vez salen bien, su lista de fallidos desaparece.
+    """
+    import glob
 
+    # Liquipedia (script 1) no tiene checkpoints: se relanza entero
+    if equipos_con_fallidos():
+        print("\n📮 Equipos y jugadores con fallos → relanzando script 1")
+        ejecutar_script("1")
+
+    eventos = []
+    for ruta_txt in sorted(glob.glob(os.path.join(OUTPUT_DIR, "*.txt"))):
+        keys = scripts_con_fallidos(ruta_txt)
+        if keys:
+            eventos.append((ruta_txt, keys))
+
+    if not eventos:
+        print("\n✅ No hay partidos fallidos pendientes.")
+        return
+    exitos = lanzar_eventos(eventos)
     print(f"\n{'=' * 60}")
-    print(f"Resultado: {exitos}/{len(SCRIPTS)} scripts completados")
+    print(f"Resultado: {exitos}/{sum(len(keys) for _, keys in eventos)} scripts completados")
+
+
+def preparar_perfilado():
+    """Con ALETHEIA_PERFIL, los perfiles de la sesión van a output_data/perfiles/<fecha>/."""
+    from perfilado import carpeta_de_sesion
+    if os.environ.get("ALETHEIA_PERFIL"):
+        os.environ.setdefault("ALETHEIA_PERFIL_DIR", carpeta_de_sesion())
+
+
+def alternar_perfilado():
+    """
+    Opción [P]: activa o desactiva el perfilado (cProfile) de los scripts que
+    se lancen desde el menú. Cada script escribe su perfil al terminar y al
+    final de cada opción se imprime el informe combinado de la sesión.
+    """
+    if os.environ.pop("ALETHEIA_PERFIL", None):
+        print("\n🔥 Perfilado desactivado")
+        return
+    os.environ["ALETHEIA_PERFIL"] = "determinista"
+    preparar_perfilado()
+    print(f"\n🔥 Perfilado activado → {os.environ['ALETHEIA_PERFIL_DIR']}")
+
+
+def mostrar_resumenes():
+    """
+    Resúmenes de la sesión: con ALETHEIA_TRAZA, la traza por script y etapa;
+    con ALETHEIA_PERFIL, el top de funciones de todos los perfiles.
+    """
+    import traza
+    from perfilado import informe
+    if traza.ACTIVA and os.path.exists(traza.RUTA):
+        print("\n" + traza.texto_resumen(traza.RUTA))
+    carpeta = os.environ.get("ALETHEIA_PERFIL_DIR")
+    if os.environ.get("ALETHEIA_PERFIL") and carpeta and os.path.isdir(carpeta):
+        texto = informe(carpeta)
+        if texto:
+            print("\n" + texto)
+            print(f"\n🔥 Informe guardado en: {os.path.join(carpeta, 'informe.txt')}")
+
+
+# ── Modo por lotes (sin menú) ───────────────────────────────────────────────
+# Códigos de salida de `python main.py --...`
+SALIDA_OK = 0            # todos los scripts terminaron bien (o no había nada que hacer)
+SALIDA_ERRORES = 1       # algún script terminó con error
+SALIDA_USO = 2           # argumentos inválidos o evento inexistente (igual que argparse)
+SALIDA_PARCIAL = 3       # scripts bien, pero quedaron partidos en fallidos/ (reintentar con --modo fallidos)
+SALIDA_INTERRUMPIDA = 130
+
+
+def argumentos_lote():
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog="main.py",
+        description="Ejecución por lotes, sin menú ni preguntas (cron, workers sin terminal).",
+    )
+    parser.add_argument("--eventos", help="eventos separados por coma: nombre del .txt sin 'enlaces_', "
+                                          "nombre del archivo o ruta (por defecto, todos los .txt de output_data/)")
+    parser.add_argument("--etapas", help="scripts separados por coma (1-7; por defecto 1 y "
+                                         f"{','.join(SCRIPTS_EVENTO)} en cada evento)")
+    parser.add_argument("--modo", choices=["pendientes", "incremental", "fallidos", "forzar"],
+                        default="pendientes",
+                        help="pendientes = [A] (eventos sin carpeta), incremental = [U], fallidos = [F], "
+                             "forzar = relanzar las etapas en todos los eventos elegidos")
+    parser.add_argument("--url-evento", action="append", default=[], metavar="URL",
+                        help="extraer antes los enlaces de este evento de VLR.gg (script 0); se puede repetir")
+    parser.add_argument("--procesos", type=int, help="scripts a la vez (ALETHEIA_MAX_PROCESOS)")
+    parser.add_argument("--navegadores", type=int, help="scripts con Chrome a la vez (ALETHEIA_MAX_NAVEGADORES)")
+    parser.add_argument("--eventos-paralelos", type=int, help="eventos a la vez (ALETHEIA_EVENTOS_PARALELOS)")
+    parser.add_argument("--formato", choices=["parquet", "xlsx", "parquet,xlsx"],
+                        help="formatos de las tablas (ALETHEIA_FORMATOS)")
+    parser.add_argument("--motor", choices=["selenium", "estatico"], help="ALETHEIA_MOTOR")
+    return parser
+
+
+def configurar_lote(args):
+    """Traslada los argumentos a las variables globales y al entorno de los scripts."""
+    global MAX_PROCESOS, MAX_NAVEGADORES, MAX_EVENTOS
+    # Ningún script puede quedarse esperando una respuesta (ver scripts/interaccion.py)
+    os.environ["ALETHEIA_NO_INTERACTIVO"] = "1"
+    if args.formato:
+        os.environ["ALETHEIA_FORMATOS"] = args.formato
+    if args.motor:
+        os.environ["ALETHEIA_MOTOR"] = args.motor
+    if args.procesos:
+        MAX_PROCESOS = args.procesos
+        if not args.eventos_paralelos and "ALETHEIA_EVENTOS_PARALELOS" not in os.environ:
+            MAX_EVENTOS = max(1, -(-MAX_PROCESOS // len(SCRIPTS_EVENTO)))
+    if args.navegadores:
+        MAX_NAVEGADORES = args.navegadores
+    if args.eventos_paralelos:
+        MAX_EVENTOS = args.eventos_paralelos
+    os.environ["ALETHEIA_MAX_PROCESOS"] = str(MAX_PROCESOS)
+    os.environ["ALETHEIA_MAX_NAVEGADORES"] = str(MAX_NAVEGADORES)
+    os.environ["ALETHEIA_EVENTOS_PARALELOS"] = str(MAX_EVENTOS)
+
+
+def elegir_txt(nombres, archivos_txt):
+    """Rutas de los .txt de `nombres` (evento, archivo o ruta); None si alguno no existe."""
+    rutas = []
+    for nombre in nombres:
+        candidatos = [r for r in archivos_txt
+                      if nombre in (nombre_evento_de(r), os.path.basename(r), os.path.splitext(os.path.basename(r))[0])]
+        if os.path.isfile(nombre):
+            candidatos = [os.path.abspath(nombre)]
+        if not candidatos:
+            print(f"❌ Evento desconocido: {nombre} (no hay .txt en output_data/ con ese nombre)")
+            return None
+        rutas.extend(r for r in candidatos if r not in rutas)
+    return rutas
+
+
+def ejecutar_lote(argv):
+    """
+    python main.py --eventos ... --etapas ...: mismo trabajo que [A] / [U] / [F]
+    sin menú ni preguntas, para ejecuciones programadas. Devuelve el código de
+    salida (SALIDA_*).
+    """
+    import glob
+    parser = argumentos_lote()
+    args = parser.parse_args(argv)
+
+    etapas = [e.strip() for e in args.etapas.split(",") if e.strip()] if args.etapas else ["1"] + SCRIPTS_EVENTO
+    desconocidas = [e for e in etapas if e not in SCRIPTS or e in SCRIPTS_SECUENCIALES]
+    if desconocidas:
+        parser.error(f"etapas no válidas: {', '.join(desconocidas)} (usa 1-7; el 0 va con --url-evento)")
+    configurar_lote(args)
+
+    import traza
+    traza.compartir_ruta()
+    preparar_perfilado()
+
+    total = exitos = 0
+    anteriores = set(glob.glob(os.path.join(OUTPUT_DIR, "*.txt")))
+    for url in args.url_evento:
+        total += 1
+        exito, salida = ejecutar_script_paralelo("0", env_extra={"ALETHEIA_EVENTO_URL": url})
+        print(salida)
+        exitos += exito
+
+    archivos_txt = sorted(glob.glob(os.path.join(OUTPUT_DIR, "*.txt")))
+    if args.eventos:
+        archivos_txt = elegir_txt([n.strip() for n in args.eventos.split(",") if n.strip()], archivos_txt)
+        if archivos_txt is None:
+            return SALIDA_USO
+        # Los eventos recién extraídos con --url-evento entran aunque no se nombren
+        archivos_txt += sorted(set(glob.glob(os.path.join(OUTPUT_DIR, "*.txt"))) - anteriores - set(archivos_txt))
+    etapas_evento = [e for e in etapas if e != "1"]
+
+    eventos = []
+    if "1" in etapas:
+        if args.modo == "forzar" or (args.modo == "fallidos" and equipos_con_fallidos()) \
+                or (args.modo in ("pendientes", "incremental") and not salidas_existen("1")):
+            eventos.append((None, ["1"]))
+    if args.modo in ("pendientes", "incremental"):
+        pendientes, _ = eventos_pendientes(archivos_txt, etapas_evento, args.modo == "incremental")
+        eventos.extend(pendientes)
+    elif args.modo == "fallidos":
+        for ruta_txt in archivos_txt:
+            keys = [k for k in scripts_con_fallidos(ruta_txt) if k in etapas_evento]
+            if keys:
+                eventos.append((ruta_txt, keys))
+    elif etapas_evento:
+        eventos.extend((ruta_txt, etapas_evento) for ruta_txt in archivos_txt)
+
+    print(f"\n⚙️  Lote: {len(archivos_txt)} eventos · modo {args.modo} · etapas {', '.join(etapas)} · "
+          f"{MAX_PROCESOS} procesos · {MAX_NAVEGADORES} Chrome · {MAX_EVENTOS} eventos a la vez")
+    if eventos:
+        total += sum(len(keys) for _, keys in eventos)
+        exitos += lanzar_eventos(eventos)
+    else:
+        print("\n✅ No hay nada que hacer.")
+
+    con_fallidos = [os.path.basename(r) for r in archivos_txt if scripts_con_fallidos(r, avisar=False)]
+    if equipos_con_fallidos():
+        con_fallidos.append("equipos_jugadores")
+    mostrar_resumenes()
+    print(f"\n{'=' * 60}")
+    print(f"Resultado: {exitos}/{total} scripts completados")
+    if exitos < total:
+        return SALIDA_ERRORES
+    if con_fallidos:
+        print(f"📮 Quedan partidos fallidos en: {', '.join(con_fallidos)}")
+        return SALIDA_PARCIAL
+    return SALIDA_OK
 
 
 def main():
+    if len(sys.argv) > 1:
+        try:
+            sys.exit(ejecutar_lote(sys.argv[1:]))
+        except KeyboardInterrupt:
+            print("\n⛔ Interrumpido")
+            sys.exit(SALIDA_INTERRUMPIDA)
+
+    import traza
+    traza.compartir_ruta()
+    preparar_perfilado()
     while True:
         mostrar_menu()
         opcion = input("  Selecciona una opción: ").strip().upper()
@@ -283,8 +777,20 @@ def main():
             print("\n🔄 Ejecutando todos los scripts...")
             print("   (Los scripts que ya generaron sus archivos serán omitidos)")
             ejecutar_todos()
+            mostrar_resumenes()
+        elif opcion == "U":
+            print("\n🔄 Actualizando eventos: solo partidos nuevos o fallidos...")
+            ejecutar_todos(incremental=True)
+            mostrar_resumenes()
+        elif opcion == "F":
+            print("\n📮 Reintentando solo los partidos que fallaron...")
+            reintentar_fallidos()
+            mostrar_resumenes()
+        elif opcion == "P":
+            alternar_perfilado()
         elif opcion in SCRIPTS:
             ejecutar_script(opcion)
+            mostrar_resumenes()
         else:
             print("  ⚠️ Opción no válida. Intenta de nuevo.")
 
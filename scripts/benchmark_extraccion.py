@@ -0,0 +1,418 @@
+"""
+ALETHEIA - Benchmark de extremo a extremo de la extracción
+Mide los extractores sobre un corpus fijo de páginas grabadas (ver
+grabacion.py), servido por el servidor local de reproducción, para saber si
+un cambio hizo más rápido o más lento algún script antes de un backfill.
+
+Dos niveles:
+  tablas   en este proceso, por partido del corpus: descarga de cada
+           pestaña desde el servidor, parseo (partido.parsear_pagina) y
+           emisión de cada tabla (el parser que la genera). Mejor de
+           ALETHEIA_BENCH_REPETICIONES repeticiones.
+  scripts  cada script (2-7 y el motor China) como subproceso contra el
+           servidor, con caché vacía y motor estático: segundos, páginas/s,
+           filas/s y pico de memoria (RSS máximo del proceso).
+
+Cada ejecución añade una línea JSON al historial y se compara con la
+anterior del mismo corpus: si alguna medida de tiempo o de memoria empeora
+más de ALETHEIA_BENCH_TOLERANCIA, se avisa y el script termina con código 1.
+
+Corpus recomendado: un Bo3 y un Bo5 por región, China incluida, grabados
+una vez con el extractor unificado:
+  ALETHEIA_GRABAR=grabaciones/benchmark ALETHEIA_TXT_FILE=enlaces_benchmark.txt \\
+      python scripts/scrapear_partido_completo.py
+
+Uso:
+  python scripts/benchmark_extraccion.py                    # grabaciones/benchmark
+  python scripts/benchmark_extraccion.py grabaciones/otro
+
+Variables de entorno:
+  ALETHEIA_BENCH_REPETICIONES  repeticiones por medida de tablas (por defecto 3)
+  ALETHEIA_BENCH_LATENCIA_MS   latencia simulada del servidor (por defecto 0)
+  ALETHEIA_BENCH_KBPS          ancho de banda simulado en KB/s (por defecto 0 = sin límite)
+  ALETHEIA_BENCH_SCRIPTS       scripts a medir, separados por coma (por defecto
+                               todos; vacío = solo tablas)
+  ALETHEIA_BENCH_HISTORIAL     historial JSON lines (por defecto output_data/benchmarks/historial.jsonl)
+  ALETHEIA_BENCH_TOLERANCIA    empeoramiento permitido (por defecto 0.25 = 25 %)
+"""
+
+import contextlib
+import io
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+REPETICIONES = int(os.environ.get("ALETHEIA_BENCH_REPETICIONES", "3"))
+LATENCIA_MS = float(os.environ.get("ALETHEIA_BENCH_LATENCIA_MS", "0"))
+KBPS = float(os.environ.get("ALETHEIA_BENCH_KBPS", "0"))
+HISTORIAL = os.environ.get("ALETHEIA_BENCH_HISTORIAL",
+                           os.path.join(RAIZ, "output_data", "benchmarks", "historial.jsonl"))
+TOLERANCIA = float(os.environ.get("ALETHEIA_BENCH_TOLERANCIA", "0.25"))
+
+# Nombre del evento de las ejecuciones de scripts (output_data/<evento>/, se borra al terminar)
+EVENTO = "benchmark_extraccion"
+
+# script → tablas que escribe (el motor China se mide aparte: necesita vlr_mapas)
+SCRIPTS = {
+    'scrapear_partidos.py':         ["vct_partidos"],
+    'scrapear_vlr_corregido.py':    ["vlr_mapas", "vlr_rondas"],
+    'scrapear_stats_pro.py':        ["vlr_stats_players_sides"],
+    'scrapear_stats_pro_china.py':  ["vlr_stats_players_sides"],
+    'scrapear_enfrentamientos.py':  ["vlr_enfrentamientos", "vlr_multikills_clutches"],
+    'scrapear_economia.py':         ["vlr_economia_resumen", "vlr_economia_rondas"],
+    'scrapear_partido_completo.py': ["vct_partidos", "vlr_mapas", "vlr_rondas",
+                                     "vlr_stats_players_sides", "vlr_enfrentamientos",
+                                     "vlr_multikills_clutches", "vlr_economia_resumen",
+                                     "vlr_economia_rondas"],
+}
+
+# Medidas que, si suben, son un empeoramiento → diferencia mínima que cuenta
+# (por debajo es ruido de medida aunque supere la tolerancia relativa)
+MEDIDAS_COMPARADAS = {
+    'descarga_ms': 10, 'parseo_ms': 5, 'emision_ms': 5, 'segundos': 0.25, 'rss_max_mb': 10,
+}
+
+
+# ---------------------------------------------------------------------------
+# CORPUS
+# ---------------------------------------------------------------------------
+def partidos_del_corpus(corpus):
+    """URLs (overview) de los partidos grabados, sin repetir match_id."""
+    from partido import match_id_de_url
+    ruta = os.path.join(corpus, "urls.txt")
+    if not os.path.exists(ruta):
+        return []
+    partidos = {}
+    with open(ruta, 'r', encoding='utf-8') as f:
+        for url in (linea.strip() for linea in f):
+            match_id = match_id_de_url(url)
+            if match_id != "Unknown" and "?" not in url:
+                partidos.setdefault(match_id, url)
+    return list(partidos.values())
+
+
+def extractores():
+    """[(nombre, pestaña, función(soup, match_id, mapas) → {tabla: filas})]."""
+    import pandas as pd
+    from scrapear_partidos import parsear_cabecera
+    from scrapear_vlr_corregido import parsear_mapas_rondas
+    from scrapear_stats_pro import parsear_stats_lados
+    from scrapear_stats_pro_china import construir_lookup_rondas, generar_filas_split, parsear_stats_all
+    from scrapear_enfrentamientos import parsear_performance
+    from scrapear_economia import parsear_economia
+
+    def partidos(soup, match_id, mapas):
+        cabecera = parsear_cabecera(soup, match_id)
+        return {'vct_partidos': [cabecera] if cabecera else []}
+
+    def mapas_rondas(soup, match_id, mapas):
+        filas_mapas, rondas = parsear_mapas_rondas(soup, match_id)
+        return {'vlr_mapas': filas_mapas or [], 'vlr_rondas': rondas or []}
+
+    def stats_lados(soup, match_id, mapas):
+        return {'vlr_stats_players_sides': parsear_stats_lados(soup, match_id, mapas)}
+
+    def stats_china(soup, match_id, mapas):
+        lookup = construir_lookup_rondas(pd.DataFrame(mapas)) if mapas else {}
+        return {'vlr_stats_players_sides [China]':
+                generar_filas_split(parsear_stats_all(soup, match_id), lookup)}
+
+    def performance(soup, match_id, mapas):
+        enfrentamientos, multikills = parsear_performance(soup, match_id)
+        return {'vlr_enfrentamientos': enfrentamientos, 'vlr_multikills_clutches': multikills}
+
+    def economia(soup, match_id, mapas):
+        resumen, rondas = parsear_economia(soup, match_id)
+        return {'vlr_economia_resumen': resumen, 'vlr_economia_rondas': rondas}
+
+    return [
+        ('partidos',     'overview',    partidos),
+        ('mapas_rondas', 'overview',    mapas_rondas),
+        ('stats_lados',  'overview',    stats_lados),
+        ('stats_china',  'overview',    stats_china),
+        ('performance',  'performance', performance),
+        ('economia',     'economy',     economia),
+    ]
+
+
+def mejor_tiempo(funcion):
+    """(mejor tiempo en ms de REPETICIONES llamadas, resultado de la última)."""
+    mejor = float('inf')
+    resultado = None
+    for _ in range(max(1, REPETICIONES)):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor * 1000, resultado
+
+
+# ---------------------------------------------------------------------------
+# NIVEL 1: TABLAS (en este proceso)
+# ---------------------------------------------------------------------------
+def medir_tablas(partidos, servidor):
+    """Descarga, parseo y emisión por pestaña y por tabla sobre todo el corpus."""
+    from descargas import obtener_sesion
+    from grabacion import url_destino
+    from partido import match_id_de_url, parsear_pagina, url_pestana
+
+    sesion = obtener_sesion()
+    pestanas = {}
+    tablas = {}
+    for url in partidos:
+        match_id = match_id_de_url(url)
+        soups = {}
+        for pestana in ('overview', 'performance', 'economy'):
+            destino = url_destino(url_pestana(url, pestana), servidor)
+            ms_descarga, respuesta = mejor_tiempo(lambda: sesion.get(destino, timeout=30))
+            if respuesta.status_code != 200:
+                continue
+            html = respuesta.text
+            ms_parseo, soups[pestana] = mejor_tiempo(lambda: parsear_pagina(html))
+            medida = pestanas.setdefault(pestana, {'paginas': 0, 'kb': 0.0,
+                                                   'descarga_ms': 0.0, 'parseo_ms': 0.0})
+            medida['paginas'] += 1
+            medida['kb'] += len(respuesta.content) / 1024
+            medida['descarga_ms'] += ms_descarga
+            medida['parseo_ms'] += ms_parseo
+
+        mapas = []
+        if 'overview' in soups:
+            from scrapear_vlr_corregido import parsear_mapas_rondas
+            with contextlib.redirect_stdout(io.StringIO()):
+                mapas = parsear_mapas_rondas(soups['overview'], match_id)[0] or []
+
+        for nombre, pestana, funcion in extractores():
+            if pestana not in soups:
+                continue
+            # Los parsers imprimen su progreso: aquí no interesa
+            with contextlib.redirect_stdout(io.StringIO()):
+                ms, salida = mejor_tiempo(lambda: funcion(soups[pestana], match_id, mapas))
+            for tabla, filas in salida.items():
+                medida = tablas.setdefault(tabla, {'extractor': nombre, 'pestana': pestana,
+                                                   'paginas': 0, 'filas': 0, 'emision_ms': 0.0})
+                medida['paginas'] += 1
+                medida['filas'] += len(filas or [])
+                medida['emision_ms'] += ms / len(salida)
+
+    for medida in tablas.values():
+        pestana = pestanas[medida['pestana']]
+        paginas = pestana['paginas'] or 1
+        # Coste por página de la tabla: su descarga y parseo + su emisión
+        ms_pagina = (pestana['descarga_ms'] + pestana['parseo_ms']) / paginas + \
+            medida['emision_ms'] / max(1, medida['paginas'])
+        medida['paginas_s'] = round(1000 / ms_pagina, 2) if ms_pagina else None
+        medida['filas_s'] = round(medida['filas'] / (ms_pagina * medida['paginas'] / 1000), 1) \
+            if ms_pagina and medida['paginas'] else None
+        medida['emision_ms'] = round(medida['emision_ms'], 2)
+    for medida in pestanas.values():
+        for clave in ('kb', 'descarga_ms', 'parseo_ms'):
+            medida[clave] = round(medida[clave], 2)
+    return pestanas, tablas
+
+
+# ---------------------------------------------------------------------------
+# NIVEL 2: SCRIPTS (subprocesos contra el servidor)
+# ---------------------------------------------------------------------------
+def ejecutar_midiendo(comando, env):
+    """(código, segundos, RSS máximo en MB o None, stdout) de un subproceso."""
+    inicio = time.perf_counter()
+    proceso = subprocess.Popen(comando, cwd=SCRIPTS_DIR, env=env, stdout=subprocess.PIPE,
+                               stderr=subprocess.STDOUT, text=True, encoding="utf-8", errors="replace")
+    salida = proceso.stdout.read()
+    rss_mb = None
+    if hasattr(os, "wait4"):
+        _, estado, uso = os.wait4(proceso.pid, 0)
+        proceso.returncode = os.waitstatus_to_exitcode(estado)
+        # ru_maxrss: KB en Linux, bytes en macOS
+        rss_mb = uso.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    else:  # Windows: sin RSS máximo del hijo
+        proceso.wait()
+    return proceso.returncode, time.perf_counter() - inicio, rss_mb, salida
+
+
+def paginas_servidas(salida):
+    """Páginas que el script obtuvo (aciertos + descargas + 304), de su resumen de caché."""
+    match = re.search(r'Caché HTML: (\d+) aciertos, (\d+) descargas, (\d+) sin cambios', salida)
+    return sum(int(n) for n in match.groups()) if match else None
+
+
+def medir_scripts(partidos, env_servidor, scripts):
+    """Ejecuta cada script sobre el corpus con el motor estático y mide la ejecución."""
+    import tempfile
+    from salidas import leer_tabla
+
+    carpeta_evento = os.path.join(RAIZ, 'output_data', EVENTO)
+    resultados = {}
+    with tempfile.TemporaryDirectory(prefix="aletheia_bench_") as temporal:
+        ruta_txt = os.path.join(temporal, f"enlaces_{EVENTO}.txt")
+        with open(ruta_txt, 'w', encoding='utf-8') as f:
+            f.write("\n".join(partidos) + "\n")
+
+        for script in scripts:
+            if script == 'scrapear_stats_pro_china.py':
+                # Lee vlr_mapas: dejar solo esa tabla, escrita por el script 3
+                shutil.rmtree(carpeta_evento, ignore_errors=True)
+                ejecutar_midiendo([sys.executable, 'scrapear_vlr_corregido.py'],
+                                  dict(env_servidor, ALETHEIA_TXT_FILE=ruta_txt,
+                                       ALETHEIA_MOTOR="estatico", ALETHEIA_PAUSA_HTTP="0"))
+            else:
+                shutil.rmtree(carpeta_evento, ignore_errors=True)
+
+            env = dict(env_servidor, ALETHEIA_TXT_FILE=ruta_txt, ALETHEIA_MOTOR="estatico",
+                       ALETHEIA_PAUSA_HTTP="0", ALETHEIA_CHECKPOINTS="0")
+            # Caché vacía para cada script: todas sus páginas salen del servidor
+            cache = env["ALETHEIA_CACHE_DIR"]
+            shutil.rmtree(cache, ignore_errors=True)
+            print(f"   ▶ {script}...")
+            codigo, segundos, rss_mb, salida = ejecutar_midiendo([sys.executable, script], env)
+
+            filas = 0
+            for tabla in SCRIPTS[script]:
+                df = leer_tabla(carpeta_evento, tabla)
+                filas += 0 if df is None else len(df)
+            paginas = paginas_servidas(salida)
+            resultados[script] = {
+                'codigo': codigo,
+                'segundos': round(segundos, 3),
+                'paginas': paginas,
+                'paginas_s': round(paginas / segundos, 2) if paginas else None,
+                'filas': filas,
+                'filas_s': round(filas / segundos, 1),
+                'rss_max_mb': round(rss_mb, 1) if rss_mb is not None else None,
+            }
+            if codigo != 0:
+                print(f"     ❌ código {codigo}; últimas líneas:\n" + "\n".join(salida.splitlines()[-10:]))
+
+    shutil.rmtree(carpeta_evento, ignore_errors=True)
+    return resultados
+
+
+# ---------------------------------------------------------------------------
+# HISTORIAL Y COMPARACIÓN
+# ---------------------------------------------------------------------------
+def commit_actual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def ultima_ejecucion(corpus):
+    """Última entrada del historial con el mismo corpus, o None."""
+    if not os.path.exists(HISTORIAL):
+        return None
+    ultima = None
+    with open(HISTORIAL, 'r', encoding='utf-8') as f:
+        for linea in f:
+            try:
+                entrada = json.loads(linea)
+            except ValueError:
+                continue
+            if entrada.get('corpus') == corpus:
+                ultima = entrada
+    return ultima
+
+
+def empeoramientos(anterior, actual):
+    """['scripts/scrapear_economia.py segundos: 1.20 → 1.80 (+50%)', ...]."""
+    avisos = []
+    for seccion in ('pestanas', 'tablas', 'scripts'):
+        for nombre, medidas in actual.get(seccion, {}).items():
+            previas = anterior.get(seccion, {}).get(nombre, {})
+            for medida, minimo in MEDIDAS_COMPARADAS.items():
+                antes, ahora = previas.get(medida), medidas.get(medida)
+                if antes and ahora is not None and ahora > antes * (1 + TOLERANCIA) \
+                        and ahora - antes >= minimo:
+                    avisos.append(f"{seccion}/{nombre} {medida}: {antes} → {ahora} "
+                                  f"(+{(ahora / antes - 1) * 100:.0f}%)")
+    return avisos
+
+
+def guardar_en_historial(entrada):
+    os.makedirs(os.path.dirname(os.path.abspath(HISTORIAL)), exist_ok=True)
+    with open(HISTORIAL, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(entrada, ensure_ascii=False) + "\n")
+
+
+# ---------------------------------------------------------------------------
+# MAIN
+# ---------------------------------------------------------------------------
+def main():
+    corpus = sys.argv[1] if len(sys.argv) > 1 else os.path.join(RAIZ, "grabaciones", "benchmark")
+    corpus_rel = os.path.relpath(os.path.abspath(corpus), os.path.abspath(RAIZ))
+    partidos = partidos_del_corpus(corpus)
+    if not partidos:
+        print(f"⚠️ {corpus} no tiene partidos grabados (urls.txt). Graba antes el corpus con ALETHEIA_GRABAR.")
+        return 1
+
+    seleccion = os.environ.get("ALETHEIA_BENCH_SCRIPTS")
+    scripts = list(SCRIPTS) if seleccion is None else \
+        [s.strip() for s in seleccion.split(",") if s.strip() in SCRIPTS]
+
+    from grabacion import reproduciendo
+
+    print(f"📼 Corpus: {corpus_rel} · {len(partidos)} partidos · latencia {LATENCIA_MS} ms · "
+          f"{f'{KBPS} KB/s' if KBPS else 'sin límite de ancho de banda'}")
+    with reproduciendo(corpus, LATENCIA_MS, KBPS) as env:
+        print(f"\n⏱️  Tablas (mejor de {REPETICIONES})...")
+        pestanas, tablas = medir_tablas(partidos, env["ALETHEIA_REPRODUCIR"])
+        print(f"\n🚀 Scripts ({len(scripts)})...")
+        resultados_scripts = medir_scripts(partidos, env, scripts)
+
+    print(f"\n{'pestaña':<14}{'páginas':>8}{'KB':>9}{'descarga':>12}{'parseo':>11}")
+    for nombre, m in pestanas.items():
+        print(f"{nombre:<14}{m['paginas']:>8}{m['kb']:>9.0f}{m['descarga_ms']:>10.1f}ms{m['parseo_ms']:>9.1f}ms")
+
+    print(f"\n{'tabla':<36}{'filas':>7}{'emisión':>11}{'pág/s':>9}{'filas/s':>10}")
+    for nombre, m in tablas.items():
+        print(f"{nombre:<36}{m['filas']:>7}{m['emision_ms']:>9.1f}ms"
+              f"{m['paginas_s'] or 0:>9.1f}{m['filas_s'] or 0:>10.0f}")
+
+    if resultados_scripts:
+        print(f"\n{'script':<32}{'s':>8}{'pág/s':>8}{'filas/s':>10}{'RSS máx':>11}")
+        for nombre, m in resultados_scripts.items():
+            rss = f"{m['rss_max_mb']:.0f} MB" if m['rss_max_mb'] is not None else "—"
+            estado = "" if m['codigo'] == 0 else f"  ❌ código {m['codigo']}"
+            print(f"{nombre:<32}{m['segundos']:>8.2f}{m['paginas_s'] or 0:>8.1f}"
+                  f"{m['filas_s']:>10.0f}{rss:>11}{estado}")
+
+    entrada = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit_actual(),
+        'corpus': corpus_rel,
+        'partidos': len(partidos),
+        'repeticiones': REPETICIONES,
+        'latencia_ms': LATENCIA_MS,
+        'kbps': KBPS,
+        'pestanas': pestanas,
+        'tablas': tablas,
+        'scripts': resultados_scripts,
+    }
+    anterior = ultima_ejecucion(corpus_rel)
+    guardar_en_historial(entrada)
+    print(f"\n💾 Historial: {HISTORIAL}")
+
+    if anterior is None:
+        print("   Primera ejecución con este corpus: nada con qué comparar.")
+        return 0
+    avisos = empeoramientos(anterior, entrada)
+    if not avisos:
+        print(f"✅ Sin empeoramientos de más del {TOLERANCIA * 100:.0f}% frente a {anterior.get('commit')}")
+        return 0
+    print(f"❌ {len(avisos)} medidas empeoran más del {TOLERANCIA * 100:.0f}% frente a {anterior.get('commit')}:")
+    for aviso in avisos:
+        print(f"   • {aviso}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
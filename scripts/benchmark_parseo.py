@@ -0,0 +1,120 @@
+"""
+ALETHEIA - Benchmark de parseo sobre páginas guardadas
+Mide, para cada página de partido de la caché (cache_html/ o
+ALETHEIA_CACHE_DIR), el tiempo de construir el árbol con:
+
+  html.parser  página completa (lo que hacían antes los scripts)
+  lxml         página completa
+  acotado      lxml con solo la cabecera y los contenedores vm-stats-game
+               (partido.parsear_pagina, lo que usan ahora)
+
+y comprueba que los parsers de cada pestaña devuelven exactamente las
+mismas filas sobre el árbol completo y sobre el acotado.
+
+Uso:
+  python scripts/benchmark_parseo.py                 # toda la caché
+  python scripts/benchmark_parseo.py 598923 598924   # solo esos partidos
+  ALETHEIA_BENCH_REPETICIONES=10 python scripts/benchmark_parseo.py
+"""
+
+import contextlib
+import glob
+import io
+import os
+import re
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+from cache_paginas import CACHE_DIR
+from partido import parsear_pagina
+
+REPETICIONES = int(os.environ.get("ALETHEIA_BENCH_REPETICIONES", "5"))
+
+
+def parsers_de_pestana(pestana):
+    """Funciones soup → filas que se comparan entre árbol completo y acotado."""
+    if pestana == 'overview':
+        from scrapear_partidos import parsear_cabecera
+        from scrapear_vlr_corregido import parsear_mapas_rondas
+        from scrapear_stats_pro_china import parsear_stats_all
+        return [parsear_cabecera, parsear_mapas_rondas, parsear_stats_all]
+    if pestana == 'performance':
+        from scrapear_enfrentamientos import parsear_performance
+        return [parsear_performance]
+    if pestana == 'economy':
+        from scrapear_economia import parsear_economia
+        return [parsear_economia]
+    return []
+
+
+def cronometrar(funcion, html):
+    """Mejor tiempo (ms) de REPETICIONES llamadas; el mejor evita el ruido."""
+    mejor = float('inf')
+    for _ in range(REPETICIONES):
+        inicio = time.perf_counter()
+        funcion(html)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor * 1000
+
+
+def mismas_filas(pestana, html, match_id):
+    """True si cada parser de la pestaña da lo mismo con ambos árboles."""
+    for parser in parsers_de_pestana(pestana):
+        # Los parsers imprimen su progreso: aquí no interesa
+        with contextlib.redirect_stdout(io.StringIO()):
+            completo = parser(BeautifulSoup(html, 'lxml'), match_id)
+            acotado = parser(parsear_pagina(html), match_id)
+        if completo != acotado:
+            return False
+    return True
+
+
+def paginas_a_medir(match_ids):
+    rutas = sorted(glob.glob(os.path.join(CACHE_DIR, "*.html")))
+    for ruta in rutas:
+        clave = re.match(r'(\d+)_(overview|performance|economy)\.html$', os.path.basename(ruta))
+        if clave and (not match_ids or clave.group(1) in match_ids):
+            yield ruta, clave.group(1), clave.group(2)
+
+
+def main():
+    match_ids = set(sys.argv[1:])
+    print(f"📂 Caché: {os.path.abspath(CACHE_DIR)}  ·  mejor de {REPETICIONES} repeticiones")
+    print(f"\n{'página':<26}{'KB':>7}{'html.parser':>13}{'lxml':>9}{'acotado':>10}{'mejora':>9}  filas")
+
+    totales = {'html.parser': 0.0, 'lxml': 0.0, 'acotado': 0.0}
+    paginas = 0
+    for ruta, match_id, pestana in paginas_a_medir(match_ids):
+        with open(ruta, 'r', encoding='utf-8') as f:
+            html = f.read()
+
+        tiempos = {
+            'html.parser': cronometrar(lambda h: BeautifulSoup(h, 'html.parser'), html),
+            'lxml':        cronometrar(lambda h: BeautifulSoup(h, 'lxml'), html),
+            'acotado':     cronometrar(parsear_pagina, html),
+        }
+        for motor, ms in tiempos.items():
+            totales[motor] += ms
+        paginas += 1
+
+        mejora = tiempos['html.parser'] / tiempos['acotado'] if tiempos['acotado'] else 0
+        iguales = "✅ iguales" if mismas_filas(pestana, html, match_id) else "❌ DISTINTAS"
+        print(f"{match_id + '_' + pestana:<26}{len(html) / 1024:>7.0f}"
+              f"{tiempos['html.parser']:>11.1f}ms{tiempos['lxml']:>7.1f}ms"
+              f"{tiempos['acotado']:>8.1f}ms{mejora:>8.1f}x  {iguales}")
+
+    if not paginas:
+        print("\n⚠️ No hay páginas de partido en la caché. Ejecuta antes algún script de VLR.gg.")
+        return
+
+    print(f"\n📊 {paginas} páginas · media por página:")
+    for motor, total in totales.items():
+        print(f"   • {motor:<12}{total / paginas:>8.1f} ms")
+    print(f"   • Reducción frente a html.parser: "
+          f"{(1 - totales['acotado'] / totales['html.parser']) * 100:.0f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""
+ALETHEIA - Caché compartida de páginas HTML
+Guarda en disco el HTML de cada página descargada para que todos los scripts
+de un evento reutilicen la misma descarga.
+
+Clave de cada página:
+  - Partidos de VLR.gg → match_id + pestaña
+      https://www.vlr.gg/598923/...                  → 598923_overview
+      https://www.vlr.gg/598923/...?tab=performance  → 598923_performance
+      https://www.vlr.gg/598923/...?tab=economy      → 598923_economy
+  - Cualquier otra URL (Liquipedia, páginas de evento) → hash de la URL
+
+Política:
+  - TTL: una página más vieja que ALETHEIA_CACHE_TTL_HORAS se vuelve a descargar.
+  - Tamaño: si la caché supera ALETHEIA_CACHE_MAX_MB se desalojan primero
+    las páginas usadas hace más tiempo.
+  - Nunca se guardan las páginas "Access Denied" de VLR.gg.
+  - Peticiones condicionales: junto a cada página se guardan su ETag y su
+    Last-Modified (<clave>.validadores.json). Cuando la copia expira (o el
+    script pide revalidar), descargas.py envía If-None-Match /
+    If-Modified-Since; un 304 renueva la copia guardada sin bajarla de
+    nuevo y pagina_sin_cambios() permite al script no volver a parsearla.
+    Las páginas expiradas con validadores no se borran por TTL.
+
+Variables de entorno:
+  ALETHEIA_CACHE_DIR          carpeta de la caché (por defecto cache_html/)
+  ALETHEIA_CACHE_TTL_HORAS    validez de una página en horas (por defecto 72)
+  ALETHEIA_CACHE_MAX_MB       tamaño máximo de la caché (por defecto 500)
+  ALETHEIA_CACHE_OFFLINE=1    nunca descargar: solo re-parsear lo guardado
+  ALETHEIA_CACHE_DESACTIVADA=1  ignorar la caché por completo
+
+Con ALETHEIA_GRABAR cada página que devuelve obtener_html() se copia
+también al archivo de grabación (ver grabacion.py).
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+# Módulo completo (no nombres): grabacion.py también importa este módulo
+import grabacion
+import traza
+
+CACHE_DIR = os.environ.get(
+    "ALETHEIA_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'cache_html'),
+)
+TTL_SEGUNDOS = float(os.environ.get("ALETHEIA_CACHE_TTL_HORAS", "72")) * 3600
+MAX_BYTES = int(float(os.environ.get("ALETHEIA_CACHE_MAX_MB", "500")) * 1024 * 1024)
+OFFLINE = os.environ.get("ALETHEIA_CACHE_OFFLINE") == "1"
+DESACTIVADA = os.environ.get("ALETHEIA_CACHE_DESACTIVADA") == "1"
+
+# Contadores del proceso actual (se muestran en el resumen de cada script)
+ESTADISTICAS = {'aciertos': 0, 'descargas': 0, 'revalidadas': 0, 'fallos': 0}
+_candado_estadisticas = threading.Lock()
+
+# Claves de las páginas que el servidor confirmó sin cambios (304) en este proceso
+SIN_CAMBIOS = set()
+
+
+def _contar(contador):
+    with _candado_estadisticas:
+        ESTADISTICAS[contador] += 1
+    traza.contar(f"cache_{contador}")
+
+
+# ---------------------------------------------------------------------------
+# CLAVES Y RUTAS
+# ---------------------------------------------------------------------------
+def clave_pagina(url):
+    """
+    Devuelve la clave de caché de una URL.
+    Las páginas de partido de VLR.gg se identifican por match_id + pestaña,
+    así la misma página es compartida aunque cada script la pida con un
+    slug o una barra final distinta.
+    """
+    match = re.search(r'vlr\.gg/(\d+)', url)
+    if match:
+        tab = re.search(r'[?&]tab=([\w-]+)', url)
+        pestana = tab.group(1) if tab else "overview"
+        return f"{match.group(1)}_{pestana}"
+    return "url_" + hashlib.sha1(url.encode('utf-8')).hexdigest()[:20]
+
+
+def ruta_pagina(url):
+    return os.path.join(CACHE_DIR, clave_pagina(url) + ".html")
+
+
+def ruta_validadores(url):
+    return os.path.join(CACHE_DIR, clave_pagina(url) + ".validadores.json")
+
+
+def es_pagina_bloqueada(html):
+    """True si el HTML es la página de bloqueo de VLR.gg (no debe cachearse)."""
+    cabecera = html[:2000]
+    return "<title>Access Denied" in cabecera or "<TITLE>Access Denied" in cabecera
+
+
+# ---------------------------------------------------------------------------
+# LECTURA / ESCRITURA
+# ---------------------------------------------------------------------------
+def pagina_en_cache(url):
+    """True si la página está en caché y sigue vigente."""
+    if DESACTIVADA:
+        return False
+    ruta = ruta_pagina(url)
+    if not os.path.exists(ruta):
+        return False
+    return OFFLINE or (time.time() - os.path.getmtime(ruta)) < TTL_SEGUNDOS
+
+
+def leer_pagina(url, incluso_vencida=False):
+    """Devuelve el HTML guardado o None si no existe o expiró."""
+    if DESACTIVADA or not (incluso_vencida or pagina_en_cache(url)):
+        return None
+    ruta = ruta_pagina(url)
+    try:
+        with open(ruta, 'r', encoding='utf-8') as f:
+            html = f.read()
+    except OSError:
+        return None
+    # Marcar como usada recientemente (para el desalojo LRU) sin tocar mtime,
+    # que es lo que mide el TTL.
+    try:
+        os.utime(ruta, (time.time(), os.path.getmtime(ruta)))
+    except OSError:
+        pass
+    return html
+
+
+def guardar_pagina(url, html):
+    """
+    Guarda el HTML de forma atómica (varios scripts pueden escribir la misma
+    página a la vez) y aplica el límite de tamaño.
+    """
+    if DESACTIVADA or not html or es_pagina_bloqueada(html):
+        return
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    ruta = ruta_pagina(url)
+    temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporal, 'w', encoding='utf-8') as f:
+        f.write(html)
+    os.replace(temporal, ruta)
+    desalojar_si_excede()
+
+
+def leer_validadores(url):
+    """{'etag', 'last_modified'} de la copia guardada de `url` ({} si no hay)."""
+    if DESACTIVADA or OFFLINE or not os.path.exists(ruta_pagina(url)):
+        return {}
+    try:
+        with open(ruta_validadores(url), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def guardar_validadores(url, etag=None, last_modified=None):
+    """Guarda los validadores de una respuesta 200 (o los borra si no trae)."""
+    with _candado_estadisticas:
+        SIN_CAMBIOS.discard(clave_pagina(url))
+    if DESACTIVADA:
+        return
+    validadores = {'etag': etag, 'last_modified': last_modified}
+    validadores = {k: v for k, v in validadores.items() if v}
+    ruta = ruta_validadores(url)
+    if not validadores:
+        _borrar(ruta)
+        return
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(validadores, f)
+    os.replace(temporal, ruta)
+
+
+def marcar_sin_cambios(url):
+    """
+    El servidor respondió 304: la copia guardada sigue valiendo. Renueva su
+    TTL y la devuelve (None si entre medias se desalojó).
+    """
+    html = leer_pagina(url, incluso_vencida=True)
+    if html is None:
+        return None
+    try:
+        os.utime(ruta_pagina(url))
+    except OSError:
+        pass
+    with _candado_estadisticas:
+        SIN_CAMBIOS.add(clave_pagina(url))
+        ESTADISTICAS['revalidadas'] += 1
+    traza.contar("cache_revalidadas")
+    return html
+
+
+def pagina_sin_cambios(url):
+    """True si en este proceso el servidor confirmó con 304 que `url` no cambió."""
+    with _candado_estadisticas:
+        return clave_pagina(url) in SIN_CAMBIOS
+
+
+def obtener_html(url, descargar, revalidar=False):
+    """
+    Devuelve el HTML de `url` desde la caché o, si no está, llamando a
+    `descargar()` (función sin argumentos que devuelve el HTML o None).
+    Con revalidar=True la copia guardada no se da por buena sin preguntar:
+    siempre se llama a `descargar()`, que con el motor HTTP hace una
+    petición condicional (304 si no cambió).
+
+    En modo offline nunca se llama a `descargar`: si la página no está
+    guardada se devuelve None.
+    """
+    html = None if revalidar and not OFFLINE else leer_pagina(url)
+    if html is not None:
+        _contar('aciertos')
+        print(f"  💾 Caché: {clave_pagina(url)}")
+        grabacion.grabar_pagina(url, html)
+        return html
+
+    if OFFLINE:
+        _contar('fallos')
+        print(f"  ⚠️ Modo offline: {clave_pagina(url)} no está en caché")
+        return None
+
+    html = descargar()
+    if html and pagina_sin_cambios(url):
+        print(f"  ♻️ Sin cambios (304): {clave_pagina(url)}")
+    elif html:
+        _contar('descargas')
+        guardar_pagina(url, html)
+    else:
+        _contar('fallos')
+    grabacion.grabar_pagina(url, html)
+    return html
+
+
+# ---------------------------------------------------------------------------
+# DESALOJO
+# ---------------------------------------------------------------------------
+def desalojar_si_excede(max_bytes=None):
+    """
+    Borra páginas expiradas y, si la caché sigue superando `max_bytes`,
+    las usadas hace más tiempo hasta quedar por debajo del límite.
+    """
+    max_bytes = MAX_BYTES if max_bytes is None else max_bytes
+    if not os.path.isdir(CACHE_DIR):
+        return
+
+    ahora = time.time()
+    entradas = []
+    total = 0
+    for nombre in os.listdir(CACHE_DIR):
+        if not nombre.endswith(".html"):
+            continue
+        ruta = os.path.join(CACHE_DIR, nombre)
+        try:
+            st = os.stat(ruta)
+        except OSError:
+            continue
+        vencida = ahora - st.st_mtime >= TTL_SEGUNDOS
+        if not OFFLINE and vencida and not os.path.exists(_validadores_de(ruta)):
+            _borrar(ruta)
+            continue
+        entradas.append((st.st_atime, st.st_size, ruta))
+        total += st.st_size
+
+    if total <= max_bytes:
+        return
+
+    for _, tamano, ruta in sorted(entradas):
+        _borrar(ruta)
+        _borrar(_validadores_de(ruta))
+        total -= tamano
+        if total <= max_bytes:
+            break
+
+
+def _validadores_de(ruta_html):
+    return ruta_html[:-len(".html")] + ".validadores.json"
+
+
+def _borrar(ruta):
+    try:
+        os.remove(ruta)
+    except OSError:
+        pass
+
+
+def resumen_cache():
+    """Texto corto con los contadores del proceso actual."""
+    return (
+        f"💾 Caché HTML: {ESTADISTICAS['aciertos']} aciertos, "
+        f"{ESTADISTICAS['descargas']} descargas, {ESTADISTICAS['revalidadas']} sin cambios (304), "
+        f"{ESTADISTICAS['fallos']} fallos"
+    )
@@ -0,0 +1,252 @@
+"""
+ALETHEIA - Checkpoints por partido
+Cada script guarda las filas de un partido en cuanto lo termina, en
+<carpeta del evento>/.checkpoints/<script>/<match_id>.json, en lugar de
+tenerlas solo en memoria hasta escribir los xlsx al final.
+
+Si el script se cae o VLR.gg lo bloquea en el partido 55 de 60, al volver a
+ejecutarlo los partidos con checkpoint se cargan del disco y el scraping
+sigue por el primer partido que falte. Un partido con alguna página que no
+se pudo obtener (bloqueo, error de red, caché offline sin la página) no deja
+checkpoint, así que se reintenta en la siguiente ejecución. Un partido que
+de verdad no tiene filas (forfeit, sin pestaña de economía/performance)
+deja un checkpoint vacío: cuenta como completo y [U] no lo vuelve a pedir.
+
+Carpetas de evento anteriores a los checkpoints: la primera vez se siembran
+los checkpoints a partir de las tablas ya escritas (agrupando por match_id),
+de modo que una actualización incremental solo scrapea los partidos nuevos
+y los fusiona con lo que ya había.
+
+Variables de entorno:
+  ALETHEIA_CHECKPOINTS=0   no reutilizar checkpoints: se scrapea todo de
+                           nuevo (y se sobrescriben)
+"""
+
+import json
+import os
+import re
+import threading
+
+import pandas as pd
+
+import cache_paginas
+import traza
+from reintentos import fallos_de_partido, guardar_fallidos
+from salidas import es_columna_id, id_como_texto, leer_tabla, nombre_tabla
+
+REUTILIZAR = os.environ.get("ALETHEIA_CHECKPOINTS", "1") != "0"
+
+CARPETA_CHECKPOINTS = ".checkpoints"
+
+
+def match_id_de(url):
+    """match_id numérico de una URL de partido de VLR.gg, o None."""
+    match = re.search(r'vlr\.gg/(\d+)', url)
+    return match.group(1) if match else None
+
+
+def match_id_de_fila(fila):
+    """
+    match_id de una fila de salida. vlr_rondas no tiene columna match_id:
+    se toma del round_id ("<match_id>_<mapa>").
+    """
+    if fila.get('match_id') is not None:
+        return str(fila['match_id'])
+    round_id = fila.get('round_id')
+    return str(round_id).split('_')[0] if round_id is not None else None
+
+
+def match_ids_en_tabla(carpeta_salida, nombre):
+    """
+    Conjunto de match_id ya completos para una tabla de salida: los que tienen
+    filas en ella más los que dejaron un checkpoint vacío para esa tabla.
+    """
+    ids = match_ids_sin_filas(carpeta_salida, nombre)
+    df = leer_tabla(carpeta_salida, nombre, dtype={'match_id': str, 'round_id': str})
+    if df is None:
+        return ids
+    if 'match_id' in df.columns:
+        return ids | set(df['match_id'].dropna())
+    if 'round_id' in df.columns:
+        return ids | set(df['round_id'].dropna().str.split('_').str[0])
+    return ids
+
+
+def match_ids_sin_filas(carpeta_salida, nombre):
+    """
+    match_id de los partidos completos que no tienen filas en la tabla de
+    salida `nombre`: su checkpoint existe pero la tabla va vacía.
+    """
+    nombre = nombre_tabla(nombre)
+    ids = set()
+    raiz = os.path.join(carpeta_salida, CARPETA_CHECKPOINTS)
+    if not os.path.isdir(raiz):
+        return ids
+    for script in os.listdir(raiz):
+        carpeta = os.path.join(raiz, script)
+        if not os.path.isdir(carpeta):
+            continue
+        for archivo in os.listdir(carpeta):
+            if not archivo.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(carpeta, archivo), 'r', encoding='utf-8') as f:
+                    datos = json.load(f)
+            except (OSError, ValueError):
+                continue
+            tablas = datos.get("tablas", {})
+            if any(salida == nombre and not tablas.get(tabla)
+                   for tabla, salida in datos.get("salidas", {}).items()):
+                ids.add(str(datos["match_id"]))
+    return ids
+
+
+def carpeta_checkpoints(carpeta_salida, script):
+    return os.path.join(carpeta_salida, CARPETA_CHECKPOINTS, script)
+
+
+def _a_json(valor):
+    """Convierte los escalares de numpy/pandas que json no sabe serializar."""
+    if hasattr(valor, 'item'):
+        return valor.item()
+    return str(valor)
+
+
+def _ids_como_texto(tablas):
+    """
+    Los checkpoints sembrados antes de normalizar los ids guardan enteros;
+    las filas recién scrapeadas, texto. Se unifican al cargar.
+    """
+    for filas in tablas.values():
+        for fila in filas:
+            for col, valor in fila.items():
+                if es_columna_id(col) and valor is not None and not isinstance(valor, str):
+                    texto = id_como_texto(valor)
+                    fila[col] = None if texto is pd.NA else texto
+    return tablas
+
+
+def cargar_checkpoint(carpeta, match_id):
+    """Devuelve {tabla: filas} guardado para el partido, o None si no hay."""
+    ruta = os.path.join(carpeta, f"{match_id}.json")
+    try:
+        with open(ruta, 'r', encoding='utf-8') as f:
+            return _ids_como_texto(json.load(f)["tablas"])
+    except (OSError, ValueError, KeyError, AttributeError):
+        return None  # Inexistente o a medio escribir → se vuelve a scrapear
+
+
+def guardar_checkpoint(carpeta, match_id, tablas, salidas=None):
+    """
+    Escribe de forma atómica las filas de un partido ya completo. `salidas`
+    ({tabla: nombre de la tabla de salida}) permite a match_ids_sin_filas()
+    saber en qué tablas de salida el partido está completo aunque no tenga filas.
+    """
+    os.makedirs(carpeta, exist_ok=True)
+    ruta = os.path.join(carpeta, f"{match_id}.json")
+    temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump({"match_id": match_id, "salidas": salidas or {}, "tablas": tablas}, f,
+                  ensure_ascii=False, default=_a_json)
+    os.replace(temporal, ruta)
+
+
+def sembrar_desde_salidas(carpeta, carpeta_salida, salidas):
+    """
+    Crea checkpoints a partir de las tablas ya escritas ({tabla: nombre de la
+    tabla}). Solo para partidos sin checkpoint; devuelve cuántos se sembraron.
+    """
+    por_partido = {}
+    for tabla, nombre in salidas.items():
+        df = leer_tabla(carpeta_salida, nombre, dtype={'match_id': str, 'round_id': str})
+        if df is None:
+            continue
+        df = df.astype(object).where(df.notna(), None)
+        for fila in df.to_dict('records'):
+            match_id = match_id_de_fila(fila)
+            if match_id:
+                por_partido.setdefault(match_id, {t: [] for t in salidas})[tabla].append(fila)
+
+    sembrados = 0
+    for match_id, tablas in por_partido.items():
+        if not os.path.exists(os.path.join(carpeta, f"{match_id}.json")):
+            guardar_checkpoint(carpeta, match_id, tablas, salidas)
+            sembrados += 1
+    return sembrados
+
+
+def _sembrar_si_hace_falta(carpeta, carpeta_salida, salidas):
+    """Siembra desde las salidas solo si este script aún no tiene checkpoints."""
+    if not (REUTILIZAR and salidas) or os.path.isdir(carpeta):
+        return
+    sembrados = sembrar_desde_salidas(carpeta, carpeta_salida, salidas)
+    if sembrados:
+        print(f"🔖 {sembrados} partidos ya guardados en las salidas → checkpoints sembrados")
+
+
+def partidos_pendientes(enlaces, carpeta_salida, script, salidas=None):
+    """URLs de `enlaces` que todavía no tienen checkpoint."""
+    if not REUTILIZAR:
+        return list(enlaces)
+    carpeta = carpeta_checkpoints(carpeta_salida, script)
+    _sembrar_si_hace_falta(carpeta, carpeta_salida, salidas)
+    return [url for url in enlaces
+            if not match_id_de(url)
+            or not os.path.exists(os.path.join(carpeta, f"{match_id_de(url)}.json"))]
+
+
+def procesar_partidos(enlaces, carpeta_salida, script, tablas, extraer, salidas=None):
+    """
+    Recorre `enlaces` y devuelve {tabla: filas de todos los partidos} en el
+    orden de los enlaces.
+
+    - Partidos con checkpoint: se cargan del disco sin llamar a `extraer`.
+    - Resto: `extraer(i, url)` devuelve {tabla: filas} (o None si falló) y
+      se guarda el checkpoint antes de seguir, también si no trae filas
+      (partido completo pero vacío), salvo que alguna página del partido no
+      se pudiera obtener.
+    - Partidos con alguna página que falló de forma definitiva (reintentos.py):
+      sus filas se usan pero no dejan checkpoint, y la URL se escribe en
+      fallidos/<script>.txt para reintentarlos solos.
+    - `salidas` ({tabla: nombre de la tabla de salida}): si la carpeta del
+      evento aún no tiene checkpoints de este script, se siembran desde ellas.
+    """
+    carpeta = carpeta_checkpoints(carpeta_salida, script)
+    _sembrar_si_hace_falta(carpeta, carpeta_salida, salidas)
+    resultado = {tabla: [] for tabla in tablas}
+    reanudados = 0
+    fallidos = []
+
+    for i, url in enumerate(enlaces):
+        match_id = match_id_de(url)
+        datos = cargar_checkpoint(carpeta, match_id) if (REUTILIZAR and match_id) else None
+        if datos is not None:
+            reanudados += 1
+            print(f"\n[{i+1}/{len(enlaces)}] ⏭️  Checkpoint: partido {match_id} ya completo")
+        else:
+            paginas_perdidas = cache_paginas.ESTADISTICAS['fallos']
+            with traza.tramo('partido', match_id=match_id) as datos_tramo:
+                datos = extraer(i, url)
+                datos_tramo['filas'] = {tabla: len((datos or {}).get(tabla, [])) for tabla in tablas}
+            # Sin HTML (None, o caché offline sin la página) no se sabe si está vacío
+            completo = datos is not None and cache_paginas.ESTADISTICAS['fallos'] == paginas_perdidas
+            datos = datos or {}
+            fallos = fallos_de_partido(match_id) if match_id else []
+            if fallos:
+                fallidos.append(url)
+                print(f"  📮 Partido {match_id} a la lista de fallidos "
+                      f"({', '.join(sorted({f['tipo'] for f in fallos}))})")
+            elif match_id and (completo or any(datos.get(tabla) for tabla in tablas)):
+                # Con páginas perdidas, una tabla vacía no cuenta como completa
+                guardar_checkpoint(carpeta, match_id, {t: datos.get(t, []) for t in tablas},
+                                   salidas if completo else None)
+
+        for tabla in tablas:
+            resultado[tabla].extend(datos.get(tabla, []))
+
+    if reanudados:
+        print(f"\n⏭️  {reanudados}/{len(enlaces)} partidos reanudados desde checkpoint ({carpeta})")
+    ruta_fallidos = guardar_fallidos(carpeta_salida, script, fallidos)
+    if ruta_fallidos:
+        print(f"\n📮 {len(fallidos)} partidos fallidos → {ruta_fallidos} (reintentar con [F] en main.py)")
+    return resultado
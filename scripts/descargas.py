@@ -0,0 +1,143 @@
+"""
+ALETHEIA - Descarga HTTP compartida (motor estático)
+Descarga el HTML renderizado por el servidor con una sesión de requests,
+sin abrir Chrome. VLR.gg ya sirve todos los contenedores
+div.vm-stats-game[data-game-id] en el HTML inicial, así que los extractores
+de mapas/rondas, stats ALL y economía funcionan igual que con Selenium.
+
+descargar_varios() descarga una lista de URLs con varios hilos sobre la
+misma sesión (conexiones reutilizadas). El ritmo por host lo pone
+limitador.py, compartido con el resto de procesos.
+
+Si la caché tiene una copia de la página con ETag / Last-Modified, la
+petición es condicional: un 304 devuelve la copia guardada sin descargarla
+(ver cache_paginas.py). Con ALETHEIA_REPRODUCIR las peticiones van al
+servidor local de grabacion.py.
+
+Variables de entorno:
+  ALETHEIA_MOTOR=estatico    usar requests + lxml en lugar de Selenium
+  ALETHEIA_HILOS_HTTP        descargas simultáneas en descargar_varios (por defecto 4)
+  (ritmo por host: ver limitador.py)
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import traza
+from cache_paginas import guardar_validadores, leer_validadores, marcar_sin_cambios, obtener_html
+from grabacion import url_destino
+from limitador import esperar_turno, host_de, informar_respuesta
+from reintentos import clasificar_excepcion, clasificar_respuesta, con_reintentos
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                  '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+
+# Parser de BeautifulSoup para el HTML descargado (lxml está en requirements.txt)
+PARSER = 'lxml'
+
+MOTOR = os.environ.get("ALETHEIA_MOTOR", "selenium").lower()
+HILOS = int(os.environ.get("ALETHEIA_HILOS_HTTP", "4"))
+
+_sesion = None
+_candado = threading.Lock()
+
+
+def usar_selenium():
+    """True salvo que se haya pedido el motor estático (ALETHEIA_MOTOR=estatico)."""
+    return MOTOR not in ("estatico", "estático", "http")
+
+
+def obtener_sesion():
+    """Sesión HTTP única por proceso: reutiliza conexiones TCP/TLS con vlr.gg."""
+    global _sesion
+    with _candado:
+        if _sesion is None:
+            _sesion = requests.Session()
+            _sesion.headers.update(HEADERS)
+            adaptador = HTTPAdapter(pool_connections=4, pool_maxsize=max(8, HILOS))
+            _sesion.mount("https://", adaptador)
+            _sesion.mount("http://", adaptador)
+        return _sesion
+
+
+def cabeceras_condicionales(url):
+    """If-None-Match / If-Modified-Since de la copia guardada de `url` ({} si no hay)."""
+    validadores = leer_validadores(url)
+    cabeceras = {}
+    if validadores.get('etag'):
+        cabeceras['If-None-Match'] = validadores['etag']
+    if validadores.get('last_modified'):
+        cabeceras['If-Modified-Since'] = validadores['last_modified']
+    return cabeceras
+
+
+def descargar_una_vez(url, timeout=15, condicional=True):
+    """
+    Un intento de descarga: devuelve el HTML o lanza ErrorDescarga con el
+    error clasificado (timeout, red, 5xx, 429, Access Denied, 4xx).
+    Con una copia validable en caché la petición es condicional y un 304
+    devuelve esa copia.
+    """
+    host = host_de(url)
+    cabeceras = cabeceras_condicionales(url) if condicional else {}
+    with traza.tramo('turno', host=host):
+        esperar_turno(host)
+    try:
+        with traza.tramo('descarga', url=url, condicional=bool(cabeceras)) as datos:
+            response = obtener_sesion().get(url_destino(url), timeout=timeout, headers=cabeceras)
+            datos.update(status=response.status_code, bytes=len(response.content))
+    except requests.RequestException as e:
+        raise clasificar_excepcion(e)
+    traza.contar('bytes_descargados', len(response.content))
+
+    if response.status_code == 304 and cabeceras:
+        informar_respuesta(host, 304)
+        html = marcar_sin_cambios(url)
+        if html is not None:
+            return html
+        # La copia se desalojó entre medias: pedir la página entera
+        return descargar_una_vez(url, timeout, condicional=False)
+
+    html = response.text
+    informar_respuesta(host, response.status_code, html, response.headers.get('Retry-After'))
+    error = clasificar_respuesta(response.status_code, html)
+    if error:
+        raise error
+    guardar_validadores(url, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+    return html
+
+
+def descargar_html(url, timeout=15):
+    """
+    Descarga `url` con reintentos (backoff exponencial con jitter) y
+    devuelve el HTML, o None si falló de forma definitiva; en ese caso la
+    URL queda en la lista de fallidos (reintentos.py).
+    """
+    return con_reintentos(url, lambda: descargar_una_vez(url, timeout))
+
+
+def descargar_varios(urls, max_hilos=None, timeout=15):
+    """
+    Descarga varias URLs en paralelo (a través de la caché compartida) y
+    devuelve {url: html o None} en el mismo orden que `urls`.
+
+    La concurrencia está acotada por `max_hilos` y, por host, por el
+    limitador compartido: los hilos solapan la latencia de red pero nunca
+    superan el ritmo permitido para vlr.gg o liquipedia.net.
+    """
+    urls = list(dict.fromkeys(urls))
+    max_hilos = HILOS if max_hilos is None else max_hilos
+
+    def tarea(url):
+        return obtener_html(url, lambda: descargar_html(url, timeout=timeout))
+
+    with ThreadPoolExecutor(max_workers=max(1, max_hilos)) as executor:
+        resultados = list(executor.map(tarea, urls))
+    return dict(zip(urls, resultados))
@@ -0,0 +1,153 @@
+"""
+ALETHEIA - Esperas por condición para los scripts con Selenium
+Sustituye los time.sleep fijos (3 s tras driver.get, 4 s en performance /
+economy, 1 s por pestaña ATK/DEF) por esperas que terminan en cuanto el DOM
+tiene lo que el paso necesita, con un tiempo máximo por paso.
+
+Cada espera se mide y se imprime; resumen_esperas() da el total por paso.
+
+Una pestaña que no tiene la sección esperada (partido sin economía o sin
+performance, partido aún sin jugar) no agota el tiempo máximo: en cuanto la
+carga termina (document.readyState == 'complete') y la cabecera del partido
+está en el DOM sin el selector, la espera acaba y el extractor sigue con una
+página vacía. No es un error ni se reintenta.
+
+Tiempos máximos (segundos) configurables por variable de entorno:
+  ALETHEIA_TIMEOUT_CARGA   página de partido / evento    (por defecto 15)
+  ALETHEIA_TIMEOUT_PESTANA pestañas performance / economy (por defecto 20)
+  ALETHEIA_TIMEOUT_CLIC    cambio de pestaña ATK/DEF       (por defecto 5)
+"""
+
+import os
+import time
+from collections import defaultdict
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+import traza
+from cache_paginas import es_pagina_bloqueada
+from grabacion import url_destino
+from limitador import esperar_turno, host_de, informar
+from reintentos import ErrorDescarga, con_reintentos
+
+TIMEOUTS = {
+    'carga':   float(os.environ.get("ALETHEIA_TIMEOUT_CARGA", "15")),
+    'pestana': float(os.environ.get("ALETHEIA_TIMEOUT_PESTANA", "20")),
+    'clic':    float(os.environ.get("ALETHEIA_TIMEOUT_CLIC", "5")),
+}
+
+# Selectores de lo que cada página necesita tener antes de leer page_source
+SELECTOR_CONTENEDORES = "div.vm-stats-game[data-game-id]"
+SELECTOR_MATRIZ = "div.vm-stats-game[data-game-id] table.mod-matrix"
+SELECTOR_ECONOMIA = "div.vm-stats-game[data-game-id] table.mod-econ"
+SELECTOR_PARTIDOS_EVENTO = "a.match-item"
+# Cabecera de toda página de partido: si ya está y la carga terminó sin el
+# selector esperado, la pestaña no tiene esa sección
+SELECTOR_PAGINA_PARTIDO = "div.match-header-vs"
+
+# paso → lista de duraciones (s) de este proceso
+DURACIONES = defaultdict(list)
+AGOTADAS = defaultdict(int)
+
+# Páginas cargadas con cargar_y_esperar (navegadores.py lo usa para reciclar Chrome)
+PAGINAS_CARGADAS = 0
+
+
+def esperar(driver, condicion, paso, timeout=None, descripcion=""):
+    """
+    Espera hasta que `condicion(driver)` sea verdadera o pase el tiempo
+    máximo del paso. Devuelve lo que devolvió la condición si se cumplió; al
+    agotarse solo avisa y devuelve False, para que el extractor siga con lo
+    que haya en el DOM (igual que hacían los sleeps fijos).
+    """
+    timeout = TIMEOUTS.get(paso, 10) if timeout is None else timeout
+    inicio = time.perf_counter()
+    try:
+        cumplida = WebDriverWait(driver, timeout, poll_frequency=0.1).until(condicion)
+    except TimeoutException:
+        cumplida = False
+        AGOTADAS[paso] += 1
+
+    duracion = time.perf_counter() - inicio
+    DURACIONES[paso].append(duracion)
+    traza.registrar_tramo('espera', inicio, paso=paso, cumplida=bool(cumplida))
+    etiqueta = f"{paso} {descripcion}".strip()
+    if cumplida:
+        print(f"   ⏱️  Espera '{etiqueta}': {duracion:.2f}s")
+    else:
+        print(f"   ⚠️ Espera '{etiqueta}' agotada tras {duracion:.1f}s — se continúa con el DOM actual")
+    return cumplida
+
+
+def esperar_selector(driver, selector, paso, timeout=None):
+    """Espera a que exista al menos un elemento que cumpla el selector CSS."""
+    return esperar(
+        driver,
+        EC.presence_of_element_located((By.CSS_SELECTOR, selector)),
+        paso,
+        timeout,
+        descripcion=f"[{selector}]",
+    )
+
+
+def seccion_o_pestana_vacia(selector):
+    """
+    Condición de espera: 'seccion' si ya está el selector; 'vacia' si la
+    página del partido terminó de cargar sin él; False mientras tanto.
+    """
+    def condicion(driver):
+        if driver.find_elements(By.CSS_SELECTOR, selector):
+            return 'seccion'
+        if (driver.execute_script("return document.readyState") == 'complete'
+                and driver.find_elements(By.CSS_SELECTOR, SELECTOR_PAGINA_PARTIDO)):
+            return 'vacia'
+        return False
+    return condicion
+
+
+def cargar_y_esperar(driver, url, selector, paso='carga', timeout=None):
+    """
+    driver.get(url) y espera al selector; devuelve driver.page_source, o
+    None si la carga falló de forma definitiva tras los reintentos.
+    Chrome también pasa por el limitador compartido del host.
+    """
+    def intento():
+        global PAGINAS_CARGADAS
+        host = host_de(url)
+        with traza.tramo('turno', host=host):
+            esperar_turno(host)
+        with traza.tramo('navegacion', url=url):
+            driver.get(url_destino(url))
+        PAGINAS_CARGADAS += 1
+        resultado = esperar(driver, seccion_o_pestana_vacia(selector), paso, timeout,
+                            descripcion=f"[{selector}]")
+        if resultado == 'vacia':
+            print(f"   ℹ️  La pestaña no tiene [{selector}]: se sigue sin esa sección")
+        html = driver.page_source
+        traza.contar('bytes_navegados', len(html))
+        traza.medir_chrome(driver)
+        # Selenium no da el status HTTP: una página de error o un 5xx no es un
+        # éxito. Solo se informa el bloqueo; la subida de la tasa compartida
+        # queda para los status reales de las descargas HTTP.
+        if es_pagina_bloqueada(html):
+            informar(host, True)
+            raise ErrorDescarga('bloqueo', "Access Denied")
+        return html
+
+    return con_reintentos(url, intento)
+
+
+def resumen_esperas():
+    """Texto con el tiempo total y máximo de espera por paso."""
+    if not DURACIONES:
+        return "⏱️  Esperas: ninguna"
+    partes = []
+    for paso, duraciones in DURACIONES.items():
+        texto = f"{paso}: {len(duraciones)}× total {sum(duraciones):.1f}s máx {max(duraciones):.1f}s"
+        if AGOTADAS[paso]:
+            texto += f" ({AGOTADAS[paso]} agotadas)"
+        partes.append(texto)
+    return "⏱️  Esperas — " + " | ".join(partes)
@@ -0,0 +1,235 @@
+"""
+ALETHEIA - Grabación y reproducción de páginas (VLR.gg / Liquipedia)
+Sin vlr.gg ni liquipedia.net en línea ningún script se puede ejecutar, y
+con ellos en línea las medidas de rendimiento no se pueden repetir. Este
+módulo graba todas las páginas que toca una ejecución en un archivo y
+luego las sirve desde un servidor HTTP local con la latencia y el ancho de
+banda que se pidan.
+
+Grabar (una ejecución normal, contra las webs reales):
+  ALETHEIA_GRABAR=grabaciones/vct python main.py
+  Cada página que pasa por la caché (descargada o ya guardada), incluidas
+  las pestañas ?tab=performance / ?tab=economy, las páginas de Liquipedia
+  y la lista de partidos del evento (script 0), se copia a
+  <archivo>/paginas/<clave>.html y su URL se apunta en <archivo>/urls.txt.
+
+Reproducir:
+  python scripts/grabacion.py servir grabaciones/vct --puerto 8800 --latencia-ms 80 --kbps 4000
+  ALETHEIA_REPRODUCIR=http://127.0.0.1:8800 ALETHEIA_CACHE_DESACTIVADA=1 python main.py
+
+  o, en un solo paso (servidor en segundo plano, caché y limitador vacíos
+  en una carpeta temporal):
+  python scripts/grabacion.py ejecutar grabaciones/vct --latencia-ms 80 -- python scripts/scrapear_partidos.py
+
+Con ALETHEIA_REPRODUCIR las peticiones HTTP y las páginas abiertas en
+Chrome van a <servidor>/<host>/<ruta>; la caché, el limitador y los
+checkpoints siguen usando la URL original. El servidor busca la página por
+la misma clave que la caché (match_id + pestaña, o hash de la URL), así que
+da igual el slug con el que se pida; responde 404 a lo que no se grabó y
+304 a las peticiones condicionales cuyo ETag coincide.
+
+Variables de entorno:
+  ALETHEIA_GRABAR       carpeta del archivo donde grabar las páginas
+  ALETHEIA_REPRODUCIR   URL base del servidor de reproducción
+"""
+
+import argparse
+import contextlib
+import hashlib
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+# Módulo completo (no nombres): cache_paginas también importa este módulo
+import cache_paginas
+
+GRABAR_DIR = os.environ.get("ALETHEIA_GRABAR", "")
+REPRODUCIR = os.environ.get("ALETHEIA_REPRODUCIR", "").rstrip("/")
+
+
+# ---------------------------------------------------------------------------
+# GRABACIÓN
+# ---------------------------------------------------------------------------
+def ruta_grabada(archivo, url):
+    return os.path.join(archivo, "paginas", cache_paginas.clave_pagina(url) + ".html")
+
+
+def grabar_pagina(url, html):
+    """
+    Copia la página al archivo de ALETHEIA_GRABAR (si está activo). La URL
+    se apunta en urls.txt solo la primera vez que se graba su página, aunque
+    la pidan varias veces (aciertos de caché) o varios procesos.
+    """
+    if not GRABAR_DIR or not html or cache_paginas.es_pagina_bloqueada(html):
+        return
+    ruta = ruta_grabada(GRABAR_DIR, url)
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporal, 'w', encoding='utf-8') as f:
+        f.write(html)
+    try:
+        # link() falla si la página ya existe: solo un proceso la estrena
+        os.link(temporal, ruta)
+        os.remove(temporal)
+        nueva = True
+    except FileExistsError:
+        os.replace(temporal, ruta)
+        nueva = False
+    if nueva:
+        # Varios procesos apuntan URLs a la vez: cada línea va en una sola
+        # escritura O_APPEND, que el sistema no intercala con otras
+        fd = os.open(os.path.join(GRABAR_DIR, "urls.txt"), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, (url + "\n").encode('utf-8'))
+        finally:
+            os.close(fd)
+
+
+# ---------------------------------------------------------------------------
+# REPRODUCCIÓN
+# ---------------------------------------------------------------------------
+def url_destino(url, servidor=None):
+    """URL a la que se conecta de verdad: la original o la del servidor local."""
+    servidor = servidor or REPRODUCIR
+    if not servidor:
+        return url
+    partes = urlsplit(url)
+    destino = f"{servidor}/{partes.netloc}{partes.path}"
+    return f"{destino}?{partes.query}" if partes.query else destino
+
+
+def url_original(ruta):
+    """'/www.vlr.gg/598923/x?tab=economy' → 'https://www.vlr.gg/598923/x?tab=economy'."""
+    return "https://" + ruta.lstrip("/")
+
+
+def crear_servidor(archivo, puerto=8800, latencia_ms=0, kbps=0):
+    """
+    Servidor HTTP (un hilo por conexión) que sirve el archivo grabado.
+    latencia_ms se espera antes de responder; kbps (KB/s, 0 = sin límite)
+    limita el envío del cuerpo de cada respuesta.
+    """
+    bloque = 16 * 1024
+
+    class Manejador(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Cabeceras y cuerpo van en escrituras separadas: sin Nagle no se
+        # suman ~40 ms de ACK retardado a cada respuesta
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            time.sleep(latencia_ms / 1000)
+            ruta = ruta_grabada(archivo, url_original(self.path))
+            try:
+                with open(ruta, 'rb') as f:
+                    cuerpo = f.read()
+            except OSError:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            etag = '"' + hashlib.sha1(cuerpo).hexdigest()[:16] + '"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(cuerpo)))
+            self.send_header("ETag", etag)
+            self.end_headers()
+            for inicio in range(0, len(cuerpo), bloque):
+                trozo = cuerpo[inicio:inicio + bloque]
+                self.wfile.write(trozo)
+                if kbps > 0:
+                    time.sleep(len(trozo) / (kbps * 1024))
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", puerto), Manejador)
+    servidor.daemon_threads = True
+    return servidor
+
+
+def servir(archivo, puerto, latencia_ms, kbps):
+    servidor = crear_servidor(archivo, puerto, latencia_ms, kbps)
+    paginas = len(os.listdir(os.path.join(archivo, "paginas")))
+    print(f"📼 Reproduciendo {paginas} páginas de {archivo} en http://127.0.0.1:{servidor.server_port}")
+    print(f"   Latencia {latencia_ms} ms · ancho de banda {f'{kbps} KB/s' if kbps else 'sin límite'}")
+    print(f"   ALETHEIA_REPRODUCIR=http://127.0.0.1:{servidor.server_port}  (Ctrl+C para parar)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+@contextlib.contextmanager
+def reproduciendo(archivo, latencia_ms=0, kbps=0):
+    """
+    Sirve el archivo en un puerto libre (en segundo plano) y devuelve el
+    entorno para los subprocesos: ALETHEIA_REPRODUCIR apuntando al servidor
+    y la caché y el estado del limitador en una carpeta temporal vacía, así
+    que cada página sale del servidor.
+    """
+    servidor = crear_servidor(archivo, 0, latencia_ms, kbps)
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    try:
+        with tempfile.TemporaryDirectory(prefix="aletheia_replay_") as temporal:
+            env = os.environ.copy()
+            env.update({
+                "ALETHEIA_REPRODUCIR": f"http://127.0.0.1:{servidor.server_port}",
+                "ALETHEIA_CACHE_DIR": os.path.join(temporal, "cache"),
+                "ALETHEIA_LIMITADOR_DIR": os.path.join(temporal, "limitador"),
+                "PYTHONIOENCODING": "utf-8",
+            })
+            env.pop("ALETHEIA_GRABAR", None)
+            yield env
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
+
+
+def ejecutar(archivo, comando, latencia_ms=0, kbps=0):
+    """Ejecuta `comando` contra el archivo servido; devuelve su código de salida."""
+    with reproduciendo(archivo, latencia_ms, kbps) as env:
+        return subprocess.run(comando, env=env).returncode
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    # Todo lo que va después de "--" es el comando de `ejecutar`
+    comando = argv[argv.index("--") + 1:] if "--" in argv else []
+    argv = argv[:argv.index("--")] if "--" in argv else argv
+
+    parser = argparse.ArgumentParser(description="Reproduce un archivo de páginas grabadas.")
+    sub = parser.add_subparsers(dest="orden", required=True)
+    for orden in ("servir", "ejecutar"):
+        p = sub.add_parser(orden)
+        p.add_argument("archivo", help="carpeta grabada con ALETHEIA_GRABAR")
+        p.add_argument("--latencia-ms", type=float, default=0)
+        p.add_argument("--kbps", type=float, default=0, help="KB/s por respuesta (0 = sin límite)")
+        if orden == "servir":
+            p.add_argument("--puerto", type=int, default=8800)
+    args = parser.parse_args(argv)
+
+    if args.orden == "servir":
+        servir(args.archivo, args.puerto, args.latencia_ms, args.kbps)
+        return 0
+    if not comando:
+        parser.error("falta el comando (después de --)")
+    return ejecutar(args.archivo, comando, args.latencia_ms, args.kbps)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+"""
+ALETHEIA - Preguntas al usuario también en ejecuciones sin terminal
+Ejecutados a mano, los scripts preguntan qué .txt usar cuando hay varios en
+output_data/ (o la URL del evento, en el script 0). En un cron o un worker
+no hay nadie que responda: con stdin cerrado input() lanza EOFError y, si
+stdin es una tubería que nunca se cierra, el script se queda colgado.
+
+preguntar() sustituye a input() en esos puntos: con ALETHEIA_NO_INTERACTIVO=1
+(python main.py --eventos ... lo activa) o sin stdin, en lugar de preguntar
+explica qué variable falta y termina con CODIGO_SIN_RESPUESTA.
+
+Variables de entorno:
+  ALETHEIA_NO_INTERACTIVO=1   nunca preguntar
+"""
+
+import os
+import sys
+
+NO_INTERACTIVO = os.environ.get("ALETHEIA_NO_INTERACTIVO") == "1"
+
+# Mismo código que un error de uso de main.py en modo por lotes
+CODIGO_SIN_RESPUESTA = 2
+
+ELEGIR_TXT = "Indica el evento con ALETHEIA_TXT_FILE=<ruta del .txt> o con python main.py --eventos <evento>."
+
+
+def preguntar(texto, alternativa):
+    """
+    input(texto), o salida con CODIGO_SIN_RESPUESTA si la ejecución no es
+    interactiva. `alternativa` dice cómo dar la respuesta sin preguntar.
+    """
+    if not NO_INTERACTIVO:
+        try:
+            return input(texto)
+        except EOFError:
+            pass
+    print(f"\n❌ Hace falta responder '{texto.strip()}' pero la ejecución no es interactiva.")
+    print(f"   {alternativa}")
+    sys.exit(CODIGO_SIN_RESPUESTA)
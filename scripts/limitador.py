@@ -0,0 +1,212 @@
+"""
+ALETHEIA - Limitador de peticiones por host compartido entre procesos
+Con [A] corren a la vez varios scripts (y varios eventos) contra vlr.gg; cada
+uno con su propia pausa no sabe lo que hacen los demás. Aquí hay un único
+token bucket por host guardado en disco y protegido con un bloqueo de
+archivo, así que todos los procesos de la máquina comparten el mismo ritmo
+sin ningún servicio externo.
+
+Cada host tiene:
+  tasa      peticiones/s que el bucket repone ahora mismo
+  rafaga    peticiones seguidas permitidas tras un rato sin pedir nada
+  tasa_max  techo al que la tasa vuelve a subir tras un bloqueo
+
+Adaptación (AIMD):
+  - 429 o página "Access Denied": la tasa se reduce a la mitad y el host
+    queda en pausa ALETHEIA_ENFRIAMIENTO_BLOQUEO segundos (o lo que diga
+    Retry-After, si es mayor) para TODOS los procesos.
+  - Respuesta HTTP correcta (200/304): la tasa sube un poco, hasta
+    tasa_max. Las cargas con Chrome solo informan los bloqueos: Selenium no
+    da el status, así que una página de error no cuenta como éxito.
+
+Variables de entorno:
+  ALETHEIA_PAUSA_HTTP            segundos entre peticiones a un host al empezar
+                                 (tasa inicial = 1 / pausa; por defecto 1.0;
+                                 0 desactiva el limitador salvo en Liquipedia)
+  ALETHEIA_TASA_MAX_HTTP         techo de peticiones/s por host (por defecto 2 / pausa)
+  ALETHEIA_RAFAGA_HTTP           ráfaga máxima por host (por defecto 2)
+  ALETHEIA_ENFRIAMIENTO_BLOQUEO  segundos de pausa tras un bloqueo (por defecto 30)
+  ALETHEIA_LIMITADOR_DIR         carpeta del estado compartido (por defecto
+                                 <tmp>/aletheia_limitador)
+"""
+
+import json
+import os
+import tempfile
+import time
+from urllib.parse import urlparse
+
+from cache_paginas import es_pagina_bloqueada
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+PAUSA_ENTRE_PETICIONES = float(os.environ.get("ALETHEIA_PAUSA_HTTP", "1.0"))
+TASA_INICIAL = 1 / PAUSA_ENTRE_PETICIONES if PAUSA_ENTRE_PETICIONES > 0 else None
+TASA_MAXIMA = float(os.environ.get("ALETHEIA_TASA_MAX_HTTP", "0")) or (
+    2 * TASA_INICIAL if TASA_INICIAL else None)
+RAFAGA = float(os.environ.get("ALETHEIA_RAFAGA_HTTP", "2"))
+ENFRIAMIENTO = float(os.environ.get("ALETHEIA_ENFRIAMIENTO_BLOQUEO", "30"))
+CARPETA = os.environ.get(
+    "ALETHEIA_LIMITADOR_DIR",
+    os.path.join(tempfile.gettempdir(), "aletheia_limitador"),
+)
+
+# Límites fijos por host. Liquipedia publica un máximo de 1 petición cada
+# 2 s para páginas normales: ni ráfagas ni subidas por encima de eso.
+LIMITES_HOST = {
+    'liquipedia.net': {'tasa': 0.5, 'tasa_max': 0.5, 'rafaga': 1},
+}
+
+# Suelo de la tasa tras bloqueos repetidos (fracción de la inicial)
+FRACCION_MINIMA = 1 / 8
+# Subida por respuesta correcta (fracción de la tasa inicial)
+FRACCION_SUBIDA = 0.02
+
+
+def host_de(url):
+    """Host sin 'www.' (vlr.gg, liquipedia.net...)."""
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def limites(host):
+    """{'tasa', 'tasa_max', 'rafaga'} del host, o None si no se limita."""
+    if host in LIMITES_HOST:
+        return LIMITES_HOST[host]
+    if TASA_INICIAL is None:
+        return None
+    return {'tasa': TASA_INICIAL, 'tasa_max': max(TASA_INICIAL, TASA_MAXIMA), 'rafaga': RAFAGA}
+
+
+class _Bloqueo:
+    """Bloqueo exclusivo de <host>.lock; todos los procesos pasan por él."""
+
+    def __init__(self, host):
+        os.makedirs(CARPETA, exist_ok=True)
+        self.ruta = os.path.join(CARPETA, f"{host}.lock")
+
+    def __enter__(self):
+        self.archivo = open(self.ruta, 'a+')
+        if fcntl:
+            fcntl.flock(self.archivo.fileno(), fcntl.LOCK_EX)
+        else:
+            self.archivo.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(self.archivo.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue  # LK_LOCK se rinde tras 10 s: seguir esperando
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl:
+            fcntl.flock(self.archivo.fileno(), fcntl.LOCK_UN)
+        else:
+            self.archivo.seek(0)
+            msvcrt.locking(self.archivo.fileno(), msvcrt.LK_UNLCK, 1)
+        self.archivo.close()
+
+
+def _ruta_estado(host):
+    return os.path.join(CARPETA, f"{host}.json")
+
+
+def _leer_estado(host, lim, ahora):
+    try:
+        with open(_ruta_estado(host), 'r', encoding='utf-8') as f:
+            estado = json.load(f)
+    except (OSError, ValueError):
+        estado = {}
+    estado.setdefault('tasa', lim['tasa'])
+    estado.setdefault('fichas', lim['rafaga'])
+    estado.setdefault('ultimo', ahora)
+    estado.setdefault('pausa_hasta', 0.0)
+    # Si se bajó el techo por configuración, respetarlo ya
+    estado['tasa'] = min(estado['tasa'], lim['tasa_max'])
+    return estado
+
+
+def _guardar_estado(host, estado):
+    with open(_ruta_estado(host), 'w', encoding='utf-8') as f:
+        json.dump(estado, f)
+
+
+def _reponer(estado, lim, ahora):
+    transcurrido = max(0.0, ahora - estado['ultimo'])
+    estado['fichas'] = min(lim['rafaga'], estado['fichas'] + transcurrido * estado['tasa'])
+    estado['ultimo'] = ahora
+
+
+def esperar_turno(host):
+    """
+    Bloquea hasta que el bucket compartido del host tenga una ficha y la
+    consume. Devuelve los segundos esperados.
+    """
+    lim = limites(host)
+    if lim is None:
+        return 0.0
+    esperado = 0.0
+    while True:
+        with _Bloqueo(host):
+            ahora = time.time()
+            estado = _leer_estado(host, lim, ahora)
+            _reponer(estado, lim, ahora)
+            if ahora < estado['pausa_hasta']:
+                espera = estado['pausa_hasta'] - ahora
+            elif estado['fichas'] >= 1:
+                estado['fichas'] -= 1
+                _guardar_estado(host, estado)
+                return esperado
+            else:
+                espera = (1 - estado['fichas']) / estado['tasa']
+            _guardar_estado(host, estado)
+        time.sleep(espera)
+        esperado += espera
+
+
+def informar(host, bloqueado, retry_after=None):
+    """
+    Ajusta la tasa compartida del host según la última respuesta:
+    bloqueo → mitad de tasa y pausa; correcta → pequeña subida.
+    """
+    lim = limites(host)
+    if lim is None:
+        return
+    with _Bloqueo(host):
+        ahora = time.time()
+        estado = _leer_estado(host, lim, ahora)
+        _reponer(estado, lim, ahora)
+        if bloqueado:
+            estado['tasa'] = max(lim['tasa'] * FRACCION_MINIMA, estado['tasa'] / 2)
+            estado['fichas'] = 0.0
+            pausa = max(ENFRIAMIENTO, retry_after or 0)
+            estado['pausa_hasta'] = max(estado['pausa_hasta'], ahora + pausa)
+            print(f"  🐢 {host}: bloqueo → {estado['tasa']:.2f} pet/s y pausa de {pausa:.0f}s para todos los procesos")
+        else:
+            estado['tasa'] = min(lim['tasa_max'], estado['tasa'] + lim['tasa'] * FRACCION_SUBIDA)
+        _guardar_estado(host, estado)
+
+
+def segundos_retry_after(valor):
+    """Cabecera Retry-After en segundos (None si falta o es una fecha)."""
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def informar_respuesta(host, status_code, html="", retry_after=None):
+    """
+    Clasifica una respuesta (429 o "Access Denied" = bloqueo) y la informa.
+    Devuelve True si fue un bloqueo.
+    """
+    bloqueado = status_code == 429 or es_pagina_bloqueada(html or "")
+    if bloqueado or status_code in (200, 304):
+        informar(host, bloqueado, segundos_retry_after(retry_after))
+    return bloqueado
+
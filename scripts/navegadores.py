@@ -0,0 +1,347 @@
+"""
+ALETHEIA - Navegadores Chrome compartidos
+Centraliza la creación de Chrome para todos los scripts y permite que
+main.py mantenga un POOL de Chrome headless ya arrancados durante toda la
+ejecución de [A], en lugar de que cada script arranque el suyo en frío.
+
+Funcionamiento del pool:
+  - main.py llama a iniciar_pool(): arranca N Chrome con
+    --remote-debugging-port y los anota en una carpeta de registro
+    (un .json por navegador). La ruta se pasa a los scripts en
+    ALETHEIA_POOL_DIR.
+  - Cada script llama a obtener_driver(): si hay pool, arrienda un Chrome
+    libre y se conecta a él (debuggerAddress); si no, arranca uno propio.
+  - liberar_driver() devuelve el Chrome al pool sumando las páginas
+    cargadas. main.py recicla (cierra y vuelve a abrir) los Chrome que
+    superan ALETHEIA_POOL_RECICLAR páginas para que la memoria no crezca.
+
+Variables de entorno:
+  ALETHEIA_POOL_NAVEGADORES  Chrome en el pool (por defecto 3; 0 = sin pool)
+  ALETHEIA_POOL_RECICLAR     páginas antes de reciclar un Chrome (por defecto 200)
+  ALETHEIA_POOL_ESPERA       segundos esperando un Chrome libre antes de
+                             arrancar uno propio (por defecto 120)
+  ALETHEIA_CHROMEDRIVER      ruta a chromedriver ya resuelta (la fija main.py)
+"""
+
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+OPCIONES_BASE = [
+    "--headless",
+    "--start-maximized",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+]
+
+NUM_NAVEGADORES = int(os.environ.get("ALETHEIA_POOL_NAVEGADORES", "3"))
+RECICLAR_CADA = int(os.environ.get("ALETHEIA_POOL_RECICLAR", "200"))
+ESPERA_MAXIMA = float(os.environ.get("ALETHEIA_POOL_ESPERA", "120"))
+
+
+# ---------------------------------------------------------------------------
+# CREACIÓN DE CHROME
+# ---------------------------------------------------------------------------
+def ruta_chromedriver():
+    """
+    Devuelve la ruta de chromedriver. La resolución con webdriver-manager se
+    hace una sola vez por ejecución: main.py la guarda en ALETHEIA_CHROMEDRIVER
+    y los subprocesos la heredan.
+    """
+    ruta = os.environ.get("ALETHEIA_CHROMEDRIVER")
+    if ruta and os.path.exists(ruta):
+        return ruta
+    from webdriver_manager.chrome import ChromeDriverManager
+    ruta = ChromeDriverManager().install()
+    os.environ["ALETHEIA_CHROMEDRIVER"] = ruta
+    return ruta
+
+
+def crear_driver(args_extra=(), experimental=None):
+    """Arranca un Chrome headless propio con las opciones comunes."""
+    options = Options()
+    for arg in list(OPCIONES_BASE) + list(args_extra):
+        options.add_argument(arg)
+    for clave, valor in (experimental or {}).items():
+        options.add_experimental_option(clave, valor)
+    return webdriver.Chrome(service=Service(ruta_chromedriver()), options=options)
+
+
+def _conectar(puerto):
+    """Conecta un driver nuevo a un Chrome del pool ya arrancado."""
+    options = Options()
+    options.debugger_address = f"127.0.0.1:{puerto}"
+    return webdriver.Chrome(service=Service(ruta_chromedriver()), options=options)
+
+
+# ---------------------------------------------------------------------------
+# REGISTRO DEL POOL (compartido entre procesos)
+# ---------------------------------------------------------------------------
+class _Candado:
+    """Candado entre procesos basado en la creación exclusiva de un archivo."""
+
+    def __init__(self, carpeta):
+        self.ruta = os.path.join(carpeta, ".lock")
+
+    def __enter__(self):
+        limite = time.monotonic() + 30
+        while True:
+            try:
+                fd = os.open(self.ruta, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.close(fd)
+                return self
+            except FileExistsError:
+                # Un candado de más de 30 s es de un proceso que murió
+                try:
+                    if time.time() - os.path.getmtime(self.ruta) > 30:
+                        os.remove(self.ruta)
+                        continue
+                except OSError:
+                    pass
+                if time.monotonic() > limite:
+                    raise TimeoutError(f"No se pudo tomar el candado {self.ruta}")
+                time.sleep(0.05)
+
+    def __exit__(self, *exc):
+        try:
+            os.remove(self.ruta)
+        except OSError:
+            pass
+
+
+def _leer(carpeta, nombre):
+    with open(os.path.join(carpeta, nombre), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _escribir(carpeta, nombre, datos):
+    ruta = os.path.join(carpeta, nombre)
+    with open(ruta + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(datos, f)
+    os.replace(ruta + ".tmp", ruta)
+
+
+def _entradas(carpeta):
+    return sorted(n for n in os.listdir(carpeta) if n.startswith("nav_") and n.endswith(".json"))
+
+
+def _proceso_vivo(pid):
+    if os.name != 'posix':
+        return True  # En Windows os.kill(pid, 0) no es una comprobación segura
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+
+# ---------------------------------------------------------------------------
+# LADO DE LOS SCRIPTS: ARRENDAR / LIBERAR
+# ---------------------------------------------------------------------------
+_arriendo = {}  # id(driver) → nombre del .json arrendado
+
+
+def _arrendar(carpeta):
+    """Marca como ocupado un Chrome libre del pool; devuelve (nombre, puerto) o None."""
+    limite = time.monotonic() + ESPERA_MAXIMA
+    while time.monotonic() < limite:
+        with _Candado(carpeta):
+            entradas = _entradas(carpeta)
+            if not entradas:
+                return None  # Todos los Chrome del pool se dieron de baja
+            for nombre in entradas:
+                datos = _leer(carpeta, nombre)
+                if datos.get("en_uso") is None and not datos.get("reciclando"):
+                    datos["en_uso"] = os.getpid()
+                    _escribir(carpeta, nombre, datos)
+                    return nombre, datos["puerto"]
+        time.sleep(0.5)
+    return None
+
+
+def obtener_driver(args_extra=(), experimental=None):
+    """
+    Devuelve un driver listo para usar: arrendado del pool de main.py si
+    existe (ALETHEIA_POOL_DIR), o un Chrome propio en caso contrario.
+    """
+    carpeta = os.environ.get("ALETHEIA_POOL_DIR")
+    if carpeta and os.path.isdir(carpeta):
+        try:
+            arriendo = _arrendar(carpeta)
+        except (TimeoutError, OSError, ValueError) as e:
+            # Registro del pool inaccesible (candado, .json a medias...): Chrome propio
+            print(f"⚠️ No se pudo usar el registro del pool: {e} — arrancando uno propio")
+            return crear_driver(args_extra, experimental)
+        if arriendo:
+            nombre, puerto = arriendo
+            try:
+                driver = _conectar(puerto)
+                _arriendo[id(driver)] = nombre
+                print(f"♻️  Chrome del pool arrendado ({nombre}, puerto {puerto})")
+                return driver
+            except Exception as e:
+                print(f"⚠️ No se pudo conectar al Chrome del pool: {e}")
+                _devolver(carpeta, nombre, 0)
+        else:
+            print("⚠️ Ningún Chrome libre en el pool — arrancando uno propio")
+    return crear_driver(args_extra, experimental)
+
+
+def _devolver(carpeta, nombre, paginas):
+    with _Candado(carpeta):
+        datos = _leer(carpeta, nombre)
+        datos["en_uso"] = None
+        datos["paginas"] = datos.get("paginas", 0) + paginas
+        _escribir(carpeta, nombre, datos)
+
+
+def liberar_driver(driver, paginas=None):
+    """
+    Cierra el driver. Si era del pool, solo se desconecta (Chrome sigue
+    abierto para el siguiente script) y se suman las páginas cargadas.
+    """
+    if driver is None:
+        return
+    nombre = _arriendo.pop(id(driver), None)
+    if nombre is None:
+        driver.quit()
+        return
+
+    if paginas is None:
+        from esperas import PAGINAS_CARGADAS
+        paginas = PAGINAS_CARGADAS
+    try:
+        driver.service.stop()  # No quit(): cerraría el Chrome compartido
+    except Exception:
+        pass
+    _devolver(os.environ["ALETHEIA_POOL_DIR"], nombre, paginas)
+    print(f"♻️  Chrome devuelto al pool ({nombre}, +{paginas} páginas)")
+
+
+# ---------------------------------------------------------------------------
+# LADO DE main.py: INICIAR / VIGILAR / DETENER EL POOL
+# ---------------------------------------------------------------------------
+_pool = {"carpeta": None, "drivers": {}, "hilo": None, "parar": threading.Event()}
+
+
+def _puerto_libre():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _arrancar_navegador(carpeta, nombre):
+    puerto = _puerto_libre()
+    driver = crear_driver(args_extra=[f"--remote-debugging-port={puerto}"])
+    _pool["drivers"][nombre] = driver
+    _escribir(carpeta, nombre, {"puerto": puerto, "paginas": 0, "en_uso": None})
+
+
+def iniciar_pool(num_navegadores=None, reciclar_cada=None):
+    """
+    Arranca el pool y exporta ALETHEIA_POOL_DIR para los subprocesos.
+    Devuelve la carpeta del registro, o None si no se pudo (los scripts
+    arrancarán su propio Chrome como antes).
+    """
+    num = NUM_NAVEGADORES if num_navegadores is None else num_navegadores
+    if num <= 0:
+        return None
+    reciclar = RECICLAR_CADA if reciclar_cada is None else reciclar_cada
+
+    try:
+        ruta_chromedriver()  # Se resuelve una vez; los subprocesos heredan la ruta
+        carpeta = tempfile.mkdtemp(prefix="aletheia_pool_")
+        _pool["carpeta"] = carpeta
+        for i in range(num):
+            _arrancar_navegador(carpeta, f"nav_{i}.json")
+    except Exception as e:
+        print(f"⚠️ No se pudo iniciar el pool de Chrome: {e}")
+        detener_pool()
+        return None
+
+    os.environ["ALETHEIA_POOL_DIR"] = carpeta
+    _pool["parar"].clear()
+    _pool["hilo"] = threading.Thread(
+        target=_vigilar, args=(carpeta, reciclar), daemon=True
+    )
+    _pool["hilo"].start()
+    print(f"♻️  Pool de {num} Chrome listo (reciclado cada {reciclar} páginas)")
+    return carpeta
+
+
+def _vigilar(carpeta, reciclar_cada):
+    """Recicla los Chrome libres que superan el límite de páginas y
+    recupera los arriendos de procesos que terminaron sin liberar."""
+    parar = _pool["parar"]
+    while not parar.is_set():
+        for nombre in list(_pool["drivers"]):
+            if parar.is_set():
+                break
+            try:
+                with _Candado(carpeta):
+                    datos = _leer(carpeta, nombre)
+                    pid = datos.get("en_uso")
+                    if pid is not None and not _proceso_vivo(pid):
+                        datos["en_uso"] = None
+                        _escribir(carpeta, nombre, datos)
+                    if datos.get("en_uso") is not None or datos.get("paginas", 0) < reciclar_cada:
+                        continue
+                    datos["reciclando"] = True
+                    _escribir(carpeta, nombre, datos)
+
+                _reciclar(carpeta, nombre, datos["paginas"])
+            except Exception as e:
+                print(f"⚠️ Error vigilando el pool ({nombre}): {e}")
+        parar.wait(1)
+
+
+def _reciclar(carpeta, nombre, paginas):
+    """
+    Cierra un Chrome y arranca otro en su hueco. Si el nuevo no arranca, el
+    hueco se da de baja (sin su .json nadie espera por él) en lugar de
+    quedarse marcado como "reciclando" para siempre.
+    """
+    print(f"♻️  Reciclando {nombre} tras {paginas} páginas")
+    try:
+        _pool["drivers"].pop(nombre).quit()
+    except Exception:
+        pass
+    try:
+        _arrancar_navegador(carpeta, nombre)
+    except Exception as e:
+        print(f"⚠️ No se pudo rearrancar {nombre}, el pool sigue sin él: {e}")
+        with _Candado(carpeta):
+            try:
+                os.remove(os.path.join(carpeta, nombre))
+            except OSError:
+                pass
+
+
+def detener_pool():
+    """Cierra todos los Chrome del pool y borra el registro."""
+    # Primero se para el vigilante: un reciclado a medias terminaría
+    # arrancando un Chrome sin cerrar o escribiendo en la carpeta ya borrada
+    _pool["parar"].set()
+    if _pool["hilo"] is not None:
+        _pool["hilo"].join()
+        _pool["hilo"] = None
+    for driver in _pool["drivers"].values():
+        try:
+            driver.quit()
+        except Exception:
+            pass
+    _pool["drivers"].clear()
+    if _pool["carpeta"]:
+        shutil.rmtree(_pool["carpeta"], ignore_errors=True)
+        _pool["carpeta"] = None
+    os.environ.pop("ALETHEIA_POOL_DIR", None)
@@ -0,0 +1,174 @@
+"""
+ALETHEIA - Piezas comunes de una página de partido de VLR.gg
+Cada script derivaba a su manera el match_id, el nombre del mapa y las URLs
+de las pestañas; aquí hay una sola versión para que todos los map_id
+coincidan ("598923_bind" en mapas, rondas, stats, enfrentamientos y economía).
+
+descargar_pestanas() trae overview / performance / economy de un partido
+una sola vez (a través de la caché compartida) y construir_modelo() las
+parsea una sola vez; el extractor unificado (scrapear_partido_completo.py)
+ejecuta sobre ese modelo los parsers de todas las tablas.
+
+parsear_pagina() usa lxml y solo construye el árbol de la cabecera y de los
+contenedores vm-stats-game, que es lo único que leen los parsers.
+"""
+
+import os
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+import traza
+from cache_paginas import obtener_html
+from descargas import PARSER, descargar_html
+from esperas import SELECTOR_CONTENEDORES, SELECTOR_ECONOMIA, SELECTOR_MATRIZ, cargar_y_esperar
+
+# ALETHEIA_PARSEO=completo construye el árbol de toda la página (depuración)
+PARSEO_COMPLETO = os.environ.get("ALETHEIA_PARSEO", "").lower() == "completo"
+
+# Únicos nodos que leen los parsers de partido: la cabecera (torneo, fecha,
+# equipos, score, veto) y los contenedores de mapa con su selector. Del resto
+# de la página (menú, comentarios, scripts) no se construye árbol.
+CLASES_LEIDAS = {
+    'match-header-event', 'match-header-date', 'match-header-vs',
+    'match-header-vs-score', 'match-header-note', 'match-header-link-name',
+    'vm-stats-game', 'vm-stats-gamesnav-item',
+}
+
+
+def _clase_leida(clase):
+    # Durante el parseo el atributo class llega como texto sin separar
+    if not clase:
+        return False
+    clases = clase.split() if isinstance(clase, str) else clase
+    return not CLASES_LEIDAS.isdisjoint(clases)
+
+
+SOLO_NODOS_LEIDOS = SoupStrainer(['div', 'a'], class_=_clase_leida)
+
+# pestaña → (selector que debe existir antes de leer page_source, paso de espera)
+PESTANAS = {
+    'overview':    (SELECTOR_CONTENEDORES, 'carga'),
+    'performance': (SELECTOR_MATRIZ,       'pestana'),
+    'economy':     (SELECTOR_ECONOMIA,     'pestana'),
+}
+
+
+def match_id_de_url(url):
+    """match_id numérico de la URL del partido, o "Unknown"."""
+    match = re.search(r'vlr\.gg/(\d+)', url)
+    return match.group(1) if match else "Unknown"
+
+
+def url_pestana(url, pestana):
+    """URL de una pestaña del partido ('overview' = la URL sin ?tab)."""
+    base = url.split('?')[0].rstrip('/')
+    if pestana == 'overview':
+        return url
+    return f"{base}/?tab={pestana}"
+
+
+def limpiar_map_name(raw_text):
+    """
+    Convierte el texto crudo del nombre de un mapa a minúsculas y sin adornos.
+    Ejemplos:
+      "AbyssPICK-"      → "abyss"
+      "Bind PICK 45:12" → "bind"
+      "Haven-"          → "haven"
+      "2Split"          → "split"  (botón del selector de mapas)
+    """
+    texto = re.sub(r'^\d+', '', raw_text.strip())
+    # Tomar solo letras consecutivas al inicio
+    match = re.match(r'([A-Za-z]+)', texto)
+    if match:
+        nombre = match.group(1)
+        # Quitar "PICK", "DECIDER" si quedaron pegados
+        nombre = re.sub(r'(?i)(pick|decider)$', '', nombre)
+        return nombre.lower()
+    return texto.lower()
+
+
+def parsear_pagina(html):
+    """
+    BeautifulSoup (lxml) de una página de partido con solo los subárboles de
+    CLASES_LEIDAS; los parsers de todas las pestañas funcionan igual sobre él.
+    """
+    with traza.tramo('parseo', bytes=len(html)):
+        if PARSEO_COMPLETO:
+            return BeautifulSoup(html, PARSER)
+        return BeautifulSoup(html, PARSER, parse_only=SOLO_NODOS_LEIDOS)
+
+
+def mapas_del_partido(soup, match_id):
+    """
+    Mapas jugados, en orden: [{'game_id', 'map_name', 'map_id'}].
+    Sirve para cualquier pestaña: usa la cabecera div.map de cada
+    contenedor vm-stats-game y, si no la hay (performance / economy), el
+    texto de los botones del selector de mapas.
+    """
+    mapas = []
+    for contenedor in soup.find_all('div', class_='vm-stats-game'):
+        game_id = contenedor.get('data-game-id')
+        map_div = contenedor.find('div', class_='map')
+        if game_id and game_id != 'all' and map_div:
+            mapas.append((game_id, map_div.get_text(" ", strip=True)))
+
+    if not mapas:
+        for boton in soup.find_all('div', class_='vm-stats-gamesnav-item'):
+            game_id = boton.get('data-game-id')
+            if game_id and game_id != 'all':
+                mapas.append((game_id, boton.get_text(strip=True)))
+
+    resultado = []
+    for game_id, texto in mapas:
+        map_name = limpiar_map_name(texto)
+        if map_name:
+            resultado.append({
+                'game_id':  game_id,
+                'map_name': map_name,
+                'map_id':   f"{match_id}_{map_name}",
+            })
+    return resultado
+
+
+def descargar_pestanas(url, driver=None, pestanas=tuple(PESTANAS)):
+    """
+    Devuelve {pestaña: html o None} de un partido, cada pestaña una sola vez
+    (caché → Selenium o HTTP). Con driver=None se descarga por HTTP.
+    """
+    htmls = {}
+    for pestana in pestanas:
+        url_tab = url_pestana(url, pestana)
+        selector, paso = PESTANAS[pestana]
+
+        def descargar(url_tab=url_tab, selector=selector, paso=paso):
+            print(f"  🔗 Navegando a: {url_tab}")
+            if driver is None:
+                return descargar_html(url_tab)
+            return cargar_y_esperar(driver, url_tab, selector, paso=paso)
+
+        try:
+            htmls[pestana] = obtener_html(url_tab, descargar)
+        except Exception as e:
+            print(f"  ❌ Error cargando {pestana}: {e}")
+            htmls[pestana] = None
+    return htmls
+
+
+def construir_modelo(url, htmls):
+    """
+    Modelo parseado de un partido: cada pestaña se parsea una sola vez.
+      {'url', 'match_id', 'html': {pestaña: html}, 'soup': {pestaña: soup},
+       'mapas': mapas_del_partido(overview)}
+    Las pestañas que no se pudieron descargar quedan fuera de 'soup'.
+    """
+    match_id = match_id_de_url(url)
+    soups = {p: parsear_pagina(html) for p, html in htmls.items() if html}
+    overview = soups.get('overview')
+    return {
+        'url': url,
+        'match_id': match_id,
+        'html': htmls,
+        'soup': soups,
+        'mapas': mapas_del_partido(overview, match_id) if overview is not None else [],
+    }
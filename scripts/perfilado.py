@@ -0,0 +1,273 @@
+"""
+ALETHEIA - Perfilado opcional de cualquier script
+Para encontrar dónde se va el tiempo de un script lento (p. ej. volver a
+parsear la misma página varias veces) no hace falta editarlo: todos los
+scripts importan este módulo al principio y, con ALETHEIA_PERFIL activo,
+se perfilan enteros (hilo principal y hilos de descarga) hasta que terminan.
+
+Modos:
+  determinista  cProfile: cada llamada, tiempo propio y acumulado (más coste;
+                uno por hilo hasta Python 3.11, uno por proceso desde 3.12)
+  muestreo      cada ALETHEIA_PERFIL_INTERVALO_MS se toma la pila de todos los
+                hilos (tiempo de reloj, incluye esperas de red; poco coste)
+
+Cada proceso escribe su archivo en ALETHEIA_PERFIL_DIR:
+  <script>.<evento>.<pid>.prof   (determinista; se abre con pstats / snakeviz)
+  <script>.<evento>.<pid>.txt    (muestreo; pilas plegadas "a;b;c N", formato
+                                  de flamegraph.pl / speedscope)
+
+informe() junta todos los archivos de una carpeta en un top-N de funciones;
+main.py ([P]) activa el perfilado para la sesión y lo imprime al final de
+cada opción. A mano:
+
+  ALETHEIA_PERFIL=1 ALETHEIA_TXT_FILE=enlaces_vct.txt python scripts/scrapear_partidos.py
+  python scripts/perfilado.py output_data/perfiles --top 30
+
+Variables de entorno:
+  ALETHEIA_PERFIL               determinista (o 1) / muestreo; vacío = desactivado
+  ALETHEIA_PERFIL_DIR           carpeta de los perfiles (por defecto output_data/perfiles/)
+  ALETHEIA_PERFIL_INTERVALO_MS  intervalo del muestreo (por defecto 5)
+  ALETHEIA_PERFIL_TOP           funciones del informe (por defecto 25)
+"""
+
+import atexit
+import cProfile
+import glob
+import os
+import pstats
+import sys
+import sysconfig
+import threading
+from collections import Counter
+from datetime import datetime
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+STDLIB = sysconfig.get_paths()['stdlib']
+CARPETA_PERFILES = os.environ.get("ALETHEIA_PERFIL_DIR", os.path.join(RAIZ, 'output_data', 'perfiles'))
+INTERVALO = float(os.environ.get("ALETHEIA_PERFIL_INTERVALO_MS", "5")) / 1000
+TOP = int(os.environ.get("ALETHEIA_PERFIL_TOP", "25"))
+
+MODOS = {'1': 'determinista', 'determinista': 'determinista', 'cprofile': 'determinista',
+         'muestreo': 'muestreo'}
+MODO = MODOS.get(os.environ.get("ALETHEIA_PERFIL", "").strip().lower())
+
+# Hasta Python 3.11 cProfile solo ve el hilo que lo activa: hace falta uno
+# por hilo. Desde 3.12 usa sys.monitoring, que es de todo el proceso: un
+# solo perfilador ve todos los hilos y un segundo enable() lanza ValueError.
+UN_PERFIL_POR_HILO = sys.version_info < (3, 12)
+
+_candado = threading.Lock()
+_perfiles = []      # un cProfile.Profile por hilo (determinista)
+_muestreador = None
+
+
+def carpeta_de_sesion():
+    """output_data/perfiles/<fecha>/: una carpeta por sesión de main.py."""
+    return os.path.join(RAIZ, 'output_data', 'perfiles', f"{datetime.now():%Y%m%d_%H%M%S}")
+
+
+def nombre_script():
+    return os.path.splitext(os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else "python")[0]
+
+
+def ruta_perfil(extension):
+    evento = os.path.splitext(os.path.basename(os.environ.get("ALETHEIA_TXT_FILE", "")))[0]
+    evento = evento.replace("enlaces_", "", 1) or "sin_evento"
+    return os.path.join(CARPETA_PERFILES, f"{nombre_script()}.{evento}.{os.getpid()}{extension}")
+
+
+# ---------------------------------------------------------------------------
+# DETERMINISTA (cProfile: uno por hilo hasta 3.11, uno por proceso desde 3.12)
+# ---------------------------------------------------------------------------
+def _perfilar_hilo(frame, evento, arg):
+    # Primera llamada de un hilo nuevo: cProfile sustituye a este gancho
+    perfil = cProfile.Profile()
+    with _candado:
+        _perfiles.append(perfil)
+    perfil.enable()
+
+
+def _guardar_determinista():
+    threading.setprofile(None)
+    with _candado:
+        perfiles = list(_perfiles)
+    for perfil in perfiles:
+        perfil.disable()
+    stats = pstats.Stats(perfiles[0])
+    for perfil in perfiles[1:]:
+        stats.add(perfil)
+    ruta = ruta_perfil(".prof")
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    stats.dump_stats(ruta)
+    return ruta
+
+
+# ---------------------------------------------------------------------------
+# MUESTREO (pila de todos los hilos cada INTERVALO)
+# ---------------------------------------------------------------------------
+def _nombre_funcion(codigo):
+    return f"{_ruta_corta(codigo.co_filename)}:{codigo.co_firstlineno}({codigo.co_name})"
+
+
+class Muestreador(threading.Thread):
+    def __init__(self, intervalo):
+        super().__init__(name="perfilado", daemon=True)
+        self.intervalo = intervalo
+        self.pilas = Counter()
+        self._parar = threading.Event()
+
+    def run(self):
+        propio = threading.get_ident()
+        while not self._parar.wait(self.intervalo):
+            for ident, frame in sys._current_frames().items():
+                if ident == propio:
+                    continue
+                pila = []
+                while frame is not None:
+                    pila.append(_nombre_funcion(frame.f_code))
+                    frame = frame.f_back
+                self.pilas[";".join(reversed(pila))] += 1
+
+    def parar(self):
+        self._parar.set()
+        self.join()
+
+
+def _guardar_muestreo():
+    _muestreador.parar()
+    ruta = ruta_perfil(".txt")
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    with open(ruta, 'w', encoding='utf-8') as f:
+        for pila, n in _muestreador.pilas.most_common():
+            f.write(f"{pila} {n}\n")
+    return ruta
+
+
+# ---------------------------------------------------------------------------
+# ARRANQUE Y CIERRE
+# ---------------------------------------------------------------------------
+def iniciar():
+    """Empieza a perfilar este proceso si ALETHEIA_PERFIL lo pide (una sola vez)."""
+    global _muestreador
+    # main.py solo lanza procesos: se perfilan los scripts, no el menú
+    if MODO is None or _perfiles or _muestreador or nombre_script() in ("main", "perfilado"):
+        return
+    if MODO == 'determinista':
+        if UN_PERFIL_POR_HILO:
+            threading.setprofile(_perfilar_hilo)
+        perfil = cProfile.Profile()
+        _perfiles.append(perfil)
+        perfil.enable()
+    else:
+        _muestreador = Muestreador(INTERVALO)
+        _muestreador.start()
+    atexit.register(_terminar)
+
+
+def _terminar():
+    try:
+        ruta = _guardar_determinista() if _perfiles else _guardar_muestreo()
+        print(f"🔥 Perfil ({MODO}) guardado en: {ruta}")
+    except Exception as e:
+        print(f"⚠️ No se pudo guardar el perfil: {e}")
+
+
+# ---------------------------------------------------------------------------
+# INFORME COMBINADO
+# ---------------------------------------------------------------------------
+def _ruta_corta(archivo):
+    """Rutas del repo relativas; las de librerías desde site-packages o la stdlib."""
+    if archivo.startswith(RAIZ):
+        return os.path.relpath(archivo, RAIZ)
+    if "site-packages" in archivo:
+        return archivo.split("site-packages" + os.sep, 1)[1]
+    if archivo.startswith(STDLIB):
+        return os.path.relpath(archivo, STDLIB)
+    return archivo
+
+
+def _texto_determinista(rutas, top):
+    stats = pstats.Stats(rutas[0])
+    for ruta in rutas[1:]:
+        stats.add(ruta)
+    funciones = [(pstats.func_std_string((_ruta_corta(f[0]),) + f[1:]), tt, ct, nc)
+                 for f, (cc, nc, tt, ct, callers) in stats.stats.items()]
+    lineas = [f"   Tiempo total perfilado: {stats.total_tt:.1f}s (suma de hilos)"]
+    for titulo, indice in (("tiempo propio", 1), ("tiempo acumulado", 2)):
+        lineas.append(f"\n   Top {top} por {titulo}")
+        lineas.append(f"   {'propio':>9}{'acum.':>9}{'llamadas':>10}  función")
+        for nombre, tt, ct, nc in sorted(funciones, key=lambda f: -f[indice])[:top]:
+            lineas.append(f"   {tt:>8.2f}s{ct:>8.2f}s{nc:>10}  {nombre}")
+    return lineas
+
+
+def _texto_muestreo(rutas, top):
+    propio = Counter()
+    total = Counter()
+    muestras = 0
+    for ruta in rutas:
+        with open(ruta, 'r', encoding='utf-8') as f:
+            for linea in f:
+                pila, _, n = linea.rstrip("\n").rpartition(" ")
+                if not pila:
+                    continue
+                n = int(n)
+                funciones = pila.split(";")
+                muestras += n
+                propio[funciones[-1]] += n
+                for funcion in set(funciones):
+                    total[funcion] += n
+    if not muestras:
+        return ["   Sin muestras"]
+    lineas = [f"   Muestras: {muestras} (tiempo de reloj, todos los hilos)"]
+    for titulo, contador in (("tiempo propio", propio), ("tiempo acumulado", total)):
+        lineas.append(f"\n   Top {top} por {titulo}")
+        lineas.append(f"   {'propio':>8}{'acum.':>8}  función")
+        for funcion, _ in contador.most_common(top):
+            lineas.append(f"   {100 * propio[funcion] / muestras:>7.1f}%"
+                          f"{100 * total[funcion] / muestras:>7.1f}%  {funcion}")
+    return lineas
+
+
+def informe(carpeta=None, top=None):
+    """
+    Junta los perfiles de `carpeta` (.prof y .txt) en un top-N de funciones
+    por tiempo propio y acumulado. Lo devuelve como texto y lo guarda en
+    <carpeta>/informe.txt; None si no hay perfiles.
+    """
+    carpeta = carpeta or CARPETA_PERFILES
+    top = top or TOP
+    deterministas = sorted(glob.glob(os.path.join(carpeta, "*.prof")))
+    muestreos = sorted(r for r in glob.glob(os.path.join(carpeta, "*.txt"))
+                       if os.path.basename(r) != "informe.txt")
+    if not deterministas and not muestreos:
+        return None
+
+    lineas = [f"🔥 Perfiles de {carpeta}"]
+    for titulo, rutas, texto in (("Determinista (cProfile)", deterministas, _texto_determinista),
+                                 ("Muestreo", muestreos, _texto_muestreo)):
+        if not rutas:
+            continue
+        scripts = Counter(os.path.basename(r).split(".", 1)[0] for r in rutas)
+        lineas.append(f"\n  {titulo}: {len(rutas)} archivos — "
+                      + ", ".join(f"{s} ×{n}" for s, n in sorted(scripts.items())))
+        lineas.extend(texto(rutas, top))
+
+    resultado = "\n".join(lineas)
+    with open(os.path.join(carpeta, "informe.txt"), 'w', encoding='utf-8') as f:
+        f.write(resultado + "\n")
+    return resultado
+
+
+iniciar()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Informe combinado de los perfiles de una carpeta.")
+    parser.add_argument("carpeta", nargs="?", default=CARPETA_PERFILES)
+    parser.add_argument("--top", type=int, default=TOP)
+    args = parser.parse_args()
+    texto = informe(args.carpeta, args.top)
+    print(texto or f"⚠️ No hay perfiles en {args.carpeta}")
@@ -0,0 +1,157 @@
+"""
+ALETHEIA - Reintentos con backoff y lista de fallidos
+Antes un error transitorio (timeout, 5xx, bloqueo momentáneo) hacía que el
+script imprimiera el error y siguiera sin ese partido; la única forma de
+recuperarlo era repetir el evento entero.
+
+con_reintentos() ejecuta una descarga (HTTP o Chrome) que lanza
+ErrorDescarga con el tipo de error ya clasificado:
+
+  timeout    la petición o la carga no terminó a tiempo      → se reintenta
+  red        conexión rechazada / cortada                    → se reintenta
+  http_5xx   error del servidor                              → se reintenta
+  429        demasiadas peticiones                           → se reintenta
+  bloqueo    página "Access Denied" de VLR.gg                → se reintenta
+  http_4xx   404 y demás errores del cliente                 → fallo definitivo
+
+Entre intentos se espera un backoff exponencial con jitter completo
+(aleatorio entre 0 y base·2^intento, con tope). Las URLs que agotan los
+intentos quedan en FALLIDOS; procesar_partidos() no deja checkpoint de esos
+partidos y los escribe en <carpeta del evento>/fallidos/<script>.txt, que
+main.py ([F]) puede reintentar por separado.
+
+Variables de entorno:
+  ALETHEIA_REINTENTOS        reintentos tras el primer intento (por defecto 3)
+  ALETHEIA_BACKOFF_BASE      segundos base del backoff (por defecto 2)
+  ALETHEIA_BACKOFF_MAX       tope de cada espera en segundos (por defecto 60)
+"""
+
+import os
+import random
+import re
+import threading
+import time
+
+import traza
+from cache_paginas import es_pagina_bloqueada
+
+REINTENTOS = int(os.environ.get("ALETHEIA_REINTENTOS", "3"))
+BACKOFF_BASE = float(os.environ.get("ALETHEIA_BACKOFF_BASE", "2"))
+BACKOFF_MAX = float(os.environ.get("ALETHEIA_BACKOFF_MAX", "60"))
+
+TIPOS_REINTENTABLES = {'timeout', 'red', 'http_5xx', '429', 'bloqueo'}
+
+# Fallos definitivos de este proceso: [{'url', 'tipo', 'detalle', 'intentos'}]
+FALLIDOS = []
+_candado = threading.Lock()
+
+
+class ErrorDescarga(Exception):
+    """Error de descarga ya clasificado (ver tipos en el docstring del módulo)."""
+
+    def __init__(self, tipo, detalle=""):
+        super().__init__(f"{tipo}: {detalle}" if detalle else tipo)
+        self.tipo = tipo
+        self.detalle = detalle
+
+    @property
+    def reintentable(self):
+        return self.tipo in TIPOS_REINTENTABLES
+
+
+def clasificar_respuesta(status_code, html=""):
+    """ErrorDescarga para una respuesta HTTP fallida, o None si es válida."""
+    if status_code == 429:
+        return ErrorDescarga('429', "HTTP 429")
+    if es_pagina_bloqueada(html or ""):
+        return ErrorDescarga('bloqueo', f"Access Denied (HTTP {status_code})")
+    if status_code >= 500:
+        return ErrorDescarga('http_5xx', f"HTTP {status_code}")
+    if status_code != 200:
+        return ErrorDescarga('http_4xx', f"HTTP {status_code}")
+    return None
+
+
+def clasificar_excepcion(e):
+    """ErrorDescarga para una excepción de requests o de Selenium."""
+    if isinstance(e, ErrorDescarga):
+        return e
+    nombre = type(e).__name__.lower()
+    texto = str(e).lower()
+    if 'timeout' in nombre or 'timed out' in texto or 'timeout' in texto:
+        return ErrorDescarga('timeout', str(e).splitlines()[0] if str(e) else type(e).__name__)
+    return ErrorDescarga('red', str(e).splitlines()[0] if str(e) else type(e).__name__)
+
+
+def espera_backoff(intento):
+    """Segundos antes del reintento número `intento` (0, 1, 2...): jitter completo."""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** intento)))
+
+
+def con_reintentos(url, intento):
+    """
+    Llama a `intento()` (devuelve el HTML o lanza una excepción) hasta que
+    funcione o se agoten los reintentos. Devuelve el HTML, o None si falló
+    de forma definitiva (y la URL queda en FALLIDOS).
+    """
+    for n in range(REINTENTOS + 1):
+        try:
+            return intento()
+        except Exception as e:
+            error = clasificar_excepcion(e)
+
+        if not error.reintentable or n == REINTENTOS:
+            break
+        espera = espera_backoff(n)
+        print(f"  🔁 {error} en {url} → reintento {n + 1}/{REINTENTOS} en {espera:.1f}s")
+        traza.contar("reintentos")
+        time.sleep(espera)
+
+    print(f"  📮 Fallo definitivo ({error}) en {url}")
+    traza.contar("fallos_definitivos")
+    with _candado:
+        FALLIDOS.append({'url': url, 'tipo': error.tipo, 'detalle': error.detalle,
+                         'intentos': n + 1})
+    return None
+
+
+def fallos_de_partido(match_id):
+    """Fallos definitivos de este proceso en páginas del partido `match_id`."""
+    patron = re.compile(rf'vlr\.gg/{re.escape(str(match_id))}(?:\D|$)')
+    with _candado:
+        return [f for f in FALLIDOS if patron.search(f['url'])]
+
+
+CARPETA_FALLIDOS = "fallidos"
+
+
+def ruta_fallidos(carpeta_salida, script):
+    # En una subcarpeta: los .txt sueltos de output_data/ son listas de enlaces
+    return os.path.join(carpeta_salida, CARPETA_FALLIDOS, f"{script}.txt")
+
+
+def guardar_fallidos(carpeta_salida, script, urls):
+    """
+    Escribe la lista de partidos fallidos de esta ejecución (una URL por
+    línea, como los enlaces_*.txt) o la borra si no hubo ninguno.
+    """
+    ruta = ruta_fallidos(carpeta_salida, script)
+    if not urls:
+        if os.path.exists(ruta):
+            os.remove(ruta)
+        return None
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    with open(ruta, 'w', encoding='utf-8') as f:
+        f.write("\n".join(urls) + "\n")
+    return ruta
+
+
+def resumen_fallos():
+    """Texto corto con los fallos definitivos del proceso por tipo."""
+    with _candado:
+        if not FALLIDOS:
+            return "📮 Fallos definitivos: ninguno"
+        por_tipo = {}
+        for fallo in FALLIDOS:
+            por_tipo[fallo['tipo']] = por_tipo.get(fallo['tipo'], 0) + 1
+    return "📮 Fallos definitivos: " + ", ".join(f"{t}: {n}" for t, n in por_tipo.items())
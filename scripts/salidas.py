@@ -0,0 +1,154 @@
+"""
+ALETHEIA - Capa de salida de tablas
+Todos los scripts escriben y leen sus tablas a través de este módulo en lugar
+de llamar directamente a DataFrame.to_excel / pd.read_excel.
+
+Formatos (ALETHEIA_FORMATOS, separados por coma; por defecto "parquet,xlsx"):
+  parquet  Parquet tipado (pyarrow): lectura rápida y por columnas para los
+           scripts que consumen otras tablas (China lee vlr_mapas) y para
+           el análisis posterior.
+  xlsx     Exportación para Excel, igual que hasta ahora. Con
+           ALETHEIA_FORMATOS=parquet no se escribe (openpyxl es el escritor
+           más lento de pandas).
+
+Cada tabla se identifica por su nombre sin extensión (vlr_mapas,
+vct_partidos...). leer_tabla() lee la copia escrita más recientemente: si
+una ejecución anterior dejó un Parquet y la actual solo escribe xlsx, gana
+el xlsx. guardar_tabla() escribe el Parquet el último, así que cuando se
+guardan los dos formatos se lee el Parquet.
+Si pyarrow no está instalado se avisa una vez y se escribe solo xlsx.
+"""
+
+import os
+
+import pandas as pd
+
+FORMATOS = [f.strip().lower() for f in
+            os.environ.get("ALETHEIA_FORMATOS", "parquet,xlsx").split(",") if f.strip()]
+
+EXTENSIONES = {'parquet': ".parquet", 'xlsx': ".xlsx"}
+
+try:
+    import pyarrow  # noqa: F401  (motor de DataFrame.to_parquet / read_parquet)
+    HAY_PARQUET = True
+except ImportError:
+    HAY_PARQUET = False
+
+_aviso_parquet = False
+
+
+def nombre_tabla(archivo):
+    """'vlr_mapas.xlsx' → 'vlr_mapas' (acepta también el nombre sin extensión)."""
+    base, ext = os.path.splitext(archivo)
+    return base if ext.lower() in EXTENSIONES.values() else archivo
+
+
+def formatos_activos():
+    """Formatos que se escribirán de verdad (sin Parquet si falta pyarrow)."""
+    global _aviso_parquet
+    formatos = [f for f in FORMATOS if f in EXTENSIONES]
+    if 'parquet' in formatos and not HAY_PARQUET:
+        if not _aviso_parquet:
+            print("⚠️ pyarrow no está instalado: las tablas se guardan solo en xlsx")
+            _aviso_parquet = True
+        formatos = [f for f in formatos if f != 'parquet']
+        if 'xlsx' not in formatos:
+            formatos.append('xlsx')
+    return formatos or ['xlsx']
+
+
+def ruta_tabla(carpeta, nombre, formato):
+    return os.path.join(carpeta, nombre_tabla(nombre) + EXTENSIONES[formato])
+
+
+def es_columna_id(columna):
+    return str(columna).endswith('_id')
+
+
+def id_como_texto(valor):
+    """123, 123.0 y "123" → "123"; los vacíos (None, NaN, NA) siguen vacíos."""
+    if valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+        return pd.NA
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return str(valor)
+
+
+def normalizar_ids(df):
+    """
+    Columnas *_id como texto. Las filas sembradas desde un xlsx o Parquet
+    anterior traen ids numéricos y las recién scrapeadas, texto: sin esto la
+    tabla mezcla tipos y astype(str) convierte los vacíos en "<NA>".
+    """
+    df = df.copy()
+    for col in df.columns:
+        if es_columna_id(col):
+            df[col] = df[col].map(id_como_texto).astype('string')
+    return df
+
+
+def tipar_columnas(df):
+    """
+    Tipos para Parquet: los *_id siempre como texto; las columnas de texto
+    cuyos valores son todos numéricos ("1.23", "45") pasan a número y el resto
+    a string, para que Parquet no reciba columnas object con tipos mezclados.
+    """
+    df = normalizar_ids(df)
+    for col in df.columns:
+        serie = df[col]
+        if es_columna_id(col):
+            continue
+        elif pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie):
+            numerica = pd.to_numeric(serie, errors='coerce')
+            if numerica.notna().sum() == serie.notna().sum() and serie.notna().any():
+                df[col] = numerica
+            else:
+                df[col] = serie.astype('string')
+    return df
+
+
+def guardar_tabla(df, carpeta, nombre, sheet_name="Sheet1"):
+    """
+    Escribe `df` en cada formato activo y devuelve la lista de rutas.
+    El xlsx conserva los valores tal cual; el Parquet lleva tipos.
+    """
+    rutas = []
+    # Parquet el último: leer_tabla() lee la copia más reciente
+    for formato in sorted(formatos_activos(), key=lambda f: f == 'parquet'):
+        ruta = ruta_tabla(carpeta, nombre, formato)
+        if formato == 'parquet':
+            tipar_columnas(df).to_parquet(ruta, index=False)
+        else:
+            df.to_excel(ruta, index=False, sheet_name=sheet_name)
+        rutas.append(ruta)
+    return rutas
+
+
+def existe_tabla(carpeta, nombre):
+    return any(os.path.exists(ruta_tabla(carpeta, nombre, f)) for f in EXTENSIONES)
+
+
+def leer_tabla(carpeta, nombre, columnas=None, dtype=None):
+    """
+    Lee la copia más reciente de una tabla: el Parquet (solo las `columnas`
+    pedidas) o el xlsx. Devuelve None si la tabla no existe en ningún formato.
+    Las columnas *_id siempre salen como texto (vacíos como NA), sea cual
+    sea el formato o el `dtype` pedido.
+    """
+    candidatas = []
+    for formato in ('xlsx', 'parquet'):  # a igual mtime, el Parquet
+        ruta = ruta_tabla(carpeta, nombre, formato)
+        if (formato != 'parquet' or HAY_PARQUET) and os.path.exists(ruta):
+            candidatas.append((os.path.getmtime(ruta), formato, ruta))
+    if not candidatas:
+        return None
+
+    _, formato, ruta = max(candidatas, key=lambda c: c[0])
+    dtype = {c: t for c, t in (dtype or {}).items() if not es_columna_id(c)}
+    if formato == 'parquet':
+        df = pd.read_parquet(ruta, columns=columnas)
+        if dtype:
+            df = df.astype({c: t for c, t in dtype.items() if c in df.columns})
+    else:
+        df = pd.read_excel(ruta, usecols=columnas, dtype=dtype or None)
+    return normalizar_ids(df)
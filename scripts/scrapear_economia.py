@@ -1,15 +1,18 @@
-import time
 import os
+import sys
 import pandas as pd
 import re
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.options import Options
+
+import perfilado  # noqa: F401 — con ALETHEIA_PERFIL perfila el script entero
+import traza
+from interaccion import ELEGIR_TXT, preguntar
+from salidas import guardar_tabla
+from checkpoints import procesar_partidos
+from partido import mapas_del_partido, match_id_de_url, parsear_pagina, url_pestana
+from cache_paginas import obtener_html, resumen_cache
+from descargas import descargar_html, usar_selenium
+from navegadores import liberar_driver, obtener_driver
+from esperas import SELECTOR_ECONOMIA, cargar_y_esperar, resumen_esperas
 
 # Carpeta de salida relativa al script
 OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'output_data')
@@ -33,7 +36,7 @@ def cargar_enlaces_desde_txt():
         archivos = glob.glob(os.path.join(OUTPUT_DIR, "*.txt"))
         if not archivos:
             print("No se encontro ningun archivo .txt en output_data/.")
-            ruta_txt = input("   Ingresa la ruta del archivo .txt: ").strip()
+            ruta_txt = preguntar("   Ingresa la ruta del archivo .txt: ", ELEGIR_TXT).strip()
         elif len(archivos) == 1:
             ruta_txt = archivos[0]
             print(f"Cargando enlaces desde: {os.path.basename(ruta_txt)}")
@@ -43,7 +46,7 @@ def cargar_enlaces_desde_txt():
                 print(f"   [{i+1}] {os.path.basename(f)}")
             while True:
                 try:
-                    sel = int(input("   Selecciona el numero del archivo a usar: ").strip())
+                    sel = int(preguntar("   Selecciona el numero del archivo a usar: ", ELEGIR_TXT).strip())
                     if 1 <= sel <= len(archivos):
                         ruta_txt = archivos[sel - 1]
                         break
@@ -63,7 +66,6 @@ def cargar_enlaces_desde_txt():
     print(f"   Carpeta de salida: {carpeta_salida}")
     return urls, carpeta_salida
 
-ENLACES, OUTPUT_DIR = cargar_enlaces_desde_txt()
 
 # Rondas de pistol en Valorant (siempre ronda 1 y 13)
 RONDAS_PISTOL = {1, 13}
@@ -96,72 +98,51 @@ def categoria_texto(simbolo):
     }
     return mapa.get(simbolo.strip(), 'eco')
 
-def obtener_mapas(soup, match_id):
-    """Detecta los mapas jugados (excluyendo 'all')"""
-    mapas = []
-    botones = soup.find_all('div', class_='vm-stats-gamesnav-item')
-    for b in botones:
-        game_id = b.get('data-game-id')
-        if not game_id or game_id == 'all':
-            continue
-        texto = b.get_text(strip=True)
-        map_name = re.sub(r'^\d+', '', texto).strip().lower()
-        if map_name:
-            mapas.append({
-                'game_id':  game_id,
-                'map_name': map_name,
-                'map_id':   f"{match_id}_{map_name}"
-            })
-    return mapas
-
 def obtener_economia(driver, url):
     """
     Extrae datos de economía por mapa. Genera dos tablas:
       1. Resumen por equipo
       2. Economía por ronda
+    Con driver=None descarga el HTML por HTTP (motor estático, sin Chrome).
     """
     print(f"🌐 Procesando economía: {url}")
 
-    match_id = "Unknown"
-    m = re.search(r'vlr\.gg/(\d+)', url)
-    if m:
-        match_id = m.group(1)
+    economy_url = url_pestana(url, 'economy')
 
-    base_url = url.split('?')[0].rstrip('/')
-    economy_url = f"{base_url}/?tab=economy"
+    def descargar():
+        print(f"  🔗 Navegando a: {economy_url}")
+        if driver is None:
+            return descargar_html(economy_url)
+        return cargar_y_esperar(driver, economy_url, SELECTOR_ECONOMIA, paso='pestana')
 
-    print(f"  🔗 Navegando a: {economy_url}")
     try:
-        driver.get(economy_url)
-        time.sleep(4)
+        html = obtener_html(economy_url, descargar)
     except Exception as e:
         print(f"❌ Error cargando URL: {e}")
         return [], []
+    if html is None:
+        return [], []
+
+    # Los contenedores de todos los mapas ya vienen en el HTML: no hace falta
+    # hacer clic en cada mapa ni volver a leer page_source.
+    return parsear_economia(parsear_pagina(html), match_id_de_url(url))
 
-    soup = BeautifulSoup(driver.page_source, 'html.parser')
-    mapas = obtener_mapas(soup, match_id)
+def parsear_economia(soup, match_id):
+    """
+    Parseo puro (sin red) de la pestaña economy: devuelve (resumen, rondas).
+    """
+    mapas = mapas_del_partido(soup, match_id)
     print(f"  🗺️  Mapas: {[m['map_name'] for m in mapas]}")
 
     resumen_rows = []
     rondas_rows  = []
 
-    for mapa in mapas:
+    for mapa in traza.por_mapa(mapas, 'economia', match_id):
         game_id  = mapa['game_id']
         map_id   = mapa['map_id']
         map_name = mapa['map_name']
         print(f"\n  📍 Procesando: {map_name}")
 
-        # Clic en el mapa
-        try:
-            btn = driver.find_element(By.CSS_SELECTOR,
-                f"div.vm-stats-gamesnav-item[data-game-id='{game_id}']")
-            driver.execute_script("arguments[0].click();", btn)
-            time.sleep(2)
-        except Exception as e:
-            print(f"    ⚠️ Error clic mapa: {e}")
-            continue
-
-        soup      = BeautifulSoup(driver.page_source, 'html.parser')
         contenedor = soup.find('div', class_='vm-stats-game', attrs={'data-game-id': game_id})
         if not contenedor:
             print(f"    ⚠️ No se encontró contenedor")
@@ -326,57 +307,67 @@ def obtener_economia(driver, url):
 
 # ── MAIN ──────────────────────────────────────────────────────────────────────
 if __name__ == "__main__":
+    # Se cargan aquí (no al importar) para poder reutilizar los parsers
+    # desde otros scripts sin pedir un .txt
+    ENLACES, OUTPUT_DIR = cargar_enlaces_desde_txt()
+
     print("🚀 Iniciando extracción de economía...")
     print("=" * 60)
 
-    options = Options()
-    options.add_argument("--headless")
-    options.add_argument("--start-maximized")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-
-    try:
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-    except Exception as e:
-        print(f"❌ Error inicializando driver: {e}")
-        exit()
+    driver = None
+    if usar_selenium():
+        try:
+            driver = obtener_driver()
+        except Exception as e:
+            print(f"❌ Error inicializando driver: {e}")
+            sys.exit(1)
+    else:
+        print("⚡ Motor estático: requests + lxml, sin Chrome")
 
-    todos_resumen = []
-    todas_rondas  = []
+    def extraer(i, link):
+        print(f"\n{'='*60}")
+        print(f"[{i+1}/{len(ENLACES)}] Procesando partido...")
+        resumen, rondas = obtener_economia(driver, link)
+        return {'resumen': resumen, 'rondas': rondas}
 
+    codigo_salida = 0  # ≠ 0 si el scraping falla: main.py --eventos lo trata como error
     try:
-        for i, link in enumerate(ENLACES):
-            print(f"\n{'='*60}")
-            print(f"[{i+1}/{len(ENLACES)}] Procesando partido...")
-            resumen, rondas = obtener_economia(driver, link)
-            todos_resumen.extend(resumen)
-            todas_rondas.extend(rondas)
+        # Cada partido se guarda en su checkpoint al terminarlo
+        tablas = procesar_partidos(ENLACES, OUTPUT_DIR, 'economia', ['resumen', 'rondas'], extraer,
+                                   {'resumen': "vlr_economia_resumen",
+                                    'rondas': "vlr_economia_rondas"})
+        todos_resumen = tablas['resumen']
+        todas_rondas  = tablas['rondas']
 
         print("\n" + "=" * 60)
-        print("💾 Guardando archivos Excel...")
+        print("💾 Guardando tablas...")
 
         if todos_resumen:
             df_res = pd.DataFrame(todos_resumen)
-            ruta_resumen = os.path.join(OUTPUT_DIR, "vlr_economia_resumen.xlsx")
-            df_res.to_excel(ruta_resumen, index=False)
-            print(f"\n✅ {ruta_resumen} — {len(df_res)} filas")
+            rutas = guardar_tabla(df_res, OUTPUT_DIR, "vlr_economia_resumen")
+            print(f"\n✅ {', '.join(rutas)} — {len(df_res)} filas")
             print(df_res.to_string(index=False))
 
         if todas_rondas:
             df_ron = pd.DataFrame(todas_rondas)
-            ruta_rondas = os.path.join(OUTPUT_DIR, "vlr_economia_rondas.xlsx")
-            df_ron.to_excel(ruta_rondas, index=False)
-            print(f"\n✅ {ruta_rondas} — {len(df_ron)} filas")
+            rutas = guardar_tabla(df_ron, OUTPUT_DIR, "vlr_economia_rondas")
+            print(f"\n✅ {', '.join(rutas)} — {len(df_ron)} filas")
             print(df_ron.head(20).to_string(index=False))
 
         if not todos_resumen and not todas_rondas:
             print("\n⚠️ No se extrajeron datos.")
 
+        print(f"\n{resumen_cache()}")
+        print(resumen_esperas())
+
     except Exception as e:
         print(f"\n❌ Error: {e}")
+        codigo_salida = 1
         import traceback
         traceback.print_exc()
     finally:
-        if 'driver' in locals():
-            driver.quit()
-            print("\n🔒 Driver cerrado correctamente")
\ No newline at end of file
+        if driver is not None:
+            liberar_driver(driver)
+            print("\n🔒 Driver cerrado correctamente")
+
+    sys.exit(codigo_salida)
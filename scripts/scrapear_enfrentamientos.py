@@ -1,15 +1,19 @@
-import time
 import os
+import sys
 import pandas as pd
 import re
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.options import Options
+from bs4 import Comment, Tag
+
+import perfilado  # noqa: F401 — con ALETHEIA_PERFIL perfila el script entero
+import traza
+from interaccion import ELEGIR_TXT, preguntar
+from salidas import guardar_tabla
+from checkpoints import procesar_partidos
+from partido import mapas_del_partido, match_id_de_url, parsear_pagina, url_pestana
+from cache_paginas import obtener_html, resumen_cache
+from descargas import descargar_html, usar_selenium
+from navegadores import liberar_driver, obtener_driver
+from esperas import SELECTOR_MATRIZ, cargar_y_esperar, resumen_esperas
 
 # Carpeta de salida relativa al script
 OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'output_data')
@@ -33,7 +37,7 @@ def cargar_enlaces_desde_txt():
         archivos = glob.glob(os.path.join(OUTPUT_DIR, "*.txt"))
         if not archivos:
             print("No se encontro ningun archivo .txt en output_data/.")
-            ruta_txt = input("   Ingresa la ruta del archivo .txt: ").strip()
+            ruta_txt = preguntar("   Ingresa la ruta del archivo .txt: ", ELEGIR_TXT).strip()
         elif len(archivos) == 1:
             ruta_txt = archivos[0]
             print(f"Cargando enlaces desde: {os.path.basename(ruta_txt)}")
@@ -43,7 +47,7 @@ def cargar_enlaces_desde_txt():
                 print(f"   [{i+1}] {os.path.basename(f)}")
             while True:
                 try:
-                    sel = int(input("   Selecciona el numero del archivo a usar: ").strip())
+                    sel = int(preguntar("   Selecciona el numero del archivo a usar: ", ELEGIR_TXT).strip())
                     if 1 <= sel <= len(archivos):
                         ruta_txt = archivos[sel - 1]
                         break
@@ -63,427 +67,327 @@ def cargar_enlaces_desde_txt():
     print(f"   Carpeta de salida: {carpeta_salida}")
     return urls, carpeta_salida
 
-ENLACES, OUTPUT_DIR = cargar_enlaces_desde_txt()
 
-def obtener_mapas_jugados(driver, match_id):
-    """
-    Detecta qué mapas se jugaron en el partido
-    """
-    soup = BeautifulSoup(driver.page_source, 'html.parser')
-    
-    # Buscar los botones de mapas
-    map_buttons = soup.find_all('div', class_='vm-stats-gamesnav-item')
-    
-    mapas = []
-    for button in map_buttons:
-        game_id = button.get('data-game-id')
-        if game_id and game_id != 'all':
-            # Extraer nombre del mapa
-            map_text = button.get_text(strip=True)
-            # El texto puede ser algo como "1Bind" o "2Abyss"
-            map_name = re.sub(r'^\d+', '', map_text).strip()  # Quitar número inicial
-            if map_name:
-                mapas.append({
-                    'game_id': game_id,
-                    'map_name': map_name.lower(),
-                    'map_id': f"{match_id}_{map_name.lower()}"
-                })
-    
-    return mapas
+# Tipos de kill → valor de data-matrix / clase mod-<tipo> de cada tabla
+TIPOS_KILL = {
+    'all': 'normal',
+    'first': 'fkfd',
+    'op': 'op'
+}
 
-def obtener_enfrentamientos_por_mapa(driver, url):
+def cargar_performance(driver, url):
     """
-    Extrae las matrices de enfrentamientos por cada mapa jugado
+    Devuelve el HTML de la pestaña Performance (caché → Selenium o HTTP).
+    Con driver=None se descarga por HTTP (motor estático, sin Chrome).
     """
-    print(f"🌐 Procesando enfrentamientos: {url}")
-    
-    # Obtener Match ID
-    match_id = "Unknown"
-    match_search = re.search(r'vlr\.gg/(\d+)', url)
-    if match_search:
-        match_id = match_search.group(1)
-    
-    # Construir URL de Performance
-    if '?' in url:
-        performance_url = url.split('?')[0] + '?tab=performance'
-    else:
-        performance_url = url.rstrip('/') + '/?tab=performance'
-    
-    print(f"  🔗 Navegando a: {performance_url}")
-    
+    performance_url = url_pestana(url, 'performance')
+
+    def descargar():
+        print(f"  🔗 Navegando a: {performance_url}")
+        if driver is None:
+            return descargar_html(performance_url)
+        return cargar_y_esperar(driver, performance_url, SELECTOR_MATRIZ, paso='pestana')
+
     try:
-        driver.get(performance_url)
-        time.sleep(4)
+        return obtener_html(performance_url, descargar)
     except Exception as e:
         print(f"❌ Error cargando URL: {e}")
-        return []
+        return None
 
-    # Detectar mapas jugados
-    mapas = obtener_mapas_jugados(driver, match_id)
-    print(f"  🗺️ Mapas encontrados: {[m['map_name'] for m in mapas]}")
-    
-    if not mapas:
-        print("  ⚠️ No se encontraron mapas")
+def nombre_jugador_celda(celda):
+    """
+    Devuelve el nombre del jugador de una celda de matriz/stats avanzadas
+    (sin el team-tag), o "" si la celda no tiene jugador.
+    """
+    team_div = celda.find('div', class_='team')
+    if not team_div:
+        return ""
+    # Encontrar el div hijo que contiene el nombre
+    div_contenedor = team_div.find('div')
+    if not div_contenedor:
+        return ""
+    # Eliminar el div del equipo si existe
+    team_tag = div_contenedor.find('div', class_='team-tag')
+    if team_tag:
+        team_tag.decompose()
+    return div_contenedor.get_text(strip=True)
+
+def extraer_matriz(tabla, match_id, map_id, tipo_nombre):
+    """
+    Convierte una tabla mod-matrix (normal / fkfd / op) en filas
+    player_a vs player_b con formato kills "realizadas/recibidas"
+    """
+    filas = tabla.find_all('tr')
+    if len(filas) < 2:
         return []
 
-    todos_enfrentamientos = []
-    
-    # Tipos de kill
-    tipos_kill = {
-        'all': 'normal',
-        'first': 'fkfd',
-        'op': 'op'
-    }
-    
-    # Iterar sobre cada mapa
-    for mapa_info in mapas:
-        map_id = mapa_info['map_id']
-        map_name = mapa_info['map_name']
-        game_id = mapa_info['game_id']
-        
-        print(f"\n  📍 Procesando mapa: {map_name} (ID: {game_id})")
-        
-        # Hacer clic en el botón del mapa
-        try:
-            map_button = driver.find_element(
-                By.CSS_SELECTOR,
-                f"div.vm-stats-gamesnav-item[data-game-id='{game_id}']"
-            )
-            driver.execute_script("arguments[0].click();", map_button)
-            time.sleep(2)
-        except Exception as e:
-            print(f"    ⚠️ Error haciendo clic en mapa: {e}")
+    # Extraer jugadores rivales (columnas)
+    jugadores_rivales = []
+    for celda in filas[0].find_all('td')[1:]:
+        jugador = nombre_jugador_celda(celda)
+        if jugador:
+            jugadores_rivales.append(jugador)
+
+    enfrentamientos = []
+
+    # Procesar filas de jugadores
+    for fila in filas[1:]:
+        celdas = fila.find_all('td')
+        if len(celdas) < 2:
             continue
-        
-        # Iterar sobre cada tipo de kill
-        for tipo_nombre, data_matrix in tipos_kill.items():
-            try:
-                print(f"    📊 Procesando: {tipo_nombre}")
-                
-                # Hacer clic en el filtro de tipo de kill
-                try:
-                    wait = WebDriverWait(driver, 10)
-                    wait.until(EC.presence_of_element_located((By.CLASS_NAME, "js-matrix-filter")))
-                    
-                    boton = driver.find_element(
-                        By.CSS_SELECTOR, 
-                        f"div.js-matrix-filter div[data-matrix='{data_matrix}']"
-                    )
-                    driver.execute_script("arguments[0].click();", boton)
-                    time.sleep(1.5)
-                except Exception as e:
-                    print(f"      ⚠️ Error con botón {tipo_nombre}: {e}")
-                    continue
-                
-                # Obtener HTML actualizado
-                soup = BeautifulSoup(driver.page_source, 'html.parser')
-                
-                # Buscar el contenedor específico del mapa que está activo
-                contenedor_mapa = soup.find('div', class_='vm-stats-game', attrs={'data-game-id': game_id})
-                if not contenedor_mapa:
-                    print(f"      ⚠️ No se encontró contenedor para game_id={game_id}")
-                    continue
-                
-                # Buscar la tabla de matriz DENTRO del contenedor específico
-                # La tabla tiene clase según el tipo: mod-normal, mod-fkfd, mod-op
-                tabla = contenedor_mapa.find('table', class_=lambda c: c and 'mod-matrix' in c and f'mod-{data_matrix}' in c)
-                if not tabla:
-                    print(f"      ⚠️ No se encontró tabla mod-{data_matrix} en el contenedor del mapa")
-                    continue
-                
-                filas = tabla.find_all('tr')
-                if len(filas) < 2:
-                    continue
-                
-                # Extraer jugadores rivales (columnas)
-                jugadores_rivales = []
-                primera_fila = filas[0]
-                for celda in primera_fila.find_all('td')[1:]:
-                    nombre_div = celda.find('div', class_='team')
-                    if nombre_div:
-                        # Encontrar el div hijo que contiene el nombre
-                        div_contenedor = nombre_div.find('div')
-                        if div_contenedor:
-                            # Extraer solo el texto directo (sin el team-tag)
-                            # Eliminar el div del equipo si existe
-                            team_tag = div_contenedor.find('div', class_='team-tag')
-                            if team_tag:
-                                team_tag.decompose()  # Eliminar el div del equipo
-                            jugador = div_contenedor.get_text(strip=True)
-                            if jugador:
-                                jugadores_rivales.append(jugador)
-                
-                # Procesar filas de jugadores
-                for fila in filas[1:]:
-                    celdas = fila.find_all('td')
-                    if len(celdas) < 2:
-                        continue
-                    
-                    # Extraer jugador sujeto
-                    primera_celda = celdas[0]
-                    team_div = primera_celda.find('div', class_='team')
-                    if not team_div:
-                        continue
-                    
-                    # Encontrar el div hijo que contiene el nombre
-                    div_contenedor = team_div.find('div')
-                    if not div_contenedor:
-                        continue
-                    
-                    # Eliminar el div del equipo si existe
-                    team_tag = div_contenedor.find('div', class_='team-tag')
-                    if team_tag:
-                        team_tag.decompose()
-                    
-                    player_a = div_contenedor.get_text(strip=True)
-                    if not player_a:
-                        continue
-                    
-                    # Procesar cada enfrentamiento
-                    for idx, celda in enumerate(celdas[1:]):
-                        if idx >= len(jugadores_rivales):
-                            break
-                        
-                        player_b = jugadores_rivales[idx]
-                        
-                        # Extraer kills
-                        stats_divs = celda.find_all('div', class_='stats-sq')
-                        if len(stats_divs) < 2:
-                            continue
-                        
-                        kills_realizadas = stats_divs[0].get_text(strip=True)
-                        kills_recibidas = stats_divs[1].get_text(strip=True)
-                        
-                        # Limpiar valores
-                        kills_realizadas = re.sub(r'[^\d]', '', kills_realizadas) if kills_realizadas else "0"
-                        kills_recibidas = re.sub(r'[^\d]', '', kills_recibidas) if kills_recibidas else "0"
-                        
-                        # Solo guardar si hay datos
-                        if kills_realizadas != "0" or kills_recibidas != "0":
-                            kills_formato = f"{kills_realizadas}/{kills_recibidas}"
-                            
-                            todos_enfrentamientos.append({
-                                'match_id': match_id,
-                                'map_id': map_id,
-                                'tipo_kill': tipo_nombre,
-                                'player_a': player_a,
-                                'player_b': player_b,
-                                'kills': kills_formato
-                            })
-            
-            except Exception as e:
-                print(f"      ⚠️ Error en {tipo_nombre}: {e}")
+
+        # Extraer jugador sujeto
+        player_a = nombre_jugador_celda(celdas[0])
+        if not player_a:
+            continue
+
+        # Procesar cada enfrentamiento
+        for idx, celda in enumerate(celdas[1:]):
+            if idx >= len(jugadores_rivales):
+                break
+
+            player_b = jugadores_rivales[idx]
+
+            # Extraer kills
+            stats_divs = celda.find_all('div', class_='stats-sq')
+            if len(stats_divs) < 2:
                 continue
-    
-    return todos_enfrentamientos
 
-def obtener_multikills_por_mapa(driver, url):
+            kills_realizadas = stats_divs[0].get_text(strip=True)
+            kills_recibidas = stats_divs[1].get_text(strip=True)
+
+            # Limpiar valores
+            kills_realizadas = re.sub(r'[^\d]', '', kills_realizadas) if kills_realizadas else "0"
+            kills_recibidas = re.sub(r'[^\d]', '', kills_recibidas) if kills_recibidas else "0"
+
+            # Solo guardar si hay datos
+            if kills_realizadas != "0" or kills_recibidas != "0":
+                enfrentamientos.append({
+                    'match_id': match_id,
+                    'map_id': map_id,
+                    'tipo_kill': tipo_nombre,
+                    'player_a': player_a,
+                    'player_b': player_b,
+                    'kills': f"{kills_realizadas}/{kills_recibidas}"
+                })
+
+    return enfrentamientos
+
+def extraer_enfrentamientos_contenedor(contenedor_mapa, match_id, map_id):
     """
-    Extrae multikills y clutches por cada mapa jugado
+    Extrae las tres matrices (all / first / op) de un contenedor vm-stats-game.
+
+    Las tablas mod-normal, mod-fkfd y mod-op de todos los mapas ya vienen en
+    el HTML de la pestaña Performance: los botones de mapa y los filtros
+    js-matrix-filter solo cambian cuál se muestra, así que no hacen falta clics.
     """
-    print(f"\n🎯 Procesando multikills y clutches: {url}")
-    
-    # Obtener Match ID
-    match_id = "Unknown"
-    match_search = re.search(r'vlr\.gg/(\d+)', url)
-    if match_search:
-        match_id = match_search.group(1)
-    
-    # Construir URL de Performance
-    if '?' in url:
-        performance_url = url.split('?')[0] + '?tab=performance'
-    else:
-        performance_url = url.rstrip('/') + '/?tab=performance'
-    
-    try:
-        driver.get(performance_url)
-        time.sleep(4)
-    except Exception as e:
-        print(f"❌ Error cargando URL: {e}")
+    enfrentamientos = []
+    for tipo_nombre, data_matrix in TIPOS_KILL.items():
+        # La tabla tiene clase según el tipo: mod-normal, mod-fkfd, mod-op
+        tabla = contenedor_mapa.find(
+            'table',
+            class_=lambda c: c and 'mod-matrix' in c and f'mod-{data_matrix}' in c
+        )
+        if not tabla:
+            print(f"      ⚠️ No se encontró tabla mod-{data_matrix} en el contenedor del mapa")
+            continue
+
+        filas = extraer_matriz(tabla, match_id, map_id, tipo_nombre)
+        print(f"    📊 {tipo_nombre}: {len(filas)} enfrentamientos")
+        enfrentamientos.extend(filas)
+    return enfrentamientos
+
+def texto_sin_popup(div):
+    """
+    Texto de una celda stats-sq sin el popup de detalle (wf-popable-contents)
+    que VLR.gg anida dentro, esté a la profundidad que esté. Se recorren
+    directamente los nodos: sin copiar ni re-parsear la celda, y sin
+    modificar el árbol original.
+    """
+    partes = []
+    for hijo in div.children:
+        if isinstance(hijo, Tag):
+            if 'wf-popable-contents' not in (hijo.get('class') or []):
+                partes.append(texto_sin_popup(hijo))
+        elif not isinstance(hijo, Comment):
+            partes.append(hijo)
+    return "".join(partes).strip()
+
+def extraer_multikills_contenedor(contenedor_mapa, match_id, map_id):
+    """
+    Extrae multikills y clutches (tabla mod-adv-stats) de un contenedor vm-stats-game
+    """
+    # Buscar tabla de stats avanzadas DENTRO del contenedor
+    tabla = contenedor_mapa.find('table', class_='mod-adv-stats')
+    if not tabla:
+        print(f"    ⚠️ No se encontró tabla de stats avanzadas en el contenedor del mapa")
         return []
 
-    # Detectar mapas
-    mapas = obtener_mapas_jugados(driver, match_id)
+    multikills = []
+
+    # Procesar filas
+    filas = tabla.find_all('tr')[1:]  # Saltar header
+
+    for fila in filas:
+        celdas = fila.find_all('td')
+        if len(celdas) < 14:
+            continue
+
+        # Extraer nombre del jugador (sin equipo)
+        player_name = nombre_jugador_celda(celdas[0])
+        if not player_name:
+            continue
+
+        # Agente
+        agente = "Unknown"
+        img_agente = celdas[1].find('img')
+        if img_agente and 'src' in img_agente.attrs:
+            src = img_agente['src']
+            match_agent = re.search(r'/agents/([^.]+)\.png', src)
+            if match_agent:
+                agente = match_agent.group(1).capitalize()
+
+        # Extraer stats
+        def extraer_stat(celda):
+            div = celda.find('div', class_='stats-sq')
+            if div:
+                texto = texto_sin_popup(div)
+                return re.sub(r'[^\d]', '', texto) if texto else "0"
+            return "0"
+
+        k2 = extraer_stat(celdas[2])
+        k3 = extraer_stat(celdas[3])
+        k4 = extraer_stat(celdas[4])
+        k5 = extraer_stat(celdas[5])
+
+        v1 = extraer_stat(celdas[6])
+        v2 = extraer_stat(celdas[7])
+        v3 = extraer_stat(celdas[8])
+        v4 = extraer_stat(celdas[9])
+        v5 = extraer_stat(celdas[10])
+
+        econ = extraer_stat(celdas[11])
+        pl = extraer_stat(celdas[12])
+        de = extraer_stat(celdas[13])
+
+        multikills.append({
+            'match_id': match_id,
+            'map_id': map_id,
+            'player_name': player_name,
+            'agent': agente,
+            'k2': k2,
+            'k3': k3,
+            'k4': k4,
+            'k5': k5,
+            'v1': v1,
+            'v2': v2,
+            'v3': v3,
+            'v4': v4,
+            'v5': v5,
+            'econ': econ,
+            'pl': pl,
+            'de': de
+        })
+
+    return multikills
+
+def obtener_datos_performance(driver, url):
+    """
+    Carga y parsea UNA sola vez la pestaña Performance de un partido y
+    devuelve (enfrentamientos, multikills) de todos los mapas jugados.
+    """
+    print(f"🌐 Procesando performance: {url}")
+
+    html = cargar_performance(driver, url)
+    if html is None:
+        return [], []
+
+    return parsear_performance(parsear_pagina(html), match_id_de_url(url))
+
+def parsear_performance(soup, match_id):
+    """
+    Parseo puro (sin red) de la pestaña Performance: devuelve
+    (enfrentamientos, multikills).
+    """
+    # Detectar mapas jugados
+    mapas = mapas_del_partido(soup, match_id)
+    print(f"  🗺️ Mapas encontrados: {[m['map_name'] for m in mapas]}")
     
     if not mapas:
         print("  ⚠️ No se encontraron mapas")
-        return []
+        return [], []
 
+    mapas_por_game_id = {m['game_id']: m for m in mapas}
+    todos_enfrentamientos = []
     todos_multikills = []
-    
-    # Iterar sobre cada mapa
-    for mapa_info in mapas:
+
+    for contenedor_mapa in traza.por_mapa(soup.find_all('div', class_='vm-stats-game'), 'enfrentamientos', match_id):
+        mapa_info = mapas_por_game_id.get(contenedor_mapa.get('data-game-id'))
+        if not mapa_info:
+            continue  # Resumen "all" o contenedor sin botón de mapa
+
         map_id = mapa_info['map_id']
-        map_name = mapa_info['map_name']
-        game_id = mapa_info['game_id']
-        
-        print(f"  📍 Procesando mapa: {map_name}")
-        
-        # Hacer clic en el botón del mapa
-        try:
-            map_button = driver.find_element(
-                By.CSS_SELECTOR,
-                f"div.vm-stats-gamesnav-item[data-game-id='{game_id}']"
-            )
-            driver.execute_script("arguments[0].click();", map_button)
-            time.sleep(2)
-        except Exception as e:
-            print(f"    ⚠️ Error haciendo clic en mapa: {e}")
-            continue
-        
-        # Obtener HTML
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        
-        # Buscar el contenedor específico del mapa
-        contenedor_mapa = soup.find('div', class_='vm-stats-game', attrs={'data-game-id': game_id})
-        if not contenedor_mapa:
-            print(f"    ⚠️ No se encontró contenedor para game_id={game_id}")
-            continue
-        
-        # Buscar tabla de stats avanzadas DENTRO del contenedor
-        tabla = contenedor_mapa.find('table', class_='mod-adv-stats')
-        if not tabla:
-            print(f"    ⚠️ No se encontró tabla de stats avanzadas en el contenedor del mapa")
-            continue
-        
-        # Procesar filas
-        filas = tabla.find_all('tr')[1:]  # Saltar header
-        
-        for fila in filas:
-            celdas = fila.find_all('td')
-            if len(celdas) < 14:
-                continue
-            
-            # Extraer nombre del jugador (sin equipo)
-            primera_celda = celdas[0]
-            team_div = primera_celda.find('div', class_='team')
-            if not team_div:
-                continue
-            
-            # Encontrar el div hijo
-            div_contenedor = team_div.find('div')
-            if not div_contenedor:
-                continue
-            
-            # Eliminar el div del equipo
-            team_tag = div_contenedor.find('div', class_='team-tag')
-            if team_tag:
-                team_tag.decompose()
-            
-            player_name = div_contenedor.get_text(strip=True)
-            if not player_name:
-                continue
-            
-            # Agente
-            agente = "Unknown"
-            img_agente = celdas[1].find('img')
-            if img_agente and 'src' in img_agente.attrs:
-                src = img_agente['src']
-                match_agent = re.search(r'/agents/([^.]+)\.png', src)
-                if match_agent:
-                    agente = match_agent.group(1).capitalize()
-            
-            # Extraer stats
-            def extraer_stat(celda):
-                div = celda.find('div', class_='stats-sq')
-                if div:
-                    # Crear una copia para no modificar el original
-                    div_copy = BeautifulSoup(str(div), 'html.parser').find('div')
-                    # Eliminar los divs de detalles/popup si existen
-                    popup = div_copy.find('div', class_='wf-popable-contents')
-                    if popup:
-                        popup.decompose()
-                    
-                    texto = div_copy.get_text(strip=True)
-                    return re.sub(r'[^\d]', '', texto) if texto else "0"
-                return "0"
-            
-            k2 = extraer_stat(celdas[2])
-            k3 = extraer_stat(celdas[3])
-            k4 = extraer_stat(celdas[4])
-            k5 = extraer_stat(celdas[5])
-            
-            v1 = extraer_stat(celdas[6])
-            v2 = extraer_stat(celdas[7])
-            v3 = extraer_stat(celdas[8])
-            v4 = extraer_stat(celdas[9])
-            v5 = extraer_stat(celdas[10])
-            
-            econ = extraer_stat(celdas[11])
-            pl = extraer_stat(celdas[12])
-            de = extraer_stat(celdas[13])
-            
-            todos_multikills.append({
-                'match_id': match_id,
-                'map_id': map_id,
-                'player_name': player_name,
-                'agent': agente,
-                'k2': k2,
-                'k3': k3,
-                'k4': k4,
-                'k5': k5,
-                'v1': v1,
-                'v2': v2,
-                'v3': v3,
-                'v4': v4,
-                'v5': v5,
-                'econ': econ,
-                'pl': pl,
-                'de': de
-            })
+        print(f"\n  📍 Procesando mapa: {mapa_info['map_name']} (ID: {mapa_info['game_id']})")
+
+        todos_enfrentamientos.extend(
+            extraer_enfrentamientos_contenedor(contenedor_mapa, match_id, map_id)
+        )
+        multikills = extraer_multikills_contenedor(contenedor_mapa, match_id, map_id)
+        print(f"    🎯 multikills/clutches: {len(multikills)} filas")
+        todos_multikills.extend(multikills)
     
-    return todos_multikills
+    return todos_enfrentamientos, todos_multikills
 
 # --- MAIN ---
 if __name__ == "__main__":
+    # Se cargan aquí (no al importar) para poder reutilizar los parsers
+    # desde otros scripts sin pedir un .txt
+    ENLACES, OUTPUT_DIR = cargar_enlaces_desde_txt()
+
     print("🚀 Iniciando extracción de datos por mapa...")
     print("="*60)
     
-    # Configurar Chrome
-    options = Options()
-    options.add_argument("--headless")
-    options.add_argument("--start-maximized")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    
-    try:
-        driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()), 
-            options=options
-        )
-    except Exception as e:
-        print(f"❌ Error inicializando driver: {e}")
-        exit()
+    # Configurar Chrome (solo si no se pidió el motor estático)
+    driver = None
+    if usar_selenium():
+        try:
+            driver = obtener_driver()
+        except Exception as e:
+            print(f"❌ Error inicializando driver: {e}")
+            sys.exit(1)
+    else:
+        print("⚡ Motor estático: requests + lxml, sin Chrome")
 
-    todos_enfrentamientos = []
-    todos_multikills = []
+    def extraer(i, link):
+        print(f"\n{'='*60}")
+        print(f"[{i+1}/{len(ENLACES)}] Procesando partido...")
+
+        # Una sola carga de la pestaña Performance para ambas tablas
+        enfrentamientos, multikills = obtener_datos_performance(driver, link)
+        if enfrentamientos:
+            print(f"\n  ✅ {len(enfrentamientos)} enfrentamientos extraídos")
+        if multikills:
+            print(f"  ✅ {len(multikills)} filas de multikills extraídas")
+        return {'enfrentamientos': enfrentamientos, 'multikills': multikills}
 
+    codigo_salida = 0  # ≠ 0 si el scraping falla: main.py --eventos lo trata como error
     try:
-        for i, link in enumerate(ENLACES):
-            print(f"\n{'='*60}")
-            print(f"[{i+1}/{len(ENLACES)}] Procesando partido...")
-            
-            # Extraer enfrentamientos
-            enfrentamientos = obtener_enfrentamientos_por_mapa(driver, link)
-            if enfrentamientos:
-                todos_enfrentamientos.extend(enfrentamientos)
-                print(f"\n  ✅ {len(enfrentamientos)} enfrentamientos extraídos")
-            
-            # Extraer multikills
-            multikills = obtener_multikills_por_mapa(driver, link)
-            if multikills:
-                todos_multikills.extend(multikills)
-                print(f"  ✅ {len(multikills)} filas de multikills extraídas")
+        # Cada partido se guarda en su checkpoint al terminarlo
+        tablas = procesar_partidos(ENLACES, OUTPUT_DIR, 'enfrentamientos',
+                                   ['enfrentamientos', 'multikills'], extraer,
+                                   {'enfrentamientos': "vlr_enfrentamientos",
+                                    'multikills': "vlr_multikills_clutches"})
+        todos_enfrentamientos = tablas['enfrentamientos']
+        todos_multikills = tablas['multikills']
 
         print("\n" + "="*60)
-        print("💾 Guardando archivos Excel...")
+        print("💾 Guardando tablas...")
         
         # Guardar enfrentamientos
         if todos_enfrentamientos:
             df_enfrentamientos = pd.DataFrame(todos_enfrentamientos)
-            ruta_enfrentamientos = os.path.join(OUTPUT_DIR, "vlr_enfrentamientos.xlsx")
-            df_enfrentamientos.to_excel(ruta_enfrentamientos, index=False)
-            print(f"\n✅ Archivo guardado: {ruta_enfrentamientos}")
+            rutas = guardar_tabla(df_enfrentamientos, OUTPUT_DIR, "vlr_enfrentamientos")
+            print(f"\n✅ Archivo guardado: {', '.join(rutas)}")
             print(f"   • Total de enfrentamientos: {len(df_enfrentamientos)}")
             print(f"   • Mapas únicos: {df_enfrentamientos['map_id'].nunique()}")
             print(f"   • Por tipo: {df_enfrentamientos['tipo_kill'].value_counts().to_dict()}")
@@ -493,9 +397,8 @@ if __name__ == "__main__":
         # Guardar multikills
         if todos_multikills:
             df_multikills = pd.DataFrame(todos_multikills)
-            ruta_multikills = os.path.join(OUTPUT_DIR, "vlr_multikills_clutches.xlsx")
-            df_multikills.to_excel(ruta_multikills, index=False)
-            print(f"\n✅ Archivo guardado: {ruta_multikills}")
+            rutas = guardar_tabla(df_multikills, OUTPUT_DIR, "vlr_multikills_clutches")
+            print(f"\n✅ Archivo guardado: {', '.join(rutas)}")
             print(f"   • Total de filas: {len(df_multikills)}")
             print(f"   • Mapas únicos: {df_multikills['map_id'].nunique()}")
             print("\n📋 Preview multikills:")
@@ -503,13 +406,19 @@ if __name__ == "__main__":
         
         if not todos_enfrentamientos and not todos_multikills:
             print("\n⚠️ No se extrajeron datos.")
+
+        print(f"\n{resumen_cache()}")
+        print(resumen_esperas())
             
     except Exception as e:
         print(f"\n❌ Error durante el scraping: {e}")
+        codigo_salida = 1
         import traceback
         traceback.print_exc()
         
     finally:
-        if 'driver' in locals():
-            driver.quit()
-            print("\n🔒 Driver cerrado correctamente")
\ No newline at end of file
+        if driver is not None:
+            liberar_driver(driver)
+            print("\n🔒 Driver cerrado correctamente")
+
+    sys.exit(codigo_salida)
@@ -11,14 +11,16 @@ Ejemplos de URLs válidas:
   https://www.vlr.gg/event/2685/vct-2026-china-kickoff
 """
 
-import time
 import os
 import re
 from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
+
+import perfilado  # noqa: F401 — con ALETHEIA_PERFIL perfila el script entero
+from descargas import PARSER
+from esperas import SELECTOR_PARTIDOS_EVENTO, esperar_selector
+from grabacion import grabar_pagina, url_destino
+from interaccion import preguntar
+from navegadores import crear_driver
 
 OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'output_data')
 os.makedirs(OUTPUT_DIR, exist_ok=True)
@@ -52,13 +54,15 @@ def extraer_enlaces_evento(driver, url: str) -> list:
     print(f"🔄 Conectando a: {matches_url}")
 
     try:
-        driver.get(matches_url)
-        time.sleep(3)
+        driver.get(url_destino(matches_url))
+        esperar_selector(driver, SELECTOR_PARTIDOS_EVENTO, 'carga')
     except Exception as e:
         print(f"❌ Error cargando la página: {e}")
         return []
 
-    soup = BeautifulSoup(driver.page_source, 'html.parser')
+    html = driver.page_source
+    grabar_pagina(matches_url, html)
+    soup = BeautifulSoup(html, PARSER)
     tags = soup.find_all('a', class_=lambda c: c and 'match-item' in c,
                          href=re.compile(r'^/\d+/'))
 
@@ -94,35 +98,33 @@ if __name__ == "__main__":
     print("    https://www.vlr.gg/event/2683/vct-2026-pacific-kickoff")
     print()
 
-    EVENTO_URL = input("  🔗 Pega el enlace del evento: ").strip()
+    # ALETHEIA_EVENTO_URL: enlace sin preguntar (python main.py --url-evento ...)
+    EVENTO_URL = (os.environ.get("ALETHEIA_EVENTO_URL") or preguntar(
+        "  🔗 Pega el enlace del evento: ",
+        "Indica el enlace con ALETHEIA_EVENTO_URL=<enlace> o con python main.py --url-evento <enlace>.",
+    )).strip()
 
     if not EVENTO_URL:
         print("❌ No ingresaste ningún enlace. Abortando.")
         exit(1)
 
     # Inicializar Selenium
-    options = Options()
-    options.add_argument("--headless")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--start-maximized")
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-
     try:
-        driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()),
-            options=options
+        driver = crear_driver(
+            args_extra=["--disable-blink-features=AutomationControlled"],
+            experimental={"excludeSwitches": ["enable-automation"]},
         )
     except Exception as e:
         print(f"❌ Error inicializando Chrome: {e}")
         exit(1)
 
+    codigo_salida = 0  # ≠ 0 sin partidos o con error: main.py --url-evento lo trata como fallo
     try:
         urls_partidos = extraer_enlaces_evento(driver, EVENTO_URL)
 
         if not urls_partidos:
             print("⚠️  No se encontraron partidos. Verifica el enlace del evento.")
+            codigo_salida = 1
         else:
             nombre_salida = nombre_archivo_desde_url(EVENTO_URL)
             ruta_salida   = os.path.join(OUTPUT_DIR, nombre_salida)
@@ -141,12 +143,14 @@ if __name__ == "__main__":
         print(f"\n❌ Error durante el scraping: {e}")
         import traceback
         traceback.print_exc()
+        codigo_salida = 1
 
     finally:
         driver.quit()
         print("\n🔒 Driver cerrado correctamente")
 
     print("\n🏁 Script finalizado.")
+    exit(codigo_salida)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -3,25 +3,49 @@ ALETHEIA - Script 1: Equipos y Jugadores VCT 2026
 Fuente: Liquipedia
 Salida: output_data/vct_equipos.xlsx
          output_data/vct_jugadores.xlsx
+
+Las páginas de Liquipedia pasan por la caché compartida y siempre se
+revalidan con una petición condicional: si el hub o la página de un equipo
+responden 304, se reutilizan las filas de la última ejecución sin volver a
+parsear.
 """
 
-import requests
 from bs4 import BeautifulSoup
 import pandas as pd
-import time
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 
-# --- CONFIGURACIÓN ---
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
-                  '(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-}
+import perfilado  # noqa: F401 — con ALETHEIA_PERFIL perfila el script entero
+from salidas import guardar_tabla, leer_tabla
+from cache_paginas import obtener_html, pagina_sin_cambios, resumen_cache
+from descargas import HILOS, PARSER, descargar_html
+from reintentos import FALLIDOS, guardar_fallidos, resumen_fallos
 
+# --- CONFIGURACIÓN ---
 # Carpeta de salida relativa al script
 OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'output_data')
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 
+def descargar_liquipedia(url):
+    """
+    HTML de una página de Liquipedia: limitador (1 petición / 2 s),
+    reintentos y petición condicional contra la copia en caché.
+    """
+    return obtener_html(url, lambda: descargar_html(url), revalidar=True)
+
+
+def filas_anteriores(nombre_tabla):
+    """Filas de la tabla escrita en la última ejecución ([] si no existe)."""
+    df = leer_tabla(OUTPUT_DIR, nombre_tabla)
+    if df is None or df.empty:
+        return []
+    df = df.astype(object).where(df.notna(), "")
+    df['team_id'] = df['team_id'].astype(int)
+    return df.to_dict('records')
+
+
 # ---------------------------------------------------------------------------
 # FUNCIÓN 1: OBTENER TODOS LOS EQUIPOS (MASTER)
 # ---------------------------------------------------------------------------
@@ -30,8 +54,15 @@ def obtener_equipos_master():
     print(f"🔄 Conectando al Hub VCT 2026: {url}")
 
     try:
-        response = requests.get(url, headers=HEADERS, timeout=15)
-        soup = BeautifulSoup(response.text, 'html.parser')
+        html = descargar_liquipedia(url)
+        if html is None:
+            return []
+        if pagina_sin_cambios(url):
+            anteriores = filas_anteriores("vct_equipos")
+            if anteriores:
+                print(f"  ♻️ Hub sin cambios: {len(anteriores)} equipos de la última ejecución")
+                return anteriores
+        soup = BeautifulSoup(html, PARSER)
 
         equipos_data = []
         id_counter = 1
@@ -79,70 +110,99 @@ def obtener_equipos_master():
 # ---------------------------------------------------------------------------
 # FUNCIÓN 2: OBTENER JUGADORES ACTIVOS
 # ---------------------------------------------------------------------------
-def obtener_jugadores_master(df_equipos):
-    print("\n🚀 Iniciando extracción de JUGADORES ACTIVOS...")
-    jugadores_data = []
-    total_equipos = len(df_equipos)
-
-    for index, fila in df_equipos.iterrows():
-        print(f"  ({index + 1}/{total_equipos}) Scrapeando: {fila['team_name']}...")
-        time.sleep(0.5)
-
-        try:
-            response = requests.get(fila['url'], headers=HEADERS, timeout=15)
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            header_roster = (
-                soup.find(id='Active') or
-                soup.find(id='Active_Roster') or
-                soup.find(id='Player_Roster')
-            )
-
-            if header_roster:
-                tabla_roster = header_roster.find_next('table', class_='roster-card')
-
-                if tabla_roster:
-                    for f in tabla_roster.select('tr'):
-                        celda_id = f.find('td', class_='ID')
-                        celda_nombre = f.find('td', class_='Name')
-
-                        if celda_id and celda_nombre:
-                            nick = celda_id.get_text(strip=True)
-                            nombre_real = (
-                                celda_nombre.get_text(strip=True)
-                                .replace("(", "").replace(")", "").strip()
-                            )
-
-                            if nick:
-                                jugadores_data.append({
-                                    'nickname': nick,
-                                    'real_name': nombre_real,
-                                    'team_id': fila['team_id'],
-                                    'team_name': fila['team_name']
-                                })
-                else:
-                    print(f"     ⚠️ {fila['team_name']}: Header encontrado pero no la tabla 'roster-card'.")
+def jugadores_de_equipo(fila, anteriores):
+    """
+    Descarga y parsea la página de un equipo y devuelve sus jugadores
+    activos. Si Liquipedia responde 304, devuelve la plantilla de la última
+    ejecución sin parsear.
+    """
+    jugadores = []
+    try:
+        html = descargar_liquipedia(fila['url'])
+        if html is None:
+            print(f"     ❌ {fila['team_name']}: página no disponible (queda en fallidos)")
+            return jugadores
+        if pagina_sin_cambios(fila['url']) and fila['team_name'] in anteriores:
+            print(f"     ♻️ {fila['team_name']}: sin cambios, {len(anteriores[fila['team_name']])} jugadores")
+            return [{**jugador, 'team_id': fila['team_id']} for jugador in anteriores[fila['team_name']]]
+        soup = BeautifulSoup(html, PARSER)
+
+        header_roster = (
+            soup.find(id='Active') or
+            soup.find(id='Active_Roster') or
+            soup.find(id='Player_Roster')
+        )
+
+        if header_roster:
+            tabla_roster = header_roster.find_next('table', class_='roster-card')
+
+            if tabla_roster:
+                for f in tabla_roster.select('tr'):
+                    celda_id = f.find('td', class_='ID')
+                    celda_nombre = f.find('td', class_='Name')
+
+                    if celda_id and celda_nombre:
+                        nick = celda_id.get_text(strip=True)
+                        nombre_real = (
+                            celda_nombre.get_text(strip=True)
+                            .replace("(", "").replace(")", "").strip()
+                        )
+
+                        if nick:
+                            jugadores.append({
+                                'nickname': nick,
+                                'real_name': nombre_real,
+                                'team_id': fila['team_id'],
+                                'team_name': fila['team_name']
+                            })
             else:
-                print(f"     ⚠️ {fila['team_name']}: No se encontró header 'Active'. Intentando búsqueda directa...")
-                tabla_directa = soup.find('table', class_='roster-card')
-                if tabla_directa:
-                    print("     ⚠️ Tabla encontrada sin header — omitida por seguridad.")
-                else:
-                    print(f"     ❌ {fila['team_name']}: Estructura desconocida.")
+                print(f"     ⚠️ {fila['team_name']}: Header encontrado pero no la tabla 'roster-card'.")
+        else:
+            print(f"     ⚠️ {fila['team_name']}: No se encontró header 'Active'. Intentando búsqueda directa...")
+            tabla_directa = soup.find('table', class_='roster-card')
+            if tabla_directa:
+                print("     ⚠️ Tabla encontrada sin header — omitida por seguridad.")
+            else:
+                print(f"     ❌ {fila['team_name']}: Estructura desconocida.")
+
+    except Exception as e:
+        print(f"     ❌ Error procesando {fila['team_name']}: {e}")
+
+    return jugadores
+
 
-        except Exception as e:
-            print(f"     ❌ Error procesando {fila['team_name']}: {e}")
+def obtener_jugadores_master(df_equipos):
+    """
+    Jugadores activos de todos los equipos. Las páginas se piden con varios
+    hilos sobre la sesión HTTP compartida (el limitador mantiene el ritmo de
+    Liquipedia) y cada hilo parsea la suya; el resultado sale en el orden de
+    df_equipos.
+    """
+    print(f"\n🚀 Iniciando extracción de JUGADORES ACTIVOS ({HILOS} hilos)...")
+    filas = [fila for _, fila in df_equipos.iterrows()]
+    total_equipos = len(filas)
+
+    # Plantillas de la última ejecución, para los equipos que respondan 304
+    anteriores = {}
+    for jugador in filas_anteriores("vct_jugadores"):
+        anteriores.setdefault(jugador['team_name'], []).append(jugador)
+
+    def tarea(i, fila):
+        print(f"  ({i + 1}/{total_equipos}) Scrapeando: {fila['team_name']}...")
+        return jugadores_de_equipo(fila, anteriores)
 
-    return jugadores_data
+    with ThreadPoolExecutor(max_workers=max(1, HILOS)) as executor:
+        por_equipo = list(executor.map(tarea, range(total_equipos), filas))
+
+    return [jugador for jugadores in por_equipo for jugador in jugadores]
 
 
 # ---------------------------------------------------------------------------
-# GUARDAR EN EXCEL
+# GUARDAR TABLA (Parquet y/o Excel según ALETHEIA_FORMATOS)
 # ---------------------------------------------------------------------------
-def guardar_excel(df, nombre_archivo, sheet_name="Sheet1"):
-    ruta = os.path.join(OUTPUT_DIR, nombre_archivo)
-    df.to_excel(ruta, index=False, sheet_name=sheet_name)
-    print(f"  💾 Guardado: {ruta}")
+def guardar_salida(df, nombre_tabla, sheet_name="Sheet1"):
+    for ruta in guardar_tabla(df, OUTPUT_DIR, nombre_tabla, sheet_name=sheet_name):
+        print(f"  💾 Guardado: {ruta}")
 
 
 # ---------------------------------------------------------------------------
@@ -155,10 +215,11 @@ if __name__ == "__main__":
 
     if df_equipos_total.empty:
         print("❌ No se pudieron obtener equipos. Abortando.")
-        exit(1)
+        guardar_fallidos(OUTPUT_DIR, 'equipos_jugadores', [f['url'] for f in FALLIDOS])
+        sys.exit(1)
 
     print(f"\n✅ TABLA EQUIPOS LISTA: {len(df_equipos_total)} registros.")
-    guardar_excel(df_equipos_total, "vct_equipos.xlsx", sheet_name="Equipos")
+    guardar_salida(df_equipos_total, "vct_equipos", sheet_name="Equipos")
 
     # 2. Jugadores
     lista_jugadores = obtener_jugadores_master(df_equipos_total)
@@ -176,6 +237,13 @@ if __name__ == "__main__":
         print(f"\n📊 {num_jugadores} jugadores en {num_equipos} equipos.")
         print(f"   Promedio: {promedio:.1f} jugadores/equipo (ideal entre 5.0 y 6.0)")
 
-        guardar_excel(df_jugadores_total, "vct_jugadores.xlsx", sheet_name="Jugadores")
+        guardar_salida(df_jugadores_total, "vct_jugadores", sheet_name="Jugadores")
+
+    # Equipos que fallaron tras los reintentos → fallidos/equipos_jugadores.txt
+    ruta_fallidos = guardar_fallidos(OUTPUT_DIR, 'equipos_jugadores', [f['url'] for f in FALLIDOS])
+    print(f"\n{resumen_cache()}")
+    print(resumen_fallos())
+    if ruta_fallidos:
+        print(f"   Lista de fallidos: {ruta_fallidos}")
 
     print("\n🏁 Script finalizado.")
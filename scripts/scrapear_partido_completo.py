@@ -0,0 +1,180 @@
+"""
+ALETHEIA - Extractor unificado de partidos (VLR.gg)
+Sustituye a los scripts 2, 3, 4, 5 y 6 en una sola pasada por partido:
+descarga overview / performance / economy UNA vez, parsea cada pestaña UNA
+vez (partido.construir_modelo) y ejecuta sobre ese modelo los parsers de
+todas las tablas.
+
+  overview     → vct_partidos, vlr_mapas, vlr_rondas, vlr_stats_players_sides
+  performance  → vlr_enfrentamientos, vlr_multikills_clutches
+  economy      → vlr_economia_resumen, vlr_economia_rondas
+
+Todas las tablas salen del mismo modelo, así que el match_id y el map_id
+("598923_bind") coinciden en todas. Las stats por lado se leen de los span
+mod-t / mod-ct; si vienen vacíos (China) se usa el split proporcional con
+las rondas de los mapas de ese mismo partido (no hace falta haber escrito
+vlr_mapas antes).
+
+Salida: las mismas tablas, con los mismos nombres, que los scripts 2-6.
+"""
+
+import sys
+
+import pandas as pd
+
+import perfilado  # noqa: F401 — con ALETHEIA_PERFIL perfila el script entero
+from salidas import guardar_tabla
+from checkpoints import procesar_partidos
+from partido import construir_modelo, descargar_pestanas
+from cache_paginas import es_pagina_bloqueada, resumen_cache
+from descargas import usar_selenium
+from navegadores import liberar_driver, obtener_driver
+from esperas import resumen_esperas
+from scrapear_partidos import parsear_cabecera, tabla_partidos
+from scrapear_vlr_corregido import cargar_enlaces_desde_txt, parsear_mapas_rondas
+from scrapear_stats_pro import parsear_stats_lados
+from scrapear_stats_pro_china import COLUMNAS_STATS
+from scrapear_enfrentamientos import parsear_performance
+from scrapear_economia import parsear_economia
+
+# tabla del checkpoint → tabla de salida
+SALIDAS = {
+    'partidos':        "vct_partidos",
+    'mapas':           "vlr_mapas",
+    'rondas':          "vlr_rondas",
+    'stats':           "vlr_stats_players_sides",
+    'enfrentamientos': "vlr_enfrentamientos",
+    'multikills':      "vlr_multikills_clutches",
+    'eco_resumen':     "vlr_economia_resumen",
+    'eco_rondas':      "vlr_economia_rondas",
+}
+
+
+# ─── EMISORES ─────────────────────────────────────────────────────────────────
+# Cada emisor recibe el modelo del partido y devuelve {tabla: filas}.
+# Si falta la pestaña que necesita, no emite nada.
+def emitir_overview(modelo):
+    soup = modelo['soup'].get('overview')
+    if soup is None or es_pagina_bloqueada(modelo['html']['overview']):
+        print("  ⛔ Overview no disponible")
+        return {}
+    match_id = modelo['match_id']
+
+    cabecera = parsear_cabecera(soup, match_id)
+    mapas, rondas = parsear_mapas_rondas(soup, match_id)
+
+    # ATK/DEF de los span de lado; split con las rondas de este partido si faltan
+    stats = parsear_stats_lados(soup, match_id, mapas)
+
+    return {
+        'partidos': [cabecera] if cabecera else [],
+        'mapas':    mapas or [],
+        'rondas':   rondas or [],
+        'stats':    stats,
+    }
+
+
+def emitir_performance(modelo):
+    soup = modelo['soup'].get('performance')
+    if soup is None:
+        print("  ⛔ Performance no disponible")
+        return {}
+    enfrentamientos, multikills = parsear_performance(soup, modelo['match_id'])
+    return {'enfrentamientos': enfrentamientos, 'multikills': multikills}
+
+
+def emitir_economia(modelo):
+    soup = modelo['soup'].get('economy')
+    if soup is None:
+        print("  ⛔ Economy no disponible")
+        return {}
+    resumen, rondas = parsear_economia(soup, modelo['match_id'])
+    return {'eco_resumen': resumen, 'eco_rondas': rondas}
+
+
+EMISORES = [emitir_overview, emitir_performance, emitir_economia]
+
+
+def extraer_partido(driver, url):
+    """Descarga y parsea un partido una sola vez y devuelve {tabla: filas}."""
+    print(f"🌐 Procesando: {url}")
+    modelo = construir_modelo(url, descargar_pestanas(url, driver))
+
+    tablas = {tabla: [] for tabla in SALIDAS}
+    for emisor in EMISORES:
+        try:
+            tablas.update(emisor(modelo))
+        except Exception as e:
+            print(f"  ❌ Error en {emisor.__name__}: {e}")
+            import traceback
+            traceback.print_exc()
+    return tablas
+
+
+# ─── MAIN ─────────────────────────────────────────────────────────────────────
+if __name__ == "__main__":
+    ENLACES, OUTPUT_DIR = cargar_enlaces_desde_txt()
+    ENLACES = list(dict.fromkeys(ENLACES))
+
+    print("🚀 Iniciando extracción unificada (una descarga por pestaña y partido)...")
+    print("=" * 60)
+
+    driver = None
+    if usar_selenium():
+        try:
+            driver = obtener_driver()
+        except Exception as e:
+            print(f"❌ Error inicializando driver: {e}")
+            sys.exit(1)
+    else:
+        print("⚡ Motor estático: requests + lxml, sin Chrome")
+
+    def extraer(i, link):
+        print(f"\n{'='*60}")
+        print(f"[{i+1}/{len(ENLACES)}] Procesando partido...")
+        tablas = extraer_partido(driver, link)
+        print("  ✅ " + ", ".join(f"{t}: {len(f)}" for t, f in tablas.items()))
+        return tablas
+
+    codigo_salida = 0  # ≠ 0 si el scraping falla: main.py --eventos lo trata como error
+    try:
+        # Un checkpoint por partido con las filas de todas las tablas
+        tablas = procesar_partidos(ENLACES, OUTPUT_DIR, 'partido_completo',
+                                   list(SALIDAS), extraer, SALIDAS)
+
+        print("\n" + "=" * 60)
+        print("💾 Guardando tablas...")
+
+        for tabla, nombre in SALIDAS.items():
+            filas = tablas[tabla]
+            if not filas:
+                print(f"   ⚠️ {nombre}: sin filas")
+                continue
+            if tabla == 'partidos':
+                df = tabla_partidos(filas)
+                rutas = guardar_tabla(df, OUTPUT_DIR, nombre, sheet_name="Partidos")
+            elif tabla == 'stats':
+                df = pd.DataFrame(filas)[COLUMNAS_STATS]
+                rutas = guardar_tabla(df, OUTPUT_DIR, nombre)
+            else:
+                df = pd.DataFrame(filas)
+                rutas = guardar_tabla(df, OUTPUT_DIR, nombre)
+            print(f"   ✅ {nombre}: {len(df)} filas → {', '.join(rutas)}")
+
+        print(f"\n{resumen_cache()}")
+        print(resumen_esperas())
+
+    except Exception as e:
+        print(f"\n❌ Error durante el scraping: {e}")
+        codigo_salida = 1
+        import traceback
+        traceback.print_exc()
+
+    finally:
+        if driver is not None:
+            liberar_driver(driver)
+            print("\n🔒 Driver cerrado correctamente")
+
+    print("\n🏁 Script finalizado.")
+
+    sys.exit(codigo_salida)
@@ -4,19 +4,20 @@ Fuente: VLR.gg
 Salida: output_data/vct_partidos.xlsx
 """
 
-import requests
-from bs4 import BeautifulSoup
 import pandas as pd
 import re
-import time
 import os
+import sys
 
-# --- CONFIGURACIÓN ---
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
-                  '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-}
+import perfilado  # noqa: F401 — con ALETHEIA_PERFIL perfila el script entero
+from interaccion import ELEGIR_TXT, preguntar
+from salidas import guardar_tabla
+from checkpoints import partidos_pendientes, procesar_partidos
+from partido import match_id_de_url, parsear_pagina
+from cache_paginas import es_pagina_bloqueada, resumen_cache
+from descargas import descargar_varios
 
+# --- CONFIGURACIÓN ---
 OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'output_data')
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
@@ -42,7 +43,7 @@ def cargar_urls_desde_txt():
         archivos = glob.glob(os.path.join(OUTPUT_DIR, "*.txt"))
         if not archivos:
             print("No se encontro ningun archivo .txt en output_data/.")
-            ruta_txt = input("   Ingresa la ruta del archivo .txt: ").strip()
+            ruta_txt = preguntar("   Ingresa la ruta del archivo .txt: ", ELEGIR_TXT).strip()
         elif len(archivos) == 1:
             ruta_txt = archivos[0]
             print(f"Cargando enlaces desde: {os.path.basename(ruta_txt)}")
@@ -52,7 +53,7 @@ def cargar_urls_desde_txt():
                 print(f"   [{i+1}] {os.path.basename(f)}")
             while True:
                 try:
-                    sel = int(input("   Selecciona el numero del archivo a usar: ").strip())
+                    sel = int(preguntar("   Selecciona el numero del archivo a usar: ", ELEGIR_TXT).strip())
                     if 1 <= sel <= len(archivos):
                         ruta_txt = archivos[sel - 1]
                         break
@@ -73,7 +74,6 @@ def cargar_urls_desde_txt():
     print(f"   Carpeta de salida: {carpeta_salida}")
     return urls, carpeta_salida
 
-URLS_PARTIDOS, OUTPUT_DIR = cargar_urls_desde_txt()
 
 # Alias de equipos para parsear picks/bans
 ALIAS_MAP = {
@@ -103,25 +103,27 @@ ALIAS_MAP = {
 # ---------------------------------------------------------------------------
 # FUNCIÓN: EXTRAER DATOS DE UN PARTIDO
 # ---------------------------------------------------------------------------
-def obtener_partido(url):
-    print(f"🕵️  Conectando a: {url}")
-    try:
-        response = requests.get(url, headers=HEADERS, timeout=10)
-        if response.status_code != 200:
-            print(f"  ⛔ Error HTTP {response.status_code}")
-            return None
-
-        soup = BeautifulSoup(response.text, 'html.parser')
+def parsear_partido(html, url):
+    """
+    Parseo puro de la página de un partido (sin red): devuelve el dict de
+    datos o None si la página es inválida.
+    """
+    if es_pagina_bloqueada(html):
+        print("  ⛔ VLR.gg bloqueó la petición.")
+        return None
+    return parsear_cabecera(parsear_pagina(html), match_id_de_url(url))
 
-        if soup.title and "Access Denied" in soup.title.get_text():
-            print("  ⛔ VLR.gg bloqueó la petición.")
-            return None
 
+def parsear_cabecera(soup, match_id):
+    """
+    Fila de vct_partidos a partir de la cabecera de la pestaña overview ya
+    parseada: torneo, fase, fecha, equipos, score y picks/bans.
+    """
+    try:
         data = {}
 
         # ID del partido
-        match_id_search = re.search(r'vlr\.gg/(\d+)', url)
-        data['match_id'] = match_id_search.group(1) if match_id_search else "Unknown"
+        data['match_id'] = match_id
 
         # Torneo y fase
         event_link = soup.find('a', class_='match-header-event')
@@ -213,49 +215,73 @@ def obtener_partido(url):
         return data
 
     except Exception as e:
-        print(f"  ❌ Error interno procesando {url}: {e}")
+        print(f"  ❌ Error interno procesando el partido {match_id}: {e}")
         return None
 
 
+COLUMNAS_PARTIDOS = [
+    'match_id', 'torneo', 'fase', 'fecha',
+    'equipo_a', 'equipo_b', 'score',
+    'pick_a', 'pick_b', 'ban_a', 'ban_b', 'decider', 'patch'
+]
+
+
+def tabla_partidos(filas):
+    """DataFrame de vct_partidos con las columnas fijas (las que falten → "N/A")."""
+    df_partidos = pd.DataFrame(filas)
+    for col in COLUMNAS_PARTIDOS:
+        if col not in df_partidos.columns:
+            df_partidos[col] = "N/A"
+    return df_partidos[COLUMNAS_PARTIDOS]
+
+
 # ---------------------------------------------------------------------------
 # EJECUCIÓN PRINCIPAL
 # ---------------------------------------------------------------------------
 if __name__ == "__main__":
+    # Se cargan aquí (no al importar) para poder reutilizar los parsers
+    # desde otros scripts sin pedir un .txt
+    URLS_PARTIDOS, OUTPUT_DIR = cargar_urls_desde_txt()
+
     # Eliminar URLs duplicadas manteniendo orden
     urls_unicas = list(dict.fromkeys(URLS_PARTIDOS))
+    SALIDAS_CHECKPOINT = {'partidos': "vct_partidos"}
     print(f"\n🚀 Iniciando extracción de {len(urls_unicas)} partidos...\n")
 
-    datos_acumulados = []
+    # 1) Descarga concurrente (sesión compartida + pausa por host) solo de
+    #    los partidos sin checkpoint
+    pendientes = partidos_pendientes(urls_unicas, OUTPUT_DIR, 'partidos', SALIDAS_CHECKPOINT)
+    paginas = descargar_varios(pendientes, timeout=10)
 
-    for link in urls_unicas:
-        info = obtener_partido(link)
-        if info:
-            datos_acumulados.append(info)
-        time.sleep(1)
+    # 2) Parseo puro en el orden original; cada partido deja su checkpoint
+    def extraer(i, link):
+        html = paginas.get(link)
+        if html is None:
+            print(f"  ⛔ Sin HTML para {link}")
+            return None
+        info = parsear_partido(html, link)
+        return {'partidos': [info] if info else []}
+
+    datos_acumulados = procesar_partidos(urls_unicas, OUTPUT_DIR, 'partidos', ['partidos'], extraer,
+                                         SALIDAS_CHECKPOINT)['partidos']
 
+    # ≠ 0 sin ningún partido: main.py --eventos lo trata como error (los
+    # partidos sueltos que fallan quedan en fallidos/, como en los demás scripts)
+    codigo_salida = 0
     if not datos_acumulados:
         print("\n⚠️ No se pudo obtener información de ningún partido.")
+        codigo_salida = 1
     else:
-        columnas = [
-            'match_id', 'torneo', 'fase', 'fecha',
-            'equipo_a', 'equipo_b', 'score',
-            'pick_a', 'pick_b', 'ban_a', 'ban_b', 'decider', 'patch'
-        ]
-
-        df_partidos = pd.DataFrame(datos_acumulados)
-
-        for col in columnas:
-            if col not in df_partidos.columns:
-                df_partidos[col] = "N/A"
-
-        df_partidos = df_partidos[columnas]
+        df_partidos = tabla_partidos(datos_acumulados)
 
         print("\n✅ DATOS OBTENIDOS (df_partidos):")
         print(df_partidos.to_string(index=False))
 
-        # Guardar Excel
-        ruta_excel = os.path.join(OUTPUT_DIR, "vct_partidos.xlsx")
-        df_partidos.to_excel(ruta_excel, index=False, sheet_name="Partidos")
-        print(f"\n💾 Excel guardado en: {ruta_excel}")
+        # Guardar tabla (Parquet y/o Excel según ALETHEIA_FORMATOS)
+        rutas = guardar_tabla(df_partidos, OUTPUT_DIR, "vct_partidos", sheet_name="Partidos")
+        print(f"\n💾 Guardado en: {', '.join(rutas)}")
 
+    print(f"\n{resumen_cache()}")
     print("\n🏁 Script finalizado.")
+
+    sys.exit(codigo_salida)
@@ -1,13 +1,45 @@
-import time
+"""
+ALETHEIA - Script 4: Estadísticas por lado ATK/DEF
+Fuente: VLR.gg (pestaña overview)
+Salida: output_data/vlr_stats_players_sides.xlsx
+
+Cada celda de stats trae en el HTML inicial los tres valores:
+  <span class="mod-both">  All
+  <span class="mod-t">     Attack
+  <span class="mod-ct">    Defense
+así que se leen los tres en una sola pasada, sin Chrome ni clics en los
+botones ATK/DEF. Si en un mapa los span de lado vienen vacíos (región
+China), ese mapa se divide proporcionalmente por rondas como en
+scrapear_stats_pro_china.py.
+
+Variables de entorno:
+  ALETHEIA_STATS_MODO=clics   motor anterior: Chrome + clic en cada botón
+                              ATK/DEF (para comparar resultados)
+"""
+
 import os
+import sys
 import pandas as pd
-import re
 from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.options import Options
+
+import perfilado  # noqa: F401 — con ALETHEIA_PERFIL perfila el script entero
+import traza
+from interaccion import ELEGIR_TXT, preguntar
+from salidas import guardar_tabla
+from checkpoints import procesar_partidos
+from partido import limpiar_map_name, match_id_de_url, parsear_pagina
+from cache_paginas import guardar_pagina, obtener_html, pagina_en_cache, resumen_cache
+from descargas import PARSER, descargar_html, usar_selenium
+from esperas import SELECTOR_CONTENEDORES, cargar_y_esperar, esperar, resumen_esperas
+from navegadores import liberar_driver, obtener_driver
+from scrapear_stats_pro_china import (COLUMNAS_STATS, construir_lookup_rondas,
+                                      generar_filas_split, safe_float, safe_int)
+
+MODO_CLICS = os.environ.get("ALETHEIA_STATS_MODO", "").lower() == "clics"
+
+# Lados de la tabla → clase del span con su valor
+LADOS = {'Attack': 'mod-t', 'Defense': 'mod-ct'}
 
 # Carpeta de salida relativa al script
 OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'output_data')
@@ -31,7 +63,7 @@ def cargar_enlaces_desde_txt():
         archivos = glob.glob(os.path.join(OUTPUT_DIR, "*.txt"))
         if not archivos:
             print("No se encontro ningun archivo .txt en output_data/.")
-            ruta_txt = input("   Ingresa la ruta del archivo .txt: ").strip()
+            ruta_txt = preguntar("   Ingresa la ruta del archivo .txt: ", ELEGIR_TXT).strip()
         elif len(archivos) == 1:
             ruta_txt = archivos[0]
             print(f"Cargando enlaces desde: {os.path.basename(ruta_txt)}")
@@ -41,7 +73,7 @@ def cargar_enlaces_desde_txt():
                 print(f"   [{i+1}] {os.path.basename(f)}")
             while True:
                 try:
-                    sel = int(input("   Selecciona el numero del archivo a usar: ").strip())
+                    sel = int(preguntar("   Selecciona el numero del archivo a usar: ", ELEGIR_TXT).strip())
                     if 1 <= sel <= len(archivos):
                         ruta_txt = archivos[sel - 1]
                         break
@@ -61,29 +93,43 @@ def cargar_enlaces_desde_txt():
     print(f"   Carpeta de salida: {carpeta_salida}")
     return urls, carpeta_salida
 
-ENLACES, OUTPUT_DIR = cargar_enlaces_desde_txt()
 
-def obtener_stats_detalladas(driver, url):
+def lado_activo(div_mapa, boton, data_side_valor):
+    """
+    Condición de espera tras el clic en ATK/DEF: el botón queda marcado
+    como activo o las celdas ya muestran los span del lado elegido.
+    """
+    def condicion(_driver):
+        if 'mod-active' in (boton.get_attribute('class') or ''):
+            return True
+        spans = div_mapa.find_elements(By.CSS_SELECTOR, f"span.mod-{data_side_valor}")
+        return bool(spans) and spans[0].is_displayed()
+    return condicion
+
+def obtener_stats_con_clics(driver, url):
+    """Motor anterior (ALETHEIA_STATS_MODO=clics): clic en ATK y DEF por mapa."""
     print(f"🌐 Procesando: {url}")
     try:
-        driver.get(url)
-        time.sleep(3) # Espera inicial
+        if cargar_y_esperar(driver, url, SELECTOR_CONTENEDORES) is None:
+            return []
     except Exception as e:
         print(f"❌ Error cargando URL: {e}")
         return []
 
+    # Este motor necesita la página viva para hacer clic en las pestañas
+    # ATK/DEF, pero deja el HTML en la caché para el resto de scripts.
+    if not pagina_en_cache(url):
+        guardar_pagina(url, driver.page_source)
+
     # Obtener Match ID de la URL
-    match_id = "Unknown"
-    match_search = re.search(r'vlr\.gg/(\d+)', url)
-    if match_search:
-        match_id = match_search.group(1)
+    match_id = match_id_de_url(url)
 
     datos_partido = []
 
     # Encontrar contenedores de mapas (excluyendo el general 'all')
     contenedores_mapas = driver.find_elements(By.CSS_SELECTOR, "div.vm-stats-game")
 
-    for div_mapa in contenedores_mapas:
+    for div_mapa in traza.por_mapa(contenedores_mapas, 'stats_lados', match_id):
         try:
             game_id = div_mapa.get_attribute("data-game-id")
             
@@ -92,13 +138,13 @@ def obtener_stats_detalladas(driver, url):
                 continue
 
             # Extraer nombre del mapa
-            soup_mapa = BeautifulSoup(div_mapa.get_attribute('outerHTML'), 'html.parser')
+            soup_mapa = BeautifulSoup(div_mapa.get_attribute('outerHTML'), PARSER)
             map_div = soup_mapa.find('div', class_='map')
             if not map_div:
                 continue
                 
-            map_name_raw = map_div.get_text(strip=True)
-            map_name = map_name_raw.split()[0] # Limpieza: "Bind PICK" -> "Bind"
+            # Mismo map_id que el resto de tablas ("Bind PICK 45:12" -> "bind")
+            map_name = limpiar_map_name(map_div.get_text(" ", strip=True)).capitalize()
             
             map_id = f"{match_id}_{map_name.lower()}"
             print(f"  📍 Analizando Mapa: {map_name} ({map_id})")
@@ -120,12 +166,18 @@ def obtener_stats_detalladas(driver, url):
                         f"div.js-side-filter div[data-side='{data_side_valor}']"
                     )
                     
-                    # Hacer clic con JS (más robusto)
+                    # Hacer clic con JS (más robusto) y esperar a que el
+                    # DOM muestre el lado elegido
                     driver.execute_script("arguments[0].click();", boton)
-                    time.sleep(1) # Pausa para que el DOM cambie
+                    esperar(
+                        driver,
+                        lado_activo(div_mapa, boton, data_side_valor),
+                        'clic',
+                        descripcion=f"[{nombre_lado}]",
+                    )
                     
                     # Refrescar el HTML del contenedor
-                    soup_actualizado = BeautifulSoup(div_mapa.get_attribute('outerHTML'), 'html.parser')
+                    soup_actualizado = BeautifulSoup(div_mapa.get_attribute('outerHTML'), PARSER)
                     
                     # Buscamos las tablas de estadísticas
                     tablas = soup_actualizado.find_all('table', class_='wf-table-inset')
@@ -224,59 +276,211 @@ def obtener_stats_detalladas(driver, url):
 
     return datos_partido
 
+# --- STATS POR LADO SIN CLICS ---
+def extraer_spans(celda):
+    """
+    Valores de una celda de stats en un solo recorrido:
+    {'mod-both': ..., 'mod-t': ..., 'mod-ct': ...} (sin '%'; None si falta el span).
+    """
+    valores = {'mod-both': None, 'mod-t': None, 'mod-ct': None}
+    for span in celda.find_all('span'):
+        for clase in span.get('class') or []:
+            if clase in valores and valores[clase] is None:
+                valores[clase] = span.get_text(strip=True).replace('%', '')
+    return valores
+
+
+def fila_lado(base, nombre_lado, valores):
+    """Fila de vlr_stats_players_sides de un lado (mismo formato que el motor con clics)."""
+    clase = LADOS[nombre_lado]
+
+    def stat(idx):
+        valor = valores[idx][clase]
+        return "0" if valor is None else valor
+
+    # INDICES: 0:R, 1:ACS, 2:K, 3:D, 4:A, 5:+/- (se salta), 6:KAST, 7:ADR, 8:HS%, 9:FK, 10:FD
+    return {
+        **base,
+        'side': nombre_lado,
+        'rating': stat(0), 'acs': stat(1), 'kills': stat(2), 'deaths': stat(3),
+        'assists': stat(4), 'kast': stat(6), 'adr': stat(7), 'hs_percent': stat(8),
+        'fk': stat(9), 'fd': stat(10),
+    }
+
+
+def fila_all(base, map_name, pos, team_top, team_bot, celdas, valores):
+    """Fila ALL con el formato de parsear_stats_all (para el split proporcional)."""
+    def get(idx):
+        return valores[idx]['mod-both'] or celdas[idx].get_text(strip=True).replace('%', '').strip()
+
+    return {
+        'match_id': base['match_id'], 'map_id': base['map_id'], 'map_name': map_name,
+        'player_name': base['player_name'], 'team_name': base['team_name'],
+        'team_pos': pos, 'team_top': team_top, 'team_bot': team_bot,
+        'agent': base['agent'],
+        'rating': safe_float(get(0)), 'acs': safe_float(get(1)),
+        'kills': safe_int(get(2)), 'deaths': safe_int(get(3)), 'assists': safe_int(get(4)),
+        'kast': safe_float(get(6)), 'adr': safe_float(get(7)), 'hs_percent': safe_float(get(8)),
+        'fk': safe_int(get(9)), 'fd': safe_int(get(10)),
+    }
+
+
+def parsear_stats_lados(soup, match_id, filas_mapas=None):
+    """
+    Parseo puro (sin red ni clics) de la pestaña overview: filas Attack y
+    Defense de cada jugador y mapa, leídas de los span mod-t / mod-ct.
+
+    Los mapas cuyos span de lado están vacíos se dividen proporcionalmente
+    (generar_filas_split) con las rondas de `filas_mapas` (filas de
+    vlr_mapas de este partido); si no se pasan, se sacan de la misma página.
+    """
+    datos = []
+    filas_all_sin_lados = []
+
+    for contenedor in traza.por_mapa(soup.find_all('div', class_='vm-stats-game'), 'stats_lados', match_id):
+        game_id = contenedor.get('data-game-id')
+        if not game_id or game_id == 'all':
+            continue
+
+        map_div = contenedor.find('div', class_='map')
+        if not map_div:
+            continue
+        map_name = limpiar_map_name(map_div.get_text(" ", strip=True))
+        map_id = f"{match_id}_{map_name}"
+        print(f"  📍 Analizando Mapa: {map_name.capitalize()} ({map_id})")
+
+        team_names = contenedor.find_all('div', class_='team-name')
+        team_top = team_names[0].get_text(strip=True) if len(team_names) > 0 else None
+        team_bot = team_names[1].get_text(strip=True) if len(team_names) > 1 else None
+
+        filas = {lado: [] for lado in LADOS}
+        filas_all = []
+        hay_lados = False
+
+        for idx_tabla, tabla in enumerate(contenedor.find_all('table', class_='wf-table-inset')):
+            pos = 'top' if idx_tabla == 0 else 'bot'
+            for fila in tabla.find_all('tr'):
+                celda_jugador = fila.find('td', class_='mod-player')
+                if not celda_jugador:
+                    continue
+
+                div_jugador = celda_jugador.find('div', class_='text-of')
+                player_name = div_jugador.get_text(strip=True) if div_jugador else "Unknown"
+                div_equipo = celda_jugador.find('div', class_='ge-text-light')
+                team_name = div_equipo.get_text(strip=True) if div_equipo else "Unknown"
+
+                agent = "Unknown"
+                celda_agente = fila.find('td', class_='mod-agents')
+                if celda_agente:
+                    img_agente = celda_agente.find('img')
+                    if img_agente and 'title' in img_agente.attrs:
+                        agent = img_agente['title']
+
+                celdas = fila.find_all('td', class_='mod-stat')
+                if len(celdas) < 11:
+                    print(f"    ⚠️ Fila incompleta para {player_name}, saltando...")
+                    continue
+
+                valores = [extraer_spans(celda) for celda in celdas]
+                hay_lados = hay_lados or any(v['mod-t'] or v['mod-ct'] for v in valores)
+
+                base = {'match_id': match_id, 'map_id': map_id, 'player_name': player_name,
+                        'team_name': team_name, 'agent': agent}
+                for nombre_lado in LADOS:
+                    filas[nombre_lado].append(fila_lado(base, nombre_lado, valores))
+                filas_all.append(fila_all(base, map_name, pos, team_top, team_bot, celdas, valores))
+
+        if hay_lados:
+            datos.extend(filas['Attack'] + filas['Defense'])
+        elif filas_all:
+            print(f"    ⚠️ Sin valores ATK/DEF en {map_name} → split proporcional")
+            filas_all_sin_lados.extend(filas_all)
+
+    if filas_all_sin_lados:
+        if filas_mapas is None:
+            from scrapear_vlr_corregido import parsear_mapas_rondas
+            filas_mapas, _ = parsear_mapas_rondas(soup, match_id)
+        lookup_rondas = construir_lookup_rondas(pd.DataFrame(filas_mapas)) if filas_mapas else {}
+        datos.extend(generar_filas_split(filas_all_sin_lados, lookup_rondas))
+
+    return datos
+
+
+def obtener_stats_detalladas(driver, url):
+    """
+    Descarga (o lee de caché) la pestaña overview y extrae las stats por lado
+    sin clics. Con driver=None se descarga por HTTP (motor estático).
+    """
+    print(f"🌐 Procesando: {url}")
+
+    def descargar():
+        if driver is None:
+            return descargar_html(url)
+        return cargar_y_esperar(driver, url, SELECTOR_CONTENEDORES)
+
+    try:
+        html = obtener_html(url, descargar)
+    except Exception as e:
+        print(f"❌ Error cargando URL: {e}")
+        return []
+    if html is None:
+        return []
+
+    return parsear_stats_lados(parsear_pagina(html), match_id_de_url(url))
+
 # --- MAIN ---
 if __name__ == "__main__":
+    # Se cargan aquí (no al importar) para poder reutilizar los parsers
+    # desde otros scripts sin pedir un .txt
+    ENLACES, OUTPUT_DIR = cargar_enlaces_desde_txt()
+
     print("🚀 Iniciando extracción de estadísticas por lado...")
     print("="*60)
     
-    # Configurar Chrome
-    options = Options()
-    options.add_argument("--headless")  # Sin ventana visible
-    options.add_argument("--start-maximized")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    
-    try:
-        driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()), 
-            options=options
-        )
-    except Exception as e:
-        print(f"❌ Error inicializando driver: {e}")
-        exit()
+    # Chrome solo para el motor con clics o si no se pidió el motor estático
+    driver = None
+    if MODO_CLICS or usar_selenium():
+        try:
+            driver = obtener_driver()
+        except Exception as e:
+            print(f"❌ Error inicializando driver: {e}")
+            sys.exit(1)
+    else:
+        print("⚡ Motor estático: requests + lxml, sin Chrome")
+    obtener_stats = obtener_stats_con_clics if MODO_CLICS else obtener_stats_detalladas
 
-    todos_los_datos = []
+    def extraer(i, link):
+        print(f"\n[{i+1}/{len(ENLACES)}] Procesando partido...")
+        data = obtener_stats(driver, link)
+        if data:
+            print(f"  ✅ {len(data)} filas extraídas")
+        else:
+            print(f"  ⚠️ No se extrajeron datos")
+        return {'stats': data}
 
+    codigo_salida = 0  # ≠ 0 si el scraping falla: main.py --eventos lo trata como error
     try:
-        for i, link in enumerate(ENLACES):
-            print(f"\n[{i+1}/{len(ENLACES)}] Procesando partido...")
-            data = obtener_stats_detalladas(driver, link)
-            if data:
-                todos_los_datos.extend(data)
-                print(f"  ✅ {len(data)} filas extraídas")
-            else:
-                print(f"  ⚠️ No se extrajeron datos")
+        # Cada partido se guarda en su checkpoint al terminarlo
+        todos_los_datos = procesar_partidos(ENLACES, OUTPUT_DIR, 'stats_pro', ['stats'], extraer,
+                                            {'stats': "vlr_stats_players_sides"})['stats']
 
         # Guardar a Excel
         if todos_los_datos:
             df = pd.DataFrame(todos_los_datos)
             
             # Ordenar columnas
-            cols_order = ['match_id', 'map_id', 'player_name', 'team_name', 'side', 'agent', 
-                          'rating', 'acs', 'kills', 'deaths', 'assists', 'kast', 'adr', 
-                          'hs_percent', 'fk', 'fd']
+            df = df[COLUMNAS_STATS]
             
-            df = df[cols_order]
-            
-            archivo_salida = os.path.join(OUTPUT_DIR, "vlr_stats_players_sides.xlsx")
-            df.to_excel(archivo_salida, index=False)
+            rutas = guardar_tabla(df, OUTPUT_DIR, "vlr_stats_players_sides")
             
             print("\n" + "="*60)
-            print(f"✅ ¡Éxito! Archivo guardado: {archivo_salida}")
+            print(f"✅ ¡Éxito! Archivo guardado: {', '.join(rutas)}")
             print(f"\n📊 RESUMEN:")
             print(f"   • Total de filas: {len(df)}")
             print(f"   • Jugadores únicos: {df['player_name'].nunique()}")
             print(f"   • Mapas: {df['map_id'].nunique()}")
+            print(f"   • {resumen_cache()}")
+            print(f"   • {resumen_esperas()}")
             print("\n📋 Preview (primeras 10 filas):")
             print(df.head(10).to_string(index=False))
         else:
@@ -284,10 +488,13 @@ if __name__ == "__main__":
             
     except Exception as e:
         print(f"\n❌ Error durante el scraping: {e}")
+        codigo_salida = 1
         import traceback
         traceback.print_exc()
         
     finally:
-        if 'driver' in locals():
-            driver.quit()
-            print("\n🔒 Driver cerrado correctamente")
\ No newline at end of file
+        if driver is not None:
+            liberar_driver(driver)
+            print("\n🔒 Driver cerrado correctamente")
+
+    sys.exit(codigo_salida)
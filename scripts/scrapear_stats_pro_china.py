@@ -30,17 +30,20 @@ LÓGICA DEL SPLIT:
 =======================================================================
 """
 
-import time
 import os
-import re
+import sys
 import glob
 import pandas as pd
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.options import Options
+
+import perfilado  # noqa: F401 — con ALETHEIA_PERFIL perfila el script entero
+import traza
+from salidas import guardar_tabla, leer_tabla
+from checkpoints import procesar_partidos
+from partido import limpiar_map_name, match_id_de_url, parsear_pagina
+from cache_paginas import obtener_html, resumen_cache
+from descargas import descargar_html, usar_selenium
+from navegadores import liberar_driver, obtener_driver
+from esperas import SELECTOR_CONTENEDORES, cargar_y_esperar, resumen_esperas
 
 # ─── CONFIGURACIÓN ────────────────────────────────────────────────────────────
 OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'output_data')
@@ -94,29 +97,7 @@ def cargar_enlaces_desde_txt():
     return urls, carpeta_salida
 
 
-ENLACES, OUTPUT_DIR = cargar_enlaces_desde_txt()
-
-
 # ─── UTILIDADES ───────────────────────────────────────────────────────────────
-def limpiar_map_name(raw_text):
-    """
-    Convierte el texto crudo del div .map a un nombre limpio en minúsculas.
-    Ejemplos:
-      "AbyssPICK-"    → "abyss"
-      "Haven-"        → "haven"
-      "Bind"          → "bind"
-      "Split PICK 1"  → "split"
-    """
-    # Tomar solo letras consecutivas al inicio
-    match = re.match(r'([A-Za-z]+)', raw_text.strip())
-    if match:
-        nombre = match.group(1)
-        # Quitar "PICK", "DECIDER" si quedaron pegados
-        nombre = re.sub(r'(?i)(pick|decider)$', '', nombre)
-        return nombre.lower()
-    return raw_text.strip().lower()
-
-
 def safe_float(val):
     try:
         v = str(val).replace('%', '').replace('–', '').strip()
@@ -147,27 +128,32 @@ def obtener_stats_partido(driver, url):
     Extrae stats ALL (mod-both) por jugador por mapa.
     También guarda team_pos (top/bot) para poder vincular con vlr_mapas.
     Retorna lista de dicts con todos los datos crudos.
+    Con driver=None descarga el HTML por HTTP (motor estático, sin Chrome).
     """
     print(f"🌐 Procesando: {url}")
+
+    def descargar():
+        if driver is None:
+            return descargar_html(url)
+        return cargar_y_esperar(driver, url, SELECTOR_CONTENEDORES)
+
     try:
-        driver.get(url)
-        time.sleep(3)
+        html = obtener_html(url, descargar)
     except Exception as e:
         print(f"❌ Error cargando URL: {e}")
         return []
+    if html is None:
+        return []
 
-    match_id = "Unknown"
-    m = re.search(r'vlr\.gg/(\d+)', url)
-    if m:
-        match_id = m.group(1)
+    return parsear_stats_all(parsear_pagina(html), match_id_de_url(url))
 
-    html = driver.page_source
-    soup = BeautifulSoup(html, 'html.parser')
 
+def parsear_stats_all(soup, match_id):
+    """Parseo puro (sin red) de las stats ALL de la pestaña overview."""
     datos = []
     contenedores = soup.find_all('div', class_='vm-stats-game')
 
-    for contenedor in contenedores:
+    for contenedor in traza.por_mapa(contenedores, 'stats_china', match_id):
         game_id = contenedor.get('data-game-id')
         if not game_id or game_id == 'all':
             continue
@@ -177,8 +163,7 @@ def obtener_stats_partido(driver, url):
         if not map_div:
             continue
 
-        raw_map = map_div.get_text(" ", strip=True)
-        map_name = limpiar_map_name(raw_map)
+        map_name = limpiar_map_name(map_div.get_text(" ", strip=True))
         map_id = f"{match_id}_{map_name}"
 
         print(f"  📍 Mapa: {map_name} → map_id: {map_id}")
@@ -248,6 +233,12 @@ def obtener_stats_partido(driver, url):
     return datos
 
 
+# Columnas de vlr_stats_players_sides, en orden
+COLUMNAS_STATS = ['match_id', 'map_id', 'player_name', 'team_name', 'side', 'agent',
+                  'rating', 'acs', 'kills', 'deaths', 'assists', 'kast', 'adr',
+                  'hs_percent', 'fk', 'fd']
+
+
 # ─── SPLIT ATK/DEF ────────────────────────────────────────────────────────────
 def construir_lookup_rondas(df_mapas):
     """
@@ -359,47 +350,50 @@ def generar_filas_split(datos_all, lookup_rondas):
 
 # ─── MAIN ─────────────────────────────────────────────────────────────────────
 if __name__ == "__main__":
+    # Se cargan aquí (no al importar) para poder reutilizar los parsers
+    # desde otros scripts sin pedir un .txt
+    ENLACES, OUTPUT_DIR = cargar_enlaces_desde_txt()
+
     print("🚀 Iniciando extracción de estadísticas por lado...")
     print("=" * 60)
 
     # ── Cargar vlr_mapas para el split ───────────────────────────────────────
     lookup_rondas = {}
-    ruta_mapas = os.path.join(OUTPUT_DIR, "vlr_mapas.xlsx")
-    if os.path.exists(ruta_mapas):
-        df_mapas = pd.read_excel(ruta_mapas)
+    # Solo las columnas del split (desde el Parquet si es la copia más reciente)
+    df_mapas = leer_tabla(OUTPUT_DIR, "vlr_mapas", columnas=['round_id', 'score_a', 'score_b'])
+    if df_mapas is not None:
         lookup_rondas = construir_lookup_rondas(df_mapas)
-        print(f"  ✅ vlr_mapas.xlsx cargado → {len(lookup_rondas)} mapas con datos de rondas")
+        print(f"  ✅ vlr_mapas cargado → {len(lookup_rondas)} mapas con datos de rondas")
     else:
         print("  ⚠️ vlr_mapas.xlsx no encontrado. Se usará split 50/50.")
         print("     Ejecuta scrapear_vlr_corregido.py primero para mayor precisión.")
 
     # ── Configurar Selenium ───────────────────────────────────────────────────
-    options = Options()
-    options.add_argument("--headless")
-    options.add_argument("--start-maximized")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-
-    try:
-        driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()),
-            options=options
-        )
-    except Exception as e:
-        print(f"❌ Error inicializando driver: {e}")
-        exit()
+    driver = None
+    if usar_selenium():
+        try:
+            driver = obtener_driver()
+        except Exception as e:
+            print(f"❌ Error inicializando driver: {e}")
+            sys.exit(1)
+    else:
+        print("⚡ Motor estático: requests + lxml, sin Chrome")
 
-    todos_los_datos_all = []
+    def extraer(i, link):
+        print(f"\n[{i+1}/{len(ENLACES)}] Procesando partido...")
+        datos = obtener_stats_partido(driver, link)
+        if datos:
+            print(f"  ✅ {len(datos)} filas ALL extraídas ({len(datos)//2} jugadores x mapas)")
+        else:
+            print(f"  ⚠️ No se extrajeron datos")
+        return {'stats_all': datos}
 
+    codigo_salida = 0  # ≠ 0 si el scraping falla: main.py --eventos lo trata como error
     try:
-        for i, link in enumerate(ENLACES):
-            print(f"\n[{i+1}/{len(ENLACES)}] Procesando partido...")
-            datos = obtener_stats_partido(driver, link)
-            if datos:
-                todos_los_datos_all.extend(datos)
-                print(f"  ✅ {len(datos)} filas ALL extraídas ({len(datos)//2} jugadores x mapas)")
-            else:
-                print(f"  ⚠️ No se extrajeron datos")
+        # Se guardan las filas ALL de cada partido; el split se aplica al final
+        # porque depende de vlr_mapas.xlsx
+        todos_los_datos_all = procesar_partidos(ENLACES, OUTPUT_DIR, 'stats_pro_china',
+                                                ['stats_all'], extraer)['stats_all']
 
         if not todos_los_datos_all:
             print("\n⚠️ No se extrajeron datos.")
@@ -409,37 +403,36 @@ if __name__ == "__main__":
             print("📐 Aplicando split ATK/DEF proporcional...")
             filas_finales = generar_filas_split(todos_los_datos_all, lookup_rondas)
 
-            df = pd.DataFrame(filas_finales)
-
             # Columnas exactas en el orden correcto
-            cols = ['match_id', 'map_id', 'player_name', 'team_name', 'side', 'agent',
-                    'rating', 'acs', 'kills', 'deaths', 'assists', 'kast', 'adr',
-                    'hs_percent', 'fk', 'fd']
-            df = df[cols]
+            df = pd.DataFrame(filas_finales)[COLUMNAS_STATS]
 
-            archivo_salida = os.path.join(OUTPUT_DIR, "vlr_stats_players_sides.xlsx")
-            df.to_excel(archivo_salida, index=False)
+            rutas = guardar_tabla(df, OUTPUT_DIR, "vlr_stats_players_sides")
 
             print(f"\n{'='*60}")
-            print(f"✅ Archivo guardado: {archivo_salida}")
+            print(f"✅ Archivo guardado: {', '.join(rutas)}")
             print(f"\n📊 RESUMEN:")
             print(f"   • Total de filas:       {len(df)}")
             print(f"   • Jugadores únicos:     {df['player_name'].nunique()}")
             print(f"   • Mapas únicos:         {df['map_id'].nunique()}")
             print(f"   • Filas Attack:         {(df['side']=='Attack').sum()}")
             print(f"   • Filas Defense:        {(df['side']=='Defense').sum()}")
+            print(f"   • {resumen_cache()}")
+            print(f"   • {resumen_esperas()}")
 
             print("\n📋 Preview (primeras 10 filas):")
             print(df.head(10).to_string(index=False))
 
     except Exception as e:
         print(f"\n❌ Error durante el scraping: {e}")
+        codigo_salida = 1
         import traceback
         traceback.print_exc()
 
     finally:
-        if 'driver' in locals():
-            driver.quit()
+        if driver is not None:
+            liberar_driver(driver)
             print("\n🔒 Driver cerrado correctamente")
 
-    print("\n🏁 Script finalizado.")
\ No newline at end of file
+    print("\n🏁 Script finalizado.")
+
+    sys.exit(codigo_salida)
@@ -1,12 +1,18 @@
-import time
 import os
+import sys
 import pandas as pd
 import re
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.options import Options
+
+import perfilado  # noqa: F401 — con ALETHEIA_PERFIL perfila el script entero
+import traza
+from interaccion import ELEGIR_TXT, preguntar
+from salidas import guardar_tabla
+from checkpoints import procesar_partidos
+from partido import limpiar_map_name, match_id_de_url, parsear_pagina
+from cache_paginas import obtener_html, resumen_cache
+from descargas import descargar_html, usar_selenium
+from navegadores import liberar_driver, obtener_driver
+from esperas import SELECTOR_CONTENEDORES, cargar_y_esperar, resumen_esperas
 
 # Carpeta de salida relativa al script
 OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'output_data')
@@ -30,7 +36,7 @@ def cargar_enlaces_desde_txt():
         archivos = glob.glob(os.path.join(OUTPUT_DIR, "*.txt"))
         if not archivos:
             print("No se encontro ningun archivo .txt en output_data/.")
-            ruta_txt = input("   Ingresa la ruta del archivo .txt: ").strip()
+            ruta_txt = preguntar("   Ingresa la ruta del archivo .txt: ", ELEGIR_TXT).strip()
         elif len(archivos) == 1:
             ruta_txt = archivos[0]
             print(f"Cargando enlaces desde: {os.path.basename(ruta_txt)}")
@@ -40,7 +46,7 @@ def cargar_enlaces_desde_txt():
                 print(f"   [{i+1}] {os.path.basename(f)}")
             while True:
                 try:
-                    sel = int(input("   Selecciona el numero del archivo a usar: ").strip())
+                    sel = int(preguntar("   Selecciona el numero del archivo a usar: ", ELEGIR_TXT).strip())
                     if 1 <= sel <= len(archivos):
                         ruta_txt = archivos[sel - 1]
                         break
@@ -60,28 +66,32 @@ def cargar_enlaces_desde_txt():
     print(f"   Carpeta de salida: {carpeta_salida}")
     return urls, carpeta_salida
 
-ENLACES, OUTPUT_DIR = cargar_enlaces_desde_txt()
 
 def obtener_datos_partido(driver, url):
     """
-    Extrae datos de mapas y rondas de un partido de VLR.gg
+    Extrae datos de mapas y rondas de un partido de VLR.gg.
+    Con driver=None descarga el HTML por HTTP (motor estático, sin Chrome).
     """
-    print(f"   🌐 Navegando a: {url}")
+    def descargar():
+        print(f"   🌐 Navegando a: {url}")
+        if driver is None:
+            return descargar_html(url)
+        return cargar_y_esperar(driver, url, SELECTOR_CONTENEDORES)
+
     try:
-        driver.get(url)
-        time.sleep(3) 
-        html = driver.page_source
+        html = obtener_html(url, descargar)
     except Exception as e:
         print(f"   ❌ Error cargando link: {e}")
         return None, None
+    if html is None:
+        return None, None
 
-    soup = BeautifulSoup(html, 'html.parser')
-    
-    match_id = "Unknown"
-    match_search = re.search(r'vlr\.gg/(\d+)', url)
-    if match_search: 
-        match_id = match_search.group(1)
+    return parsear_mapas_rondas(parsear_pagina(html), match_id_de_url(url))
 
+def parsear_mapas_rondas(soup, match_id):
+    """
+    Parseo puro (sin red) de la pestaña overview: devuelve (mapas, rondas).
+    """
     # --- 1. LECTURA DEL VETO ---
     veto_text = ""
     note_div = soup.find('div', class_='match-header-note')
@@ -152,7 +162,7 @@ def obtener_datos_partido(driver, url):
     # --- 4. ITERAR SOBRE CADA MAPA ---
     contenedores = soup.find_all('div', class_='vm-stats-game')
     
-    for contenedor in contenedores:
+    for contenedor in traza.por_mapa(contenedores, 'mapas_rondas', match_id):
         game_id = contenedor.get('data-game-id')
         if not game_id or game_id == 'all': 
             continue
@@ -161,9 +171,9 @@ def obtener_datos_partido(driver, url):
         if not map_header: 
             continue
         
-        raw_text = map_header.get_text(" ", strip=True)
-        map_name = raw_text.split()[0].replace("PICK", "").strip()
-        map_lower = map_name.lower()
+        # Mismo nombre de mapa que el resto de scripts (partido.limpiar_map_name)
+        map_lower = limpiar_map_name(map_header.get_text(" ", strip=True))
+        map_name = map_lower.capitalize()
         
         print(f"   🗺️  Procesando mapa: {map_name}")
         
@@ -347,64 +357,66 @@ def obtener_datos_partido(driver, url):
 
 # --- EJECUCIÓN PRINCIPAL ---
 if __name__ == "__main__":
+    # Se cargan aquí (no al importar) para poder reutilizar los parsers
+    # desde otros scripts sin pedir un .txt
+    ENLACES, OUTPUT_DIR = cargar_enlaces_desde_txt()
+
     print("🚀 Iniciando web scraping de VLR.gg...")
     print("="*60)
     
-    options = Options()
-    options.add_argument("--start-maximized")
-    options.add_argument("--headless")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-
-    try:
-        driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()), 
-            options=options
-        )
-    except Exception as e:
-        print(f"❌ Error inicializando driver: {e}")
-        exit()
+    driver = None
+    if usar_selenium():
+        try:
+            driver = obtener_driver()
+        except Exception as e:
+            print(f"❌ Error inicializando driver: {e}")
+            sys.exit(1)
+    else:
+        print("⚡ Motor estático: requests + lxml, sin Chrome")
 
-    todos_mapas = []
-    todas_rondas = []
+    def extraer(i, link):
+        print(f"\n[{i+1}/{len(ENLACES)}] Procesando partido...")
+        mapas, rondas = obtener_datos_partido(driver, link)
+        return {'mapas': mapas, 'rondas': rondas}
 
+    codigo_salida = 0  # ≠ 0 si el scraping falla: main.py --eventos lo trata como error
     try:
-        for i, link in enumerate(ENLACES):
-            print(f"\n[{i+1}/{len(ENLACES)}] Procesando partido...")
-            mapas, rondas = obtener_datos_partido(driver, link)
-            
-            if mapas: 
-                todos_mapas.extend(mapas)
-            if rondas: 
-                todas_rondas.extend(rondas)
+        # Cada partido se guarda en su checkpoint al terminarlo
+        tablas = procesar_partidos(ENLACES, OUTPUT_DIR, 'vlr_corregido', ['mapas', 'rondas'], extraer,
+                                   {'mapas': "vlr_mapas", 'rondas': "vlr_rondas"})
+        todos_mapas = tablas['mapas']
+        todas_rondas = tablas['rondas']
         
         print("\n" + "="*60)
-        print("✅ Guardando archivos Excel...")
+        print("✅ Guardando tablas...")
         
         df_mapas = pd.DataFrame(todos_mapas)
         df_rondas = pd.DataFrame(todas_rondas)
         
-        ruta_mapas = os.path.join(OUTPUT_DIR, "vlr_mapas.xlsx")
-        ruta_rondas = os.path.join(OUTPUT_DIR, "vlr_rondas.xlsx")
-        df_mapas.to_excel(ruta_mapas, index=False)
-        df_rondas.to_excel(ruta_rondas, index=False)
+        rutas = (guardar_tabla(df_mapas, OUTPUT_DIR, "vlr_mapas")
+                 + guardar_tabla(df_rondas, OUTPUT_DIR, "vlr_rondas"))
         
         print("📂 Archivos guardados:")
-        print(f"   • {ruta_mapas}")
-        print(f"   • {ruta_rondas}")
+        for ruta in rutas:
+            print(f"   • {ruta}")
         print("\n🎉 ¡Scraping completado exitosamente!")
         
         print("\n📊 RESUMEN:")
         print(f"   • Total de mapas: {len(df_mapas)}")
         print(f"   • Total de rondas: {len(df_rondas)}")
+        print(f"   • {resumen_cache()}")
+        print(f"   • {resumen_esperas()}")
         print("\n" + df_mapas.to_string(index=False))
 
     except Exception as e:
         print(f"\n❌ Error durante el scraping: {e}")
+        codigo_salida = 1
         import traceback
         traceback.print_exc()
         
     finally:
-        if 'driver' in locals(): 
-            driver.quit()
-            print("\n🔒 Driver cerrado correctamente")
\ No newline at end of file
+        if driver is not None:
+            liberar_driver(driver)
+            print("\n🔒 Driver cerrado correctamente")
+
+    sys.exit(codigo_salida)
@@ -0,0 +1,258 @@
+"""
+ALETHEIA - Traza estructurada de tiempos y recursos (JSON lines)
+Los scripts solo cuentan su progreso con prints y main.py captura la
+salida de cada uno como un bloque de texto; para saber en qué se van los
+minutos de un evento hace falta medirlo por etapa.
+
+Con ALETHEIA_TRAZA activo, cada proceso añade líneas JSON a un mismo
+archivo (main.py se lo pasa a todos los scripts que lanza):
+
+  tramo      una etapa cronometrada: ms, script, evento y sus atributos
+               turno         espera del limitador antes de pedir una página (host)
+               navegacion    driver.get de una página (Chrome)
+               espera        espera por condición de Selenium (paso, cumplida)
+               descarga      petición HTTP (status, bytes)
+               parseo        construcción del árbol de una página (bytes)
+               emision_mapa  filas de una tabla para un mapa (tabla, game_id)
+               partido       un partido completo en procesar_partidos (filas por tabla)
+  contadores al terminar el proceso: bytes descargados, reintentos,
+             aciertos de caché... (sumas)
+  medidas    al terminar el proceso: máximos (memoria de Chrome)
+
+resumir() agrega un archivo de traza (por script y por etapa, contadores
+y partidos más lentos); main.py lo imprime al final de cada opción, y
+también se puede pedir a mano:
+
+  python scripts/traza.py output_data/trazas/traza_20260301_120000.jsonl
+
+Variables de entorno:
+  ALETHEIA_TRAZA   ruta del archivo .jsonl, o 1 para
+                   output_data/trazas/traza_<fecha>.jsonl
+"""
+
+import atexit
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+
+try:
+    import psutil  # opcional: RSS de los procesos de Chrome
+except ImportError:
+    psutil = None
+
+CARPETA_TRAZAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'output_data', 'trazas')
+
+
+def ruta_nueva():
+    """output_data/trazas/traza_<fecha>.jsonl"""
+    return os.path.join(CARPETA_TRAZAS, f"traza_{datetime.now():%Y%m%d_%H%M%S}.jsonl")
+
+
+def _ruta_configurada():
+    valor = os.environ.get("ALETHEIA_TRAZA", "").strip()
+    if valor in ("", "0"):
+        return None
+    return ruta_nueva() if valor == "1" else valor
+
+
+RUTA = _ruta_configurada()
+ACTIVA = RUTA is not None
+
+SCRIPT = os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else "python"
+EVENTO = os.path.splitext(os.path.basename(os.environ.get("ALETHEIA_TXT_FILE", "")))[0] \
+    .replace("enlaces_", "", 1) or None
+
+CONTADORES = defaultdict(float)
+MEDIDAS = {}
+_candado = threading.Lock()
+_archivo = None
+
+
+def _escribir(registro):
+    global _archivo
+    registro = {'ts': round(time.time(), 3), 'pid': os.getpid(), 'script': SCRIPT,
+                'evento': EVENTO, **registro}
+    linea = json.dumps(registro, ensure_ascii=False, default=str) + "\n"
+    with _candado:
+        if _archivo is None:
+            os.makedirs(os.path.dirname(os.path.abspath(RUTA)), exist_ok=True)
+            # Varios procesos escriben a la vez: append y una escritura por línea
+            _archivo = open(RUTA, 'a', encoding='utf-8')
+        _archivo.write(linea)
+        _archivo.flush()
+
+
+def compartir_ruta():
+    """
+    Fija la ruta resuelta en el entorno (ALETHEIA_TRAZA=1 → un archivo con
+    fecha) para que los subprocesos escriban todos en el mismo archivo.
+    """
+    if ACTIVA:
+        os.environ["ALETHEIA_TRAZA"] = RUTA
+    return RUTA
+
+
+# ---------------------------------------------------------------------------
+# API PARA LOS SCRIPTS
+# ---------------------------------------------------------------------------
+def registrar_tramo(nombre, inicio, **atributos):
+    """Escribe un tramo que empezó en `inicio` (time.perf_counter())."""
+    if ACTIVA:
+        ms = (time.perf_counter() - inicio) * 1000
+        _escribir({'tipo': 'tramo', 'nombre': nombre, 'ms': round(ms, 2), **atributos})
+
+
+@contextlib.contextmanager
+def tramo(nombre, **atributos):
+    """
+    Cronometra el bloque como un tramo. Devuelve un dict en el que el bloque
+    puede añadir atributos que solo conoce al final (filas, status...).
+    """
+    if not ACTIVA:
+        yield {}
+        return
+    inicio = time.perf_counter()
+    extra = {}
+    try:
+        yield extra
+    finally:
+        registrar_tramo(nombre, inicio, **atributos, **extra)
+
+
+def por_mapa(elementos, tabla, match_id):
+    """
+    Recorre los mapas de un parser (contenedores vm-stats-game de
+    BeautifulSoup o de Selenium, o dicts de mapas_del_partido) y registra un
+    tramo emision_mapa por cada vuelta.
+    """
+    if not ACTIVA:
+        yield from elementos
+        return
+    for elemento in elementos:
+        if isinstance(elemento, dict):
+            game_id = elemento.get('game_id')
+        elif isinstance(getattr(elemento, 'attrs', None), dict):  # Tag de BeautifulSoup
+            game_id = elemento.get('data-game-id')
+        else:  # WebElement de Selenium
+            game_id = elemento.get_attribute('data-game-id')
+        inicio = time.perf_counter()
+        try:
+            yield elemento
+        finally:
+            registrar_tramo('emision_mapa', inicio, tabla=tabla, match_id=match_id, game_id=game_id)
+
+
+def contar(nombre, cantidad=1):
+    if ACTIVA:
+        with _candado:
+            CONTADORES[nombre] += cantidad
+
+
+def medir_maximo(nombre, valor):
+    if ACTIVA and valor is not None:
+        with _candado:
+            MEDIDAS[nombre] = max(valor, MEDIDAS.get(nombre, valor))
+
+
+def medir_chrome(driver):
+    """Memoria de Chrome tras cargar una página: RSS (con psutil) y heap de JS."""
+    if not ACTIVA:
+        return
+    try:
+        heap = driver.execute_script(
+            "return performance.memory ? performance.memory.usedJSHeapSize : null")
+        medir_maximo('chrome_heap_js_mb', heap / 1e6 if heap else None)
+    except Exception:
+        pass
+    if psutil is None:
+        return
+    try:
+        procesos = psutil.Process(driver.service.process.pid).children(recursive=True)
+        medir_maximo('chrome_rss_mb', sum(p.memory_info().rss for p in procesos) / 1e6)
+    except Exception:
+        pass
+
+
+@atexit.register
+def _cerrar():
+    if not ACTIVA:
+        return
+    with _candado:
+        contadores = dict(CONTADORES)
+        medidas = {k: round(v, 1) for k, v in MEDIDAS.items()}
+    if contadores:
+        _escribir({'tipo': 'contadores', 'valores': contadores})
+    if medidas:
+        _escribir({'tipo': 'medidas', 'valores': medidas})
+    if _archivo is not None:
+        _archivo.close()
+
+
+# ---------------------------------------------------------------------------
+# RESUMEN
+# ---------------------------------------------------------------------------
+def resumir(ruta, top=5):
+    """
+    Agrega un archivo de traza:
+      {'tramos': {(script, nombre): {'n', 'total_ms', 'max_ms'}},
+       'contadores': {nombre: suma}, 'medidas': {nombre: máximo},
+       'partidos_lentos': [tramos 'partido' más largos]}
+    """
+    tramos = defaultdict(lambda: {'n': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+    contadores = defaultdict(float)
+    medidas = {}
+    partidos = []
+    with open(ruta, 'r', encoding='utf-8') as f:
+        for linea in f:
+            try:
+                registro = json.loads(linea)
+            except ValueError:
+                continue
+            if registro.get('tipo') == 'tramo':
+                agregado = tramos[(registro['script'], registro['nombre'])]
+                agregado['n'] += 1
+                agregado['total_ms'] += registro['ms']
+                agregado['max_ms'] = max(agregado['max_ms'], registro['ms'])
+                if registro['nombre'] == 'partido':
+                    partidos.append(registro)
+            elif registro.get('tipo') == 'contadores':
+                for nombre, valor in registro['valores'].items():
+                    contadores[nombre] += valor
+            elif registro.get('tipo') == 'medidas':
+                for nombre, valor in registro['valores'].items():
+                    medidas[nombre] = max(valor, medidas.get(nombre, valor))
+    partidos.sort(key=lambda r: r['ms'], reverse=True)
+    return {'tramos': dict(tramos), 'contadores': dict(contadores), 'medidas': medidas,
+            'partidos_lentos': partidos[:top]}
+
+
+def texto_resumen(ruta):
+    """Resumen de la traza listo para imprimir."""
+    resumen = resumir(ruta)
+    lineas = [f"📈 Traza: {ruta}",
+              f"   {'script':<30}{'etapa':<15}{'n':>6}{'total':>10}{'media':>10}{'máx':>10}"]
+    for (script, nombre), a in sorted(resumen['tramos'].items(), key=lambda x: -x[1]['total_ms']):
+        lineas.append(f"   {script:<30}{nombre:<15}{a['n']:>6}{a['total_ms'] / 1000:>9.1f}s"
+                      f"{a['total_ms'] / a['n']:>8.0f}ms{a['max_ms']:>8.0f}ms")
+    if resumen['contadores']:
+        lineas.append("   Contadores: " + ", ".join(
+            f"{n}={v / 1e6:.1f} MB" if n.startswith('bytes') else f"{n}={v:.0f}"
+            for n, v in sorted(resumen['contadores'].items())))
+    if resumen['medidas']:
+        lineas.append("   Máximos: " + ", ".join(f"{n}={v}" for n, v in sorted(resumen['medidas'].items())))
+    if resumen['partidos_lentos']:
+        lineas.append("   Partidos más lentos: " + ", ".join(
+            f"{r.get('match_id')} ({r['script']}, {r['ms'] / 1000:.1f}s)" for r in resumen['partidos_lentos']))
+    return "\n".join(lineas)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Uso: python scripts/traza.py <traza.jsonl>")
+        sys.exit(1)
+    print(texto_resumen(sys.argv[1]))
@@ -0,0 +1,70 @@
+"""
+Configuración común de las pruebas: los módulos de scripts/ se importan
+igual que entre scripts (import partido, import salidas...).
+
+Corpus de páginas en tests/fixtures/vlr/: un partido de VLR.gg (600001,
+Sentinels vs Cloud9, Bo3 2-0) con sus pestañas overview / performance /
+economy, con los nombres de la caché (<match_id>_<pestaña>.html). Bind trae
+las stats por lado en los span mod-t / mod-ct; Haven los trae vacíos, como
+los partidos de China.
+"""
+
+import os
+import sys
+
+import pytest
+
+SCRIPTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts')
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'vlr')
+
+sys.path.insert(0, os.path.abspath(SCRIPTS))
+
+URL_PARTIDO = "https://www.vlr.gg/600001/sentinels-vs-cloud9-vct-2026-americas-kickoff-upper-final"
+
+
+def html_fixture(pestana, match_id="600001"):
+    """HTML de una pestaña del partido del corpus."""
+    with open(os.path.join(FIXTURES, f"{match_id}_{pestana}.html"), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.fixture
+def htmls_partido():
+    """{pestaña: html} del partido del corpus, como lo da partido.descargar_pestanas()."""
+    return {pestana: html_fixture(pestana) for pestana in ('overview', 'performance', 'economy')}
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """cache_paginas con una carpeta vacía y los contadores a cero; devuelve el módulo."""
+    import cache_paginas
+    import grabacion
+    monkeypatch.setattr(cache_paginas, 'CACHE_DIR', str(tmp_path / "cache"))
+    monkeypatch.setattr(cache_paginas, 'OFFLINE', False)
+    monkeypatch.setattr(cache_paginas, 'DESACTIVADA', False)
+    monkeypatch.setattr(cache_paginas, 'ESTADISTICAS', dict.fromkeys(cache_paginas.ESTADISTICAS, 0))
+    monkeypatch.setattr(cache_paginas, 'SIN_CAMBIOS', set())
+    monkeypatch.setattr(grabacion, 'GRABAR_DIR', "")
+    return cache_paginas
+
+
+@pytest.fixture
+def limitador(tmp_path, monkeypatch):
+    """limitador con el estado compartido en una carpeta vacía, 10 pet/s y ráfaga 2."""
+    import limitador
+    monkeypatch.setattr(limitador, 'CARPETA', str(tmp_path / "limitador"))
+    monkeypatch.setattr(limitador, 'TASA_INICIAL', 10.0)
+    monkeypatch.setattr(limitador, 'TASA_MAXIMA', 20.0)
+    monkeypatch.setattr(limitador, 'RAFAGA', 2.0)
+    monkeypatch.setattr(limitador, 'ENFRIAMIENTO', 30.0)
+    return limitador
+
+
+@pytest.fixture
+def reintentos(monkeypatch):
+    """reintentos sin fallos previos, 3 reintentos y sin esperas de backoff."""
+    import reintentos
+    monkeypatch.setattr(reintentos, 'FALLIDOS', [])
+    monkeypatch.setattr(reintentos, 'REINTENTOS', 3)
+    monkeypatch.setattr(reintentos, 'BACKOFF_BASE', 0.0)
+    return reintentos
@@ -0,0 +1,78 @@
+"""
+Actualización incremental [U] (main.partidos_faltantes): qué partidos del
+.txt del evento faltan en las salidas de un script, contando los checkpoints
+vacíos de partidos completos sin filas.
+
+  python -m pytest -q tests
+"""
+
+import pandas as pd
+import pytest
+
+import checkpoints
+import main
+import salidas
+from conftest import html_fixture
+from partido import parsear_pagina
+from scrapear_economia import parsear_economia
+
+EVENTO = "prueba_incremental"
+ENLACES = [
+    "https://www.vlr.gg/600001/sen-vs-c9",   # con economía
+    "https://www.vlr.gg/600002/c9-vs-nrg",   # forfeit: sin pestaña de economía
+    "https://www.vlr.gg/600003/nrg-vs-g2",   # página perdida (caché offline sin ella)
+]
+SALIDAS = {'resumen': "vlr_economia_resumen", 'rondas': "vlr_economia_rondas"}
+
+
+@pytest.fixture
+def evento(tmp_path, monkeypatch, cache, reintentos):
+    """Carpeta del evento en un output_data temporal y su .txt de enlaces."""
+    monkeypatch.setattr(checkpoints, 'REUTILIZAR', True)
+    monkeypatch.setattr(main, 'OUTPUT_DIR', str(tmp_path))
+    monkeypatch.setattr(salidas, 'FORMATOS', ['xlsx'])
+    txt = tmp_path / f"enlaces_{EVENTO}.txt"
+    txt.write_text("\n".join(ENLACES) + "\n", encoding="utf-8")
+    return str(txt), str(tmp_path / EVENTO)
+
+
+def ejecutar_economia(carpeta, cache, monkeypatch):
+    """Lo que hace scrapear_economia.py: checkpoints por partido y tablas al final."""
+    cache.guardar_pagina(ENLACES[0] + "/?tab=economy", html_fixture('economy'))
+    cache.guardar_pagina(ENLACES[1] + "/?tab=economy", "<html><body>sin economía</body></html>")
+    monkeypatch.setattr(cache, 'OFFLINE', True)
+
+    def extraer(i, url):
+        html = cache.obtener_html(url + "/?tab=economy", lambda: None)
+        if html is None:
+            return {'resumen': [], 'rondas': []}
+        resumen, rondas = parsear_economia(parsear_pagina(html), checkpoints.match_id_de(url))
+        return {'resumen': resumen, 'rondas': rondas}
+
+    tablas = checkpoints.procesar_partidos(ENLACES, carpeta, 'economia', list(SALIDAS), extraer, SALIDAS)
+    for tabla, nombre in SALIDAS.items():
+        if tablas[tabla]:
+            salidas.guardar_tabla(pd.DataFrame(tablas[tabla]), carpeta, nombre)
+
+
+def test_checkpoint_vacio_cuenta_como_completo(evento, cache, monkeypatch):
+    txt, carpeta = evento
+    ejecutar_economia(carpeta, cache, monkeypatch)
+
+    assert checkpoints.match_ids_sin_filas(carpeta, "vlr_economia_rondas.xlsx") == {"600002"}
+    assert checkpoints.match_ids_en_tabla(carpeta, "vlr_economia_resumen.xlsx") == {"600001", "600002"}
+    # Solo falta el partido cuya página no se pudo obtener
+    assert main.partidos_faltantes(txt, "6") == ["600003"]
+
+
+def test_sin_ejecutar_faltan_todos(evento):
+    txt, _ = evento
+    assert main.partidos_faltantes(txt, "6") == ["600001", "600002", "600003"]
+
+
+def test_checkpoint_vacio_no_cuenta_para_otras_tablas(evento, cache, monkeypatch):
+    txt, carpeta = evento
+    ejecutar_economia(carpeta, cache, monkeypatch)
+
+    # El checkpoint vacío de economía no dice nada de vlr_mapas
+    assert main.partidos_faltantes(txt, "3") == ["600001", "600002", "600003"]
@@ -0,0 +1,138 @@
+"""
+Caché compartida de páginas (scripts/cache_paginas.py): claves, ida y vuelta
+a disco, TTL, modo offline y desalojo LRU.
+
+  python -m pytest -q tests
+"""
+
+import os
+import time
+
+import pytest
+
+from conftest import URL_PARTIDO, html_fixture
+
+BLOQUEADA = "<html><head><title>Access Denied</title></head><body></body></html>"
+
+
+@pytest.mark.parametrize("url, clave", [
+    ("https://www.vlr.gg/598923/sen-vs-c9", "598923_overview"),
+    ("https://www.vlr.gg/598923/otro-slug/", "598923_overview"),
+    ("https://www.vlr.gg/598923/sen-vs-c9/?game=all&tab=performance", "598923_performance"),
+    ("https://www.vlr.gg/598923/sen-vs-c9?tab=economy", "598923_economy"),
+])
+def test_clave_pagina_de_partido(cache, url, clave):
+    assert cache.clave_pagina(url) == clave
+
+
+def test_clave_pagina_otras_urls(cache):
+    clave = cache.clave_pagina("https://liquipedia.net/valorant/Sentinels")
+    assert clave.startswith("url_")
+    assert clave != cache.clave_pagina("https://liquipedia.net/valorant/Cloud9")
+
+
+def test_guardar_y_leer_pagina(cache):
+    html = html_fixture('overview')
+    cache.guardar_pagina(URL_PARTIDO, html)
+
+    assert cache.pagina_en_cache(URL_PARTIDO)
+    # Otro slug del mismo partido comparte la copia
+    assert cache.leer_pagina("https://www.vlr.gg/600001/x") == html
+    assert not [n for n in os.listdir(cache.CACHE_DIR) if n.endswith(".tmp")]
+
+
+def test_no_guarda_paginas_bloqueadas(cache):
+    cache.guardar_pagina(URL_PARTIDO, BLOQUEADA)
+    assert not cache.pagina_en_cache(URL_PARTIDO)
+
+
+def test_obtener_html_descarga_una_sola_vez(cache):
+    descargas = []
+
+    def descargar():
+        descargas.append(1)
+        return html_fixture('overview')
+
+    primera = cache.obtener_html(URL_PARTIDO, descargar)
+    segunda = cache.obtener_html(URL_PARTIDO, descargar)
+
+    assert primera == segunda
+    assert len(descargas) == 1
+    assert (cache.ESTADISTICAS['descargas'], cache.ESTADISTICAS['aciertos']) == (1, 1)
+
+
+def test_obtener_html_fallo_de_descarga(cache):
+    assert cache.obtener_html(URL_PARTIDO, lambda: None) is None
+    assert cache.ESTADISTICAS['fallos'] == 1
+    assert not cache.pagina_en_cache(URL_PARTIDO)
+
+
+def envejecer(ruta, segundos):
+    antes = time.time() - segundos
+    os.utime(ruta, (antes, antes))
+
+
+def test_pagina_vencida_se_vuelve_a_descargar(cache):
+    cache.guardar_pagina(URL_PARTIDO, "<html>vieja</html>")
+    envejecer(cache.ruta_pagina(URL_PARTIDO), cache.TTL_SEGUNDOS + 60)
+
+    assert not cache.pagina_en_cache(URL_PARTIDO)
+    assert cache.leer_pagina(URL_PARTIDO) is None
+    assert cache.leer_pagina(URL_PARTIDO, incluso_vencida=True) == "<html>vieja</html>"
+    assert cache.obtener_html(URL_PARTIDO, lambda: "<html>nueva</html>") == "<html>nueva</html>"
+    assert cache.pagina_en_cache(URL_PARTIDO)
+
+
+def test_offline_usa_lo_guardado_aunque_este_vencido(cache, monkeypatch):
+    cache.guardar_pagina(URL_PARTIDO, "<html>vieja</html>")
+    envejecer(cache.ruta_pagina(URL_PARTIDO), cache.TTL_SEGUNDOS + 60)
+    monkeypatch.setattr(cache, 'OFFLINE', True)
+
+    def descargar():
+        raise AssertionError("en modo offline no se descarga")
+
+    assert cache.obtener_html(URL_PARTIDO, descargar) == "<html>vieja</html>"
+    assert cache.obtener_html("https://www.vlr.gg/600002/x", descargar) is None
+    assert cache.ESTADISTICAS['fallos'] == 1
+
+
+def test_desactivada_no_lee_ni_escribe(cache, monkeypatch):
+    monkeypatch.setattr(cache, 'DESACTIVADA', True)
+    assert cache.obtener_html(URL_PARTIDO, lambda: "<html></html>") == "<html></html>"
+    assert not os.path.exists(cache.ruta_pagina(URL_PARTIDO))
+
+
+def test_desalojo_lru(cache):
+    urls = [f"https://www.vlr.gg/{match_id}/x" for match_id in (1, 2, 3)]
+    for url in urls:
+        cache.guardar_pagina(url, "x" * 1000)
+    ahora = time.time()
+    # Último acceso: 2 → 3 → 1 (el 1 es el más reciente)
+    for segundos, url in zip((10, 30, 20), urls):
+        os.utime(cache.ruta_pagina(url), (ahora - segundos, ahora))
+
+    cache.desalojar_si_excede(max_bytes=2000)
+
+    assert [cache.pagina_en_cache(url) for url in urls] == [True, False, True]
+
+
+def test_leer_pagina_cuenta_como_uso_reciente(cache):
+    urls = ["https://www.vlr.gg/1/x", "https://www.vlr.gg/2/x"]
+    for url in urls:
+        cache.guardar_pagina(url, "x" * 1000)
+        envejecer(cache.ruta_pagina(url), 60)
+    cache.leer_pagina(urls[0], incluso_vencida=True)
+
+    cache.desalojar_si_excede(max_bytes=1500)
+
+    assert os.path.exists(cache.ruta_pagina(urls[0]))
+    assert not os.path.exists(cache.ruta_pagina(urls[1]))
+
+
+def test_desalojo_borra_las_vencidas(cache):
+    cache.guardar_pagina(URL_PARTIDO, "<html></html>")
+    envejecer(cache.ruta_pagina(URL_PARTIDO), cache.TTL_SEGUNDOS + 60)
+
+    cache.desalojar_si_excede()
+
+    assert not os.path.exists(cache.ruta_pagina(URL_PARTIDO))
@@ -0,0 +1,156 @@
+"""
+Checkpoints por partido (scripts/checkpoints.py): reanudar sin volver a
+scrapear, partidos pendientes y siembra desde las tablas ya escritas.
+
+  python -m pytest -q tests
+"""
+
+import json
+import os
+
+import pandas as pd
+import pytest
+
+import salidas
+from partido import construir_modelo
+from scrapear_vlr_corregido import parsear_mapas_rondas
+
+ENLACES = ["https://www.vlr.gg/600001/sen-vs-c9", "https://www.vlr.gg/600002/c9-vs-nrg"]
+TABLAS = ['mapas', 'rondas']
+SALIDAS = {'mapas': "vlr_mapas", 'rondas': "vlr_rondas"}
+
+
+@pytest.fixture
+def checkpoints(cache, reintentos, monkeypatch):
+    import checkpoints
+    monkeypatch.setattr(checkpoints, 'REUTILIZAR', True)
+    return checkpoints
+
+
+@pytest.fixture
+def filas_partido(htmls_partido):
+    """{tabla: filas} del partido 600001 del corpus."""
+    modelo = construir_modelo(ENLACES[0], htmls_partido)
+    mapas, rondas = parsear_mapas_rondas(modelo['soup']['overview'], modelo['match_id'])
+    return {'mapas': mapas, 'rondas': rondas}
+
+
+def extractor(por_url):
+    """extraer(i, url) que devuelve por_url[url] y apunta las URLs pedidas."""
+    pedidas = []
+
+    def extraer(i, url):
+        pedidas.append(url)
+        return por_url.get(url)
+    return extraer, pedidas
+
+
+def test_match_id_de():
+    import checkpoints
+    assert checkpoints.match_id_de("https://www.vlr.gg/600001/sen-vs-c9/?tab=economy") == "600001"
+    assert checkpoints.match_id_de("https://www.vlr.gg/event/9000/x") is None
+    assert checkpoints.match_id_de_fila({'round_id': "600001_bind"}) == "600001"
+    assert checkpoints.match_id_de_fila({'match_id': 600001}) == "600001"
+
+
+def test_reanuda_desde_checkpoint(checkpoints, tmp_path, filas_partido):
+    otro = {'mapas': [{'match_id': "600002", 'round_id': "600002_lotus"}], 'rondas': []}
+    extraer, pedidas = extractor({ENLACES[0]: filas_partido, ENLACES[1]: otro})
+    primera = checkpoints.procesar_partidos(ENLACES, str(tmp_path), "vlr", TABLAS, extraer)
+
+    assert pedidas == ENLACES
+    assert sorted(os.listdir(checkpoints.carpeta_checkpoints(str(tmp_path), "vlr"))) == \
+        ["600001.json", "600002.json"]
+
+    extraer, pedidas = extractor({})
+    segunda = checkpoints.procesar_partidos(ENLACES, str(tmp_path), "vlr", TABLAS, extraer)
+
+    assert pedidas == []
+    assert segunda == primera
+    assert [f['round_id'] for f in segunda['mapas']] == ["600001_bind", "600001_haven", "600002_lotus"]
+
+
+def test_sin_reutilizar_se_scrapea_todo(checkpoints, tmp_path, filas_partido, monkeypatch):
+    extraer, _ = extractor({ENLACES[0]: filas_partido})
+    checkpoints.procesar_partidos(ENLACES[:1], str(tmp_path), "vlr", TABLAS, extraer)
+    monkeypatch.setattr(checkpoints, 'REUTILIZAR', False)
+
+    extraer, pedidas = extractor({ENLACES[0]: filas_partido})
+    checkpoints.procesar_partidos(ENLACES[:1], str(tmp_path), "vlr", TABLAS, extraer)
+
+    assert pedidas == ENLACES[:1]
+    assert checkpoints.partidos_pendientes(ENLACES, str(tmp_path), "vlr") == ENLACES
+
+
+def test_partido_sin_html_no_deja_checkpoint(checkpoints, tmp_path):
+    extraer, _ = extractor({})  # extraer → None
+    resultado = checkpoints.procesar_partidos(ENLACES[:1], str(tmp_path), "vlr", TABLAS, extraer)
+
+    assert resultado == {'mapas': [], 'rondas': []}
+    assert checkpoints.partidos_pendientes(ENLACES, str(tmp_path), "vlr") == ENLACES
+
+
+def test_partido_con_fallos_va_a_fallidos(checkpoints, reintentos, tmp_path, filas_partido):
+    def extraer(i, url):
+        reintentos.FALLIDOS.append({'url': url + "/?tab=economy", 'tipo': 'timeout'})
+        return filas_partido
+
+    resultado = checkpoints.procesar_partidos(ENLACES[:1], str(tmp_path), "vlr", TABLAS, extraer)
+
+    # Sus filas se usan, pero se volverá a pedir
+    assert len(resultado['rondas']) == 7
+    assert checkpoints.partidos_pendientes(ENLACES[:1], str(tmp_path), "vlr") == ENLACES[:1]
+    with open(reintentos.ruta_fallidos(str(tmp_path), "vlr"), 'r', encoding='utf-8') as f:
+        assert f.read().split() == ENLACES[:1]
+
+
+def test_checkpoint_a_medio_escribir(checkpoints, tmp_path):
+    carpeta = checkpoints.carpeta_checkpoints(str(tmp_path), "vlr")
+    os.makedirs(carpeta)
+    with open(os.path.join(carpeta, "600001.json"), 'w', encoding='utf-8') as f:
+        f.write('{"match_id": "600001", "tablas": {"mapas": [')
+
+    assert checkpoints.cargar_checkpoint(carpeta, "600001") is None
+
+
+def test_cargar_checkpoint_ids_como_texto(checkpoints, tmp_path):
+    carpeta = checkpoints.carpeta_checkpoints(str(tmp_path), "vlr")
+    checkpoints.guardar_checkpoint(carpeta, "600001", {'mapas': [{'match_id': 600001, 'score_a': "1/1"}]})
+
+    assert checkpoints.cargar_checkpoint(carpeta, "600001") == \
+        {'mapas': [{'match_id': "600001", 'score_a': "1/1"}]}
+
+
+def test_siembra_desde_salidas(checkpoints, tmp_path, filas_partido, monkeypatch):
+    # Carpeta de evento anterior a los checkpoints: solo están las tablas
+    monkeypatch.setattr(salidas, 'FORMATOS', ['xlsx'])
+    for tabla, nombre in SALIDAS.items():
+        salidas.guardar_tabla(pd.DataFrame(filas_partido[tabla]), str(tmp_path), nombre)
+
+    pendientes = checkpoints.partidos_pendientes(ENLACES, str(tmp_path), "vlr", SALIDAS)
+
+    assert pendientes == ENLACES[1:]
+    carpeta = checkpoints.carpeta_checkpoints(str(tmp_path), "vlr")
+    sembrado = checkpoints.cargar_checkpoint(carpeta, "600001")
+    # vlr_rondas no tiene match_id: se agrupa por el round_id
+    assert len(sembrado['rondas']) == 7
+    assert sembrado['mapas'][0]['round_id'] == "600001_bind"
+    assert sembrado['mapas'][0]['match_id'] == "600001"
+
+    # El siguiente procesar_partidos solo scrapea el partido nuevo y fusiona
+    extraer, pedidas = extractor({ENLACES[1]: {'mapas': [{'match_id': "600002"}], 'rondas': []}})
+    resultado = checkpoints.procesar_partidos(ENLACES, str(tmp_path), "vlr", TABLAS, extraer, SALIDAS)
+    assert pedidas == ENLACES[1:]
+    assert [f['match_id'] for f in resultado['mapas']] == ["600001", "600001", "600002"]
+
+
+def test_checkpoint_guarda_las_salidas(checkpoints, tmp_path, filas_partido):
+    extraer, _ = extractor({ENLACES[0]: filas_partido})
+    checkpoints.procesar_partidos(ENLACES[:1], str(tmp_path), "vlr", TABLAS, extraer, SALIDAS)
+
+    ruta = os.path.join(checkpoints.carpeta_checkpoints(str(tmp_path), "vlr"), "600001.json")
+    with open(ruta, 'r', encoding='utf-8') as f:
+        datos = json.load(f)
+    assert datos['match_id'] == "600001"
+    assert datos['salidas'] == SALIDAS
+    assert not [n for n in os.listdir(os.path.dirname(ruta)) if n.endswith(".tmp")]
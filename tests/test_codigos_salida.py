@@ -0,0 +1,67 @@
+"""
+Códigos de salida de los scrapers: main.py --eventos los usa para decidir
+si una ejecución por lotes terminó bien (ver ejecutar_lote en main.py).
+
+  python -m pytest -q tests
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+SCRIPTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts')
+OUTPUT_DIR = os.path.join(SCRIPTS, '..', 'output_data')
+EVENTO = "prueba_codigos_salida"
+
+# Scripts con Chrome: si el driver no arranca deben terminar con código ≠ 0
+SCRIPTS_SELENIUM = [
+    "scrapear_partido_completo.py",
+    "scrapear_vlr_corregido.py",
+    "scrapear_stats_pro.py",
+    "scrapear_stats_pro_china.py",
+    "scrapear_enfrentamientos.py",
+    "scrapear_economia.py",
+]
+
+
+@pytest.fixture(autouse=True)
+def limpiar_carpeta_evento():
+    # Los scripts escriben en output_data/<evento>/ según el nombre del .txt
+    yield
+    shutil.rmtree(os.path.join(OUTPUT_DIR, EVENTO), ignore_errors=True)
+
+
+def ejecutar(script, tmp_path, **variables):
+    txt = tmp_path / f"enlaces_{EVENTO}.txt"
+    txt.write_text("https://www.vlr.gg/1/prueba\n", encoding="utf-8")
+    entorno = dict(
+        os.environ,
+        ALETHEIA_TXT_FILE=str(txt),
+        ALETHEIA_NO_INTERACTIVO="1",
+        ALETHEIA_CACHE_DIR=str(tmp_path / "cache"),
+        **variables,
+    )
+    for variable in ("ALETHEIA_POOL_DIR", "ALETHEIA_TRAZA", "ALETHEIA_PERFIL", "ALETHEIA_GRABAR"):
+        entorno.pop(variable, None)
+    return subprocess.run([sys.executable, script], cwd=SCRIPTS, env=entorno,
+                          capture_output=True, text=True, timeout=120)
+
+
+@pytest.mark.parametrize("script", SCRIPTS_SELENIUM)
+def test_fallo_del_driver_sale_con_error(script, tmp_path):
+    # Existe pero no es un chromedriver: Chrome no puede arrancar
+    resultado = ejecutar(script, tmp_path, ALETHEIA_MOTOR="selenium", ALETHEIA_CHROMEDRIVER="/bin/false")
+
+    assert "Error inicializando driver" in resultado.stdout
+    assert resultado.returncode == 1
+
+
+def test_partidos_sin_datos_sale_con_error(tmp_path):
+    # Caché vacía y sin red: ningún partido se puede obtener
+    resultado = ejecutar("scrapear_partidos.py", tmp_path, ALETHEIA_CACHE_OFFLINE="1")
+
+    assert "No se pudo obtener información de ningún partido" in resultado.stdout
+    assert resultado.returncode == 1
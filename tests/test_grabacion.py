@@ -0,0 +1,142 @@
+"""
+Grabación y reproducción (scripts/grabacion.py): copia de las páginas a un
+archivo, servidor local con ETag / 304 y una ejecución completa de un
+script contra el corpus de tests/fixtures/vlr/ servido en local.
+
+  python -m pytest -q tests
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+import descargas
+import grabacion
+import salidas
+from conftest import FIXTURES, SCRIPTS, URL_PARTIDO, html_fixture
+from partido import descargar_pestanas
+
+EVENTO = "prueba_grabacion"
+OUTPUT_DIR = os.path.join(SCRIPTS, '..', 'output_data')
+
+
+@pytest.fixture
+def archivo(tmp_path):
+    """Archivo grabado con las páginas del corpus (mismo nombre que en la caché)."""
+    carpeta = tmp_path / "grabacion"
+    shutil.copytree(FIXTURES, carpeta / "paginas")
+    return str(carpeta)
+
+
+@pytest.fixture
+def servidor(archivo):
+    servidor = grabacion.crear_servidor(archivo, 0)
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    yield f"http://127.0.0.1:{servidor.server_port}"
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def test_url_destino_y_original():
+    servidor = "http://127.0.0.1:8800"
+    destino = grabacion.url_destino("https://www.vlr.gg/600001/x/?tab=economy", servidor)
+
+    assert destino == "http://127.0.0.1:8800/www.vlr.gg/600001/x/?tab=economy"
+    assert grabacion.url_original("/www.vlr.gg/600001/x/?tab=economy") == \
+        "https://www.vlr.gg/600001/x/?tab=economy"
+    assert grabacion.url_destino(URL_PARTIDO, "") == URL_PARTIDO
+
+
+def test_graba_cada_pagina_una_vez(cache, tmp_path, monkeypatch):
+    monkeypatch.setattr(grabacion, 'GRABAR_DIR', str(tmp_path / "grabacion"))
+    html = html_fixture('overview')
+    # Descarga y luego acierto de caché: la URL se apunta una sola vez
+    for _ in range(2):
+        cache.obtener_html(URL_PARTIDO, lambda: html)
+    cache.obtener_html("https://www.vlr.gg/600002/x", lambda: "<html><title>Access Denied</title></html>")
+
+    with open(grabacion.ruta_grabada(grabacion.GRABAR_DIR, URL_PARTIDO), 'r', encoding='utf-8') as f:
+        assert f.read() == html
+    with open(os.path.join(grabacion.GRABAR_DIR, "urls.txt"), 'r', encoding='utf-8') as f:
+        assert f.read() == URL_PARTIDO + "\n"
+    assert os.listdir(os.path.join(grabacion.GRABAR_DIR, "paginas")) == ["600001_overview.html"]
+
+
+def test_grabacion_concurrente(tmp_path, monkeypatch):
+    monkeypatch.setattr(grabacion, 'GRABAR_DIR', str(tmp_path / "grabacion"))
+    urls = [f"https://www.vlr.gg/{n}/x" for n in range(20)] * 4
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda url: grabacion.grabar_pagina(url, f"<html>{url}</html>"), urls))
+
+    with open(os.path.join(grabacion.GRABAR_DIR, "urls.txt"), 'r', encoding='utf-8') as f:
+        assert sorted(f.read().splitlines()) == sorted(set(urls))
+    assert not [n for n in os.listdir(os.path.join(grabacion.GRABAR_DIR, "paginas")) if n.endswith(".tmp")]
+
+
+def test_servidor_responde_por_clave_de_cache(servidor):
+    # Da igual el slug: se busca por match_id + pestaña
+    respuesta = requests.get(f"{servidor}/www.vlr.gg/600001/otro-slug/?tab=performance", timeout=10)
+
+    assert respuesta.status_code == 200
+    assert respuesta.text == html_fixture('performance')
+    assert requests.get(f"{servidor}/www.vlr.gg/600002/x", timeout=10).status_code == 404
+
+
+def test_servidor_etag_y_304(servidor):
+    url = f"{servidor}/www.vlr.gg/600001/x"
+    etag = requests.get(url, timeout=10).headers['ETag']
+
+    respuesta = requests.get(url, headers={'If-None-Match': etag}, timeout=10)
+    assert respuesta.status_code == 304
+    assert respuesta.content == b""
+    assert requests.get(url, headers={'If-None-Match': '"otro"'}, timeout=10).status_code == 200
+
+
+def test_descargar_pestanas_desde_el_servidor(servidor, cache, limitador, reintentos, monkeypatch):
+    monkeypatch.setattr(grabacion, 'REPRODUCIR', servidor)
+    monkeypatch.setattr(descargas, '_sesion', None)
+
+    htmls = descargar_pestanas(URL_PARTIDO)
+
+    assert htmls == {p: html_fixture(p) for p in ('overview', 'performance', 'economy')}
+    # La caché usa la URL original, no la del servidor
+    assert cache.pagina_en_cache(URL_PARTIDO + "/?tab=economy")
+
+
+@pytest.fixture
+def limpiar_carpeta_evento():
+    yield
+    shutil.rmtree(os.path.join(OUTPUT_DIR, EVENTO), ignore_errors=True)
+
+
+def test_extractor_unificado_contra_el_archivo(archivo, tmp_path, limpiar_carpeta_evento):
+    txt = tmp_path / f"enlaces_{EVENTO}.txt"
+    txt.write_text(URL_PARTIDO + "\n", encoding="utf-8")
+
+    with grabacion.reproduciendo(archivo) as entorno:
+        entorno.update(ALETHEIA_TXT_FILE=str(txt), ALETHEIA_MOTOR="estatico",
+                       ALETHEIA_NO_INTERACTIVO="1", ALETHEIA_PAUSA_HTTP="0", ALETHEIA_FORMATOS="xlsx")
+        for variable in ("ALETHEIA_POOL_DIR", "ALETHEIA_TRAZA", "ALETHEIA_PERFIL", "ALETHEIA_CACHE_OFFLINE"):
+            entorno.pop(variable, None)
+        resultado = subprocess.run([sys.executable, "scrapear_partido_completo.py"], cwd=SCRIPTS,
+                                   env=entorno, capture_output=True, text=True, timeout=120)
+
+    assert resultado.returncode == 0, resultado.stdout[-2000:]
+    carpeta = os.path.join(OUTPUT_DIR, EVENTO)
+    filas = {nombre: len(salidas.leer_tabla(carpeta, nombre))
+             for nombre in ("vct_partidos", "vlr_mapas", "vlr_rondas", "vlr_stats_players_sides",
+                            "vlr_enfrentamientos", "vlr_multikills_clutches",
+                            "vlr_economia_resumen", "vlr_economia_rondas")}
+    assert filas == {
+        "vct_partidos": 1, "vlr_mapas": 2, "vlr_rondas": 7, "vlr_stats_players_sides": 12,
+        "vlr_enfrentamientos": 6, "vlr_multikills_clutches": 2,
+        "vlr_economia_resumen": 3, "vlr_economia_rondas": 4,
+    }
@@ -0,0 +1,105 @@
+"""
+Limitador por host compartido entre procesos (scripts/limitador.py): token
+bucket, ajuste AIMD de la tasa y estado en disco visible desde otro proceso.
+
+  python -m pytest -q tests
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+from conftest import SCRIPTS
+
+
+def estado(limitador, host):
+    with open(os.path.join(limitador.CARPETA, f"{host}.json"), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_host_de(limitador):
+    assert limitador.host_de("https://www.vlr.gg/598923/x") == "vlr.gg"
+    assert limitador.host_de("https://liquipedia.net/valorant/VCT") == "liquipedia.net"
+
+
+def test_limites(limitador, monkeypatch):
+    assert limitador.limites("vlr.gg") == {'tasa': 10.0, 'tasa_max': 20.0, 'rafaga': 2.0}
+    # Liquipedia: 1 petición / 2 s aunque el limitador general esté desactivado
+    monkeypatch.setattr(limitador, 'TASA_INICIAL', None)
+    assert limitador.limites("vlr.gg") is None
+    assert limitador.limites("liquipedia.net") == {'tasa': 0.5, 'tasa_max': 0.5, 'rafaga': 1}
+
+
+def test_rafaga_y_luego_ritmo(limitador):
+    assert limitador.esperar_turno("vlr.gg") == 0.0
+    assert limitador.esperar_turno("vlr.gg") == 0.0
+    inicio = time.perf_counter()
+    esperado = limitador.esperar_turno("vlr.gg")
+    # Sin fichas: hay que esperar a que se reponga una (1 / 10 pet/s)
+    assert 0.05 < esperado <= 0.11
+    assert time.perf_counter() - inicio >= 0.05
+
+
+def test_bloqueo_reduce_tasa_y_pausa(limitador):
+    limitador.informar("vlr.gg", True)
+
+    datos = estado(limitador, "vlr.gg")
+    assert datos['tasa'] == 5.0
+    assert datos['fichas'] == 0.0
+    assert datos['pausa_hasta'] >= time.time() + 29
+
+    limitador.informar("vlr.gg", True, retry_after=120)
+    datos = estado(limitador, "vlr.gg")
+    assert datos['tasa'] == 2.5
+    assert datos['pausa_hasta'] >= time.time() + 119
+
+
+def test_tasa_minima_tras_bloqueos_repetidos(limitador):
+    for _ in range(10):
+        limitador.informar("vlr.gg", True)
+    assert estado(limitador, "vlr.gg")['tasa'] == 10.0 * limitador.FRACCION_MINIMA
+
+
+def test_respuestas_correctas_suben_hasta_el_techo(limitador):
+    limitador.informar("vlr.gg", True)
+    limitador.informar("vlr.gg", False)
+    assert estado(limitador, "vlr.gg")['tasa'] == 5.0 + 10.0 * limitador.FRACCION_SUBIDA
+
+    for _ in range(200):
+        limitador.informar("vlr.gg", False)
+    assert estado(limitador, "vlr.gg")['tasa'] == 20.0
+
+
+def test_informar_respuesta(limitador):
+    assert limitador.informar_respuesta("vlr.gg", 429, retry_after="60") is True
+    assert estado(limitador, "vlr.gg")['pausa_hasta'] >= time.time() + 59
+
+    html_bloqueo = "<html><head><title>Access Denied</title></head></html>"
+    assert limitador.informar_respuesta("liquipedia.net", 200, html_bloqueo) is True
+
+    # Un 5xx no es bloqueo ni éxito: la tasa no cambia
+    tasa = estado(limitador, "vlr.gg")['tasa']
+    assert limitador.informar_respuesta("vlr.gg", 503) is False
+    assert estado(limitador, "vlr.gg")['tasa'] == tasa
+
+
+def test_segundos_retry_after(limitador):
+    assert limitador.segundos_retry_after("120") == 120.0
+    assert limitador.segundos_retry_after(None) is None
+    assert limitador.segundos_retry_after("Wed, 21 Oct 2026 07:28:00 GMT") is None
+
+
+def test_bloqueo_compartido_entre_procesos(limitador):
+    # Otro proceso recibe el bloqueo; este proceso tiene que respetar la pausa
+    codigo = "import limitador; limitador.informar('vlr.gg', True)"
+    entorno = dict(os.environ, ALETHEIA_LIMITADOR_DIR=limitador.CARPETA, ALETHEIA_PAUSA_HTTP="0.1",
+                   ALETHEIA_ENFRIAMIENTO_BLOQUEO="1")
+    subprocess.run([sys.executable, "-c", codigo], cwd=SCRIPTS, env=entorno, check=True,
+                   capture_output=True, timeout=60)
+
+    inicio = time.perf_counter()
+    esperado = limitador.esperar_turno("vlr.gg")
+    assert esperado > 0.5
+    assert time.perf_counter() - inicio > 0.5
@@ -0,0 +1,219 @@
+"""
+Filas que sacan los parsers de partido del corpus de tests/fixtures/vlr/
+(ver conftest.py). Los valores esperados están contados a mano sobre el HTML.
+
+  python -m pytest -q tests
+"""
+
+import pytest
+from bs4 import BeautifulSoup
+
+import partido
+from conftest import URL_PARTIDO, html_fixture
+from descargas import PARSER
+from partido import construir_modelo, mapas_del_partido, parsear_pagina
+from scrapear_economia import parsear_economia
+from scrapear_enfrentamientos import parsear_performance, texto_sin_popup
+from scrapear_partido_completo import EMISORES, SALIDAS
+from scrapear_partidos import parsear_cabecera, parsear_partido
+from scrapear_stats_pro import parsear_stats_lados
+from scrapear_vlr_corregido import parsear_mapas_rondas
+
+MATCH_ID = "600001"
+
+
+@pytest.fixture
+def overview():
+    return parsear_pagina(html_fixture('overview'))
+
+
+def test_mapas_del_partido_en_todas_las_pestanas():
+    esperados = [
+        {'game_id': '111', 'map_name': 'bind', 'map_id': '600001_bind'},
+        {'game_id': '112', 'map_name': 'haven', 'map_id': '600001_haven'},
+    ]
+    # overview usa la cabecera div.map; performance / economy, los botones del selector
+    for pestana in ('overview', 'performance', 'economy'):
+        assert mapas_del_partido(parsear_pagina(html_fixture(pestana)), MATCH_ID) == esperados
+
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("AbyssPICK-", "abyss"),
+    ("Bind PICK 45:12", "bind"),
+    ("Haven-", "haven"),
+    ("2Split", "split"),
+])
+def test_limpiar_map_name(texto, esperado):
+    assert partido.limpiar_map_name(texto) == esperado
+
+
+def test_parsear_cabecera(overview):
+    assert parsear_cabecera(overview, MATCH_ID) == {
+        'match_id': MATCH_ID,
+        'torneo': 'VCT 2026: Americas Kickoff',
+        'fase': 'Playoffs: Upper Final',
+        'fecha': 'Sunday, February 1st',
+        'patch': 'Patch 10.01',
+        'equipo_a': 'Sentinels',
+        'equipo_b': 'Cloud9',
+        'score': '2-0',
+        'pick_a': 'Bind',
+        'pick_b': 'Haven',
+        'ban_a': 'Lotus, Icebox',
+        'ban_b': 'Split, Pearl',
+        'decider': 'Ascent',
+    }
+
+
+def test_parsear_partido_pagina_bloqueada():
+    html = "<html><head><title>Access Denied</title></head><body></body></html>"
+    assert parsear_partido(html, URL_PARTIDO) is None
+
+
+def test_parsear_mapas_rondas(overview):
+    mapas, rondas = parsear_mapas_rondas(overview, MATCH_ID)
+
+    assert mapas == [
+        # Sentinels pickeó Bind → pick_b es el lado que eligió Cloud9
+        {'match_id': MATCH_ID, 'pick_a': 'Bind', 'pick_b': 'defense', 'side_top_start': 'attack',
+         'score_a': '1/1', 'score_b': '1/1', 'time': '45:12', 'round_id': '600001_bind'},
+        # Cloud9 pickeó Haven → pick_a es el lado que eligió Sentinels
+        {'match_id': MATCH_ID, 'pick_a': 'Defense', 'pick_b': 'Haven', 'side_top_start': 'attack',
+         'score_a': '1/1', 'score_b': '0/1', 'time': '38:05', 'round_id': '600001_haven'},
+    ]
+    assert [(r['round_id'], r['num'], r['win'], r['result'], r['band']) for r in rondas] == [
+        ('600001_bind', 1, 'Sentinels', 'elim', 'attack'),
+        ('600001_bind', 2, 'Cloud9', 'defuse', 'defense'),
+        ('600001_bind', 13, 'Cloud9', 'detonation', 'attack'),
+        ('600001_bind', 14, 'Sentinels', 'time', 'defense'),
+        ('600001_haven', 1, 'Sentinels', 'elim', 'defense'),
+        ('600001_haven', 2, 'Cloud9', 'elim', 'attack'),
+        ('600001_haven', 13, 'Cloud9', 'defuse', 'defense'),
+    ]
+
+
+def test_parsear_stats_lados_desde_spans(overview):
+    filas = [f for f in parsear_stats_lados(overview, MATCH_ID) if f['map_id'] == '600001_bind']
+
+    # Attack de todos los jugadores y luego Defense
+    assert [(f['side'], f['player_name']) for f in filas] == [
+        ('Attack', 'zekken'), ('Attack', 'TenZ'), ('Attack', 'OXY'), ('Attack', 'v1c'),
+        ('Defense', 'zekken'), ('Defense', 'TenZ'), ('Defense', 'OXY'), ('Defense', 'v1c'),
+    ]
+    assert filas[0] == {
+        'match_id': MATCH_ID, 'map_id': '600001_bind', 'player_name': 'zekken',
+        'team_name': 'SEN', 'agent': 'Raze', 'side': 'Attack',
+        'rating': '1.40', 'acs': '280', 'kills': '11', 'deaths': '7', 'assists': '2',
+        'kast': '80', 'adr': '170', 'hs_percent': '30', 'fk': '2', 'fd': '1',
+    }
+    assert filas[4]['kills'] == '9' and filas[4]['kast'] == '70'
+
+
+def test_parsear_stats_lados_split_sin_spans(overview):
+    filas = [f for f in parsear_stats_lados(overview, MATCH_ID) if f['map_id'] == '600001_haven']
+
+    # Haven: Cloud9 (arriba) jugó 2 rondas en ataque y 1 en defensa; Sentinels, al revés
+    por_jugador = {(f['player_name'], f['side']): f for f in filas}
+    assert len(filas) == 4
+    assert (por_jugador['OXY', 'Attack']['kills'], por_jugador['OXY', 'Defense']['kills']) == (6, 3)
+    assert (por_jugador['zekken', 'Attack']['kills'], por_jugador['zekken', 'Defense']['kills']) == (2, 4)
+    # Las medias no se pueden repartir: mismo valor en los dos lados
+    assert por_jugador['OXY', 'Attack']['acs'] == por_jugador['OXY', 'Defense']['acs'] == 230.0
+
+
+def test_parsear_stats_lados_con_mapas_del_partido(overview):
+    mapas, _ = parsear_mapas_rondas(overview, MATCH_ID)
+    assert parsear_stats_lados(overview, MATCH_ID, mapas) == parsear_stats_lados(overview, MATCH_ID)
+
+
+def test_parsear_performance():
+    enfrentamientos, multikills = parsear_performance(parsear_pagina(html_fixture('performance')), MATCH_ID)
+
+    # Los cruces 0/0 no se guardan; Haven no tiene tabla op
+    assert [(e['map_id'], e['tipo_kill'], e['player_a'], e['player_b'], e['kills'])
+            for e in enfrentamientos] == [
+        ('600001_bind', 'all', 'zekken', 'OXY', '4/2'),
+        ('600001_bind', 'all', 'zekken', 'v1c', '3/3'),
+        ('600001_bind', 'all', 'TenZ', 'v1c', '5/1'),
+        ('600001_bind', 'first', 'zekken', 'OXY', '1/0'),
+        ('600001_bind', 'first', 'TenZ', 'OXY', '0/1'),
+        ('600001_haven', 'all', 'OXY', 'zekken', '2/1'),
+    ]
+    assert multikills == [
+        {'match_id': MATCH_ID, 'map_id': '600001_bind', 'player_name': 'zekken', 'agent': 'Raze',
+         'k2': '3', 'k3': '1', 'k4': '0', 'k5': '0', 'v1': '2', 'v2': '0', 'v3': '0', 'v4': '0',
+         'v5': '0', 'econ': '68', 'pl': '1', 'de': '0'},
+        {'match_id': MATCH_ID, 'map_id': '600001_bind', 'player_name': 'OXY', 'agent': 'Neon',
+         'k2': '2', 'k3': '0', 'k4': '0', 'k5': '0', 'v1': '0', 'v2': '0', 'v3': '0', 'v4': '0',
+         'v5': '0', 'econ': '55', 'pl': '0', 'de': '2'},
+    ]
+
+
+def test_texto_sin_popup_a_cualquier_profundidad():
+    html = ('<div class="stats-sq">3<!-- nota --><span> </span>'
+            '<div class="wf-popable"><div class="wf-popable-contents"><div>Round 3</div></div></div></div>')
+    div = BeautifulSoup(html, PARSER).find('div', class_='stats-sq')
+
+    assert texto_sin_popup(div) == "3"
+    # El árbol no se modifica
+    assert "Round 3" in div.get_text()
+
+
+def test_parsear_economia():
+    resumen, rondas = parsear_economia(parsear_pagina(html_fixture('economy')), MATCH_ID)
+
+    # La pistol que VLR cuenta dentro del eco se descuenta
+    assert resumen == [
+        {'match_id': MATCH_ID, 'map_id': '600001_bind', 'team': 'Sentinels', 'pistol_won': 1,
+         'eco': '1(0)', 'semi_eco': '0(0)', 'semi_buy': '1(0)', 'full_buy': '1(1)'},
+        {'match_id': MATCH_ID, 'map_id': '600001_bind', 'team': 'Cloud9', 'pistol_won': 1,
+         'eco': '1(0)', 'semi_eco': '1(1)', 'semi_buy': '0(0)', 'full_buy': '1(0)'},
+        {'match_id': MATCH_ID, 'map_id': '600001_haven', 'team': 'Cloud9', 'pistol_won': 0,
+         'eco': '0(0)', 'semi_eco': '0(0)', 'semi_buy': '0(0)', 'full_buy': '2(1)'},
+    ]
+    # Haven no tiene tabla de rondas
+    assert [r['round'] for r in rondas] == [1, 2, 13, 14]
+    assert [r['is_pistol'] for r in rondas] == [1, 0, 1, 0]
+    assert rondas[3] == {
+        'match_id': MATCH_ID, 'map_id': '600001_bind', 'round': 14, 'is_pistol': 0,
+        'team_top': 'Sentinels', 'bank_top': 8700, 'spend_top': 20500, 'category_top': 'full_buy',
+        'team_bot': 'Cloud9', 'bank_bot': 12, 'spend_bot': 18000, 'category_bot': 'full_buy',
+        'winner': 'Sentinels',
+    }
+    assert (rondas[1]['category_top'], rondas[1]['category_bot'], rondas[1]['winner']) == \
+        ('semi_buy', 'semi_eco', 'Cloud9')
+
+
+def emitir(htmls):
+    modelo = construir_modelo(URL_PARTIDO, htmls)
+    tablas = {tabla: [] for tabla in SALIDAS}
+    for emisor in EMISORES:
+        tablas.update(emisor(modelo))
+    return tablas
+
+
+def test_extractor_unificado_usa_un_solo_map_id(htmls_partido):
+    tablas = emitir(htmls_partido)
+
+    assert {tabla: len(filas) for tabla, filas in tablas.items()} == {
+        'partidos': 1, 'mapas': 2, 'rondas': 7, 'stats': 12,
+        'enfrentamientos': 6, 'multikills': 2, 'eco_resumen': 3, 'eco_rondas': 4,
+    }
+    map_ids = {'600001_bind', '600001_haven'}
+    assert {f['round_id'] for f in tablas['mapas']} == map_ids
+    for tabla in ('stats', 'enfrentamientos', 'eco_resumen'):
+        assert {f['map_id'] for f in tablas[tabla]} == map_ids
+
+
+def test_extractor_unificado_sin_una_pestana(htmls_partido):
+    tablas = emitir({**htmls_partido, 'economy': None})
+
+    assert tablas['eco_resumen'] == [] and tablas['eco_rondas'] == []
+    assert len(tablas['enfrentamientos']) == 6
+
+
+def test_parseo_acotado_igual_que_completo(htmls_partido, monkeypatch):
+    # Solo se construye el árbol de los nodos que leen los parsers: mismas filas
+    acotado = emitir(htmls_partido)
+    monkeypatch.setattr(partido, 'PARSEO_COMPLETO', True)
+    assert emitir(htmls_partido) == acotado
@@ -0,0 +1,133 @@
+"""
+Peticiones condicionales (ETag / Last-Modified): validadores guardados junto
+a la caché, cabeceras If-None-Match / If-Modified-Since y respuestas 304
+(scripts/cache_paginas.py y scripts/descargas.py).
+
+  python -m pytest -q tests
+"""
+
+import os
+from types import SimpleNamespace
+
+import pytest
+
+import descargas
+import grabacion
+from conftest import html_fixture
+
+URL = "https://liquipedia.net/valorant/Sentinels"
+
+
+class SesionFalsa:
+    """Sesión HTTP que responde lo que se le encola y apunta las cabeceras enviadas."""
+
+    def __init__(self):
+        self.respuestas = []
+        self.cabeceras = []
+
+    def responder(self, status_code, html="", **cabeceras):
+        self.respuestas.append(SimpleNamespace(status_code=status_code, text=html,
+                                               content=html.encode('utf-8'), headers=cabeceras))
+
+    def get(self, url, timeout=None, headers=None):
+        self.cabeceras.append(dict(headers or {}))
+        return self.respuestas.pop(0)
+
+
+@pytest.fixture
+def sesion(cache, limitador, reintentos, monkeypatch):
+    sesion = SesionFalsa()
+    # Sin el límite fijo de Liquipedia (1 petición / 2 s)
+    monkeypatch.setattr(limitador, 'LIMITES_HOST', {})
+    monkeypatch.setattr(descargas, 'obtener_sesion', lambda: sesion)
+    monkeypatch.setattr(grabacion, 'REPRODUCIR', "")
+    return sesion
+
+
+def test_validadores_ida_y_vuelta(cache):
+    cache.guardar_pagina(URL, "<html></html>")
+    cache.guardar_validadores(URL, etag='"abc"', last_modified="Sun, 01 Feb 2026 17:00:00 GMT")
+
+    assert cache.leer_validadores(URL) == {'etag': '"abc"', 'last_modified': "Sun, 01 Feb 2026 17:00:00 GMT"}
+
+    # Una respuesta 200 sin validadores borra los anteriores
+    cache.guardar_validadores(URL)
+    assert cache.leer_validadores(URL) == {}
+    assert not os.path.exists(cache.ruta_validadores(URL))
+
+
+def test_sin_copia_guardada_no_hay_validadores(cache):
+    cache.guardar_validadores(URL, etag='"abc"')
+    assert cache.leer_validadores(URL) == {}
+
+
+def test_marcar_sin_cambios_renueva_el_ttl(cache):
+    cache.guardar_pagina(URL, "<html>roster</html>")
+    vieja = os.path.getmtime(cache.ruta_pagina(URL)) - cache.TTL_SEGUNDOS - 60
+    os.utime(cache.ruta_pagina(URL), (vieja, vieja))
+
+    assert cache.marcar_sin_cambios(URL) == "<html>roster</html>"
+    assert cache.pagina_en_cache(URL)
+    assert cache.pagina_sin_cambios(URL)
+    assert cache.ESTADISTICAS['revalidadas'] == 1
+
+
+def test_desalojo_conserva_vencidas_con_validadores(cache):
+    cache.guardar_pagina(URL, "<html></html>")
+    cache.guardar_validadores(URL, etag='"abc"')
+    vieja = os.path.getmtime(cache.ruta_pagina(URL)) - cache.TTL_SEGUNDOS - 60
+    os.utime(cache.ruta_pagina(URL), (vieja, vieja))
+
+    cache.desalojar_si_excede()
+
+    # Vencida pero revalidable: se pedirá con If-None-Match en lugar de entera
+    assert os.path.exists(cache.ruta_pagina(URL))
+
+
+def test_200_guarda_validadores_y_304_reutiliza_la_copia(cache, sesion):
+    html = html_fixture('overview')
+    sesion.responder(200, html, ETag='"v1"', **{'Last-Modified': "Sun, 01 Feb 2026 17:00:00 GMT"})
+    sesion.responder(304)
+
+    primera = cache.obtener_html(URL, lambda: descargas.descargar_html(URL), revalidar=True)
+    segunda = cache.obtener_html(URL, lambda: descargas.descargar_html(URL), revalidar=True)
+
+    assert primera == segunda == html
+    assert sesion.cabeceras == [
+        {},
+        {'If-None-Match': '"v1"', 'If-Modified-Since': "Sun, 01 Feb 2026 17:00:00 GMT"},
+    ]
+    assert cache.pagina_sin_cambios(URL)
+    assert (cache.ESTADISTICAS['descargas'], cache.ESTADISTICAS['revalidadas']) == (1, 1)
+
+
+def test_200_con_cambios_no_queda_sin_cambios(cache, sesion):
+    sesion.responder(200, "<html>v1</html>", ETag='"v1"')
+    sesion.responder(304)
+    sesion.responder(200, "<html>v2</html>", ETag='"v2"')
+    for _ in range(2):
+        cache.obtener_html(URL, lambda: descargas.descargar_html(URL), revalidar=True)
+
+    assert cache.obtener_html(URL, lambda: descargas.descargar_html(URL), revalidar=True) == "<html>v2</html>"
+    assert not cache.pagina_sin_cambios(URL)
+    assert cache.leer_validadores(URL) == {'etag': '"v2"'}
+
+
+def test_304_sin_copia_pide_la_pagina_entera(cache, sesion, monkeypatch):
+    cache.guardar_pagina(URL, "<html>v1</html>")
+    cache.guardar_validadores(URL, etag='"v1"')
+    sesion.responder(304)
+    sesion.responder(200, "<html>v1</html>", ETag='"v1"')
+    # La copia se desaloja entre la lectura de los validadores y la respuesta
+    monkeypatch.setattr(descargas, 'marcar_sin_cambios', lambda url: None)
+
+    assert descargas.descargar_una_vez(URL) == "<html>v1</html>"
+    assert sesion.cabeceras == [{'If-None-Match': '"v1"'}, {}]
+
+
+def test_offline_no_manda_validadores(cache, monkeypatch):
+    cache.guardar_pagina(URL, "<html></html>")
+    cache.guardar_validadores(URL, etag='"abc"')
+    monkeypatch.setattr(cache, 'OFFLINE', True)
+
+    assert descargas.cabeceras_condicionales(URL) == {}
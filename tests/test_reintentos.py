@@ -0,0 +1,108 @@
+"""
+Reintentos con backoff y lista de fallidos (scripts/reintentos.py).
+
+  python -m pytest -q tests
+"""
+
+import os
+
+import pytest
+import requests
+
+BLOQUEADA = "<html><head><title>Access Denied</title></head><body></body></html>"
+
+
+@pytest.mark.parametrize("status, html, tipo", [
+    (200, "<html></html>", None),
+    (429, "", '429'),
+    (403, BLOQUEADA, 'bloqueo'),
+    (200, BLOQUEADA, 'bloqueo'),
+    (502, "", 'http_5xx'),
+    (404, "", 'http_4xx'),
+])
+def test_clasificar_respuesta(reintentos, status, html, tipo):
+    error = reintentos.clasificar_respuesta(status, html)
+    assert (error.tipo if error else None) == tipo
+
+
+@pytest.mark.parametrize("excepcion, tipo", [
+    (requests.Timeout("Read timed out. (read timeout=15)"), 'timeout'),
+    (requests.ConnectionError("Connection refused"), 'red'),
+    (TimeoutError(), 'timeout'),
+])
+def test_clasificar_excepcion(reintentos, excepcion, tipo):
+    assert reintentos.clasificar_excepcion(excepcion).tipo == tipo
+
+
+def test_reintentables(reintentos):
+    assert all(reintentos.ErrorDescarga(t).reintentable
+               for t in ('timeout', 'red', 'http_5xx', '429', 'bloqueo'))
+    assert not reintentos.ErrorDescarga('http_4xx').reintentable
+
+
+def test_espera_backoff_con_tope(reintentos, monkeypatch):
+    monkeypatch.setattr(reintentos, 'BACKOFF_BASE', 2.0)
+    monkeypatch.setattr(reintentos, 'BACKOFF_MAX', 10.0)
+    assert all(0 <= reintentos.espera_backoff(1) <= 4 for _ in range(50))
+    assert all(0 <= reintentos.espera_backoff(8) <= 10 for _ in range(50))
+
+
+def intentos_que_fallan(*errores, html="<html>ok</html>"):
+    """Función de intento que lanza los errores en orden y luego devuelve `html`."""
+    pendientes = list(errores)
+    llamadas = []
+
+    def intento():
+        llamadas.append(1)
+        if pendientes:
+            raise pendientes.pop(0)
+        return html
+    return intento, llamadas
+
+
+def test_transitorio_se_recupera(reintentos):
+    intento, llamadas = intentos_que_fallan(reintentos.ErrorDescarga('http_5xx'),
+                                            requests.ConnectionError("reset"))
+
+    assert reintentos.con_reintentos("https://www.vlr.gg/1/x", intento) == "<html>ok</html>"
+    assert len(llamadas) == 3
+    assert reintentos.FALLIDOS == []
+
+
+def test_4xx_no_se_reintenta(reintentos):
+    intento, llamadas = intentos_que_fallan(reintentos.ErrorDescarga('http_4xx', "HTTP 404"))
+
+    assert reintentos.con_reintentos("https://www.vlr.gg/1/x", intento) is None
+    assert len(llamadas) == 1
+    assert reintentos.FALLIDOS == [{'url': "https://www.vlr.gg/1/x", 'tipo': 'http_4xx',
+                                    'detalle': "HTTP 404", 'intentos': 1}]
+
+
+def test_agota_los_reintentos(reintentos):
+    intento, llamadas = intentos_que_fallan(*[reintentos.ErrorDescarga('bloqueo')] * 10)
+
+    assert reintentos.con_reintentos("https://www.vlr.gg/1/x", intento) is None
+    assert len(llamadas) == 4
+    assert reintentos.FALLIDOS[0]['tipo'] == 'bloqueo'
+    assert reintentos.FALLIDOS[0]['intentos'] == 4
+
+
+def test_fallos_de_partido(reintentos):
+    reintentos.FALLIDOS.extend([
+        {'url': "https://www.vlr.gg/600001/x/?tab=economy", 'tipo': 'timeout'},
+        {'url': "https://www.vlr.gg/6000010/x", 'tipo': 'red'},
+    ])
+    assert [f['tipo'] for f in reintentos.fallos_de_partido("600001")] == ['timeout']
+    assert reintentos.fallos_de_partido("600002") == []
+
+
+def test_guardar_fallidos(reintentos, tmp_path):
+    urls = ["https://www.vlr.gg/1/x", "https://www.vlr.gg/2/x"]
+    ruta = reintentos.guardar_fallidos(str(tmp_path), "economia", urls)
+
+    assert ruta == os.path.join(str(tmp_path), "fallidos", "economia.txt")
+    with open(ruta, 'r', encoding='utf-8') as f:
+        assert f.read().split() == urls
+    # Sin fallidos en la siguiente ejecución la lista se borra
+    assert reintentos.guardar_fallidos(str(tmp_path), "economia", []) is None
+    assert not os.path.exists(ruta)
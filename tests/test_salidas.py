@@ -0,0 +1,123 @@
+"""
+Capa de salida de tablas (scripts/salidas.py): ida y vuelta Parquet / xlsx,
+tipos de las columnas y elección de la copia más reciente.
+
+  python -m pytest -q tests
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+import salidas
+from conftest import html_fixture
+from partido import parsear_pagina
+from scrapear_economia import parsear_economia
+from scrapear_stats_pro import parsear_stats_lados
+
+
+@pytest.fixture
+def filas_stats():
+    return [f for f in parsear_stats_lados(parsear_pagina(html_fixture('overview')), "600001")
+            if f['map_id'] == '600001_bind']
+
+
+@pytest.fixture
+def formatos(monkeypatch):
+    def fijar(*formatos):
+        monkeypatch.setattr(salidas, 'FORMATOS', list(formatos))
+    return fijar
+
+
+def test_nombre_tabla():
+    assert salidas.nombre_tabla("vlr_mapas.xlsx") == "vlr_mapas"
+    assert salidas.nombre_tabla("vlr_mapas.parquet") == "vlr_mapas"
+    assert salidas.nombre_tabla("vlr_mapas") == "vlr_mapas"
+
+
+@pytest.mark.parametrize("valor, esperado", [
+    (600001, "600001"), (600001.0, "600001"), ("600001", "600001"), ("600001_bind", "600001_bind"),
+])
+def test_id_como_texto(valor, esperado):
+    assert salidas.id_como_texto(valor) == esperado
+
+
+@pytest.mark.parametrize("vacio", [None, float('nan'), pd.NA])
+def test_id_vacio_sigue_vacio(vacio):
+    assert salidas.id_como_texto(vacio) is pd.NA
+
+
+def test_tipar_columnas(filas_stats):
+    df = salidas.tipar_columnas(pd.DataFrame(filas_stats))
+
+    assert df['match_id'].dtype == 'string'
+    assert df['map_id'].dtype == 'string'
+    assert df['player_name'].dtype == 'string'
+    # Los valores de los span llegan como texto ("1.40", "280")
+    assert pd.api.types.is_float_dtype(df['rating'])
+    assert pd.api.types.is_integer_dtype(df['kills'])
+
+
+def test_tipar_columnas_mixtas_quedan_como_texto():
+    df = salidas.tipar_columnas(pd.DataFrame({'score': ["13", "N/A"], 'team_id': [1, None]}))
+
+    assert df['score'].dtype == 'string'
+    assert df['team_id'].tolist() == ["1", pd.NA]
+
+
+@pytest.mark.skipif(not salidas.HAY_PARQUET, reason="pyarrow no está instalado")
+def test_ida_y_vuelta_parquet_y_xlsx(tmp_path, formatos, filas_stats):
+    formatos('parquet', 'xlsx')
+    df = pd.DataFrame(filas_stats)
+    rutas = salidas.guardar_tabla(df, str(tmp_path), "vlr_stats_players_sides.xlsx", sheet_name="Stats")
+
+    # El Parquet se escribe el último: es la copia que se lee
+    assert [os.path.basename(r) for r in rutas] == [
+        "vlr_stats_players_sides.xlsx", "vlr_stats_players_sides.parquet"]
+    leida = salidas.leer_tabla(str(tmp_path), "vlr_stats_players_sides")
+    pd.testing.assert_frame_equal(leida, salidas.tipar_columnas(df))
+
+    desde_xlsx = pd.read_excel(rutas[0], sheet_name="Stats", dtype=str)
+    assert desde_xlsx['player_name'].tolist() == df['player_name'].tolist()
+    assert desde_xlsx['rating'].tolist() == df['rating'].tolist()
+
+
+@pytest.mark.skipif(not salidas.HAY_PARQUET, reason="pyarrow no está instalado")
+def test_leer_solo_columnas(tmp_path, formatos, filas_stats):
+    formatos('parquet')
+    salidas.guardar_tabla(pd.DataFrame(filas_stats), str(tmp_path), "vlr_stats_players_sides")
+
+    df = salidas.leer_tabla(str(tmp_path), "vlr_stats_players_sides", columnas=['map_id', 'kills'])
+    assert list(df.columns) == ['map_id', 'kills']
+    assert len(df) == len(filas_stats)
+
+
+def test_ida_y_vuelta_solo_xlsx(tmp_path, formatos):
+    formatos('xlsx')
+    _, rondas = parsear_economia(parsear_pagina(html_fixture('economy')), "600001")
+    salidas.guardar_tabla(pd.DataFrame(rondas), str(tmp_path), "vlr_economia_rondas")
+
+    assert not os.path.exists(tmp_path / "vlr_economia_rondas.parquet")
+    df = salidas.leer_tabla(str(tmp_path), "vlr_economia_rondas", dtype={'match_id': str})
+    assert df['match_id'].dtype == 'string'
+    assert df['match_id'].unique().tolist() == ["600001"]
+    assert df['spend_top'].tolist() == [r['spend_top'] for r in rondas]
+
+
+@pytest.mark.skipif(not salidas.HAY_PARQUET, reason="pyarrow no está instalado")
+def test_lee_la_copia_mas_reciente(tmp_path, formatos):
+    formatos('parquet')
+    salidas.guardar_tabla(pd.DataFrame({'match_id': ["1"]}), str(tmp_path), "vct_partidos")
+    formatos('xlsx')
+    salidas.guardar_tabla(pd.DataFrame({'match_id': ["1", "2"]}), str(tmp_path), "vct_partidos")
+    # El xlsx es el último que se escribió aunque el Parquet siga en la carpeta
+    antes = os.path.getmtime(tmp_path / "vct_partidos.parquet") - 60
+    os.utime(tmp_path / "vct_partidos.parquet", (antes, antes))
+
+    assert salidas.leer_tabla(str(tmp_path), "vct_partidos")['match_id'].tolist() == ["1", "2"]
+
+
+def test_tabla_inexistente(tmp_path):
+    assert salidas.leer_tabla(str(tmp_path), "vlr_mapas") is None
+    assert not salidas.existe_tabla(str(tmp_path), "vlr_mapas")